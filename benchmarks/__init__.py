@@ -0,0 +1,5 @@
+"""
+Performance benchmarks for ML Service.
+
+Run a benchmark as a module, e.g. ``python -m benchmarks.routing``.
+"""
@@ -0,0 +1,255 @@
+"""
+Benchmark of the core hot paths across data sizes and schema widths.
+
+Generates synthetic classification datasets (1K to 10M rows, narrow and
+wide schemas) and measures, for each hot path, the latency over a few
+repetitions, the throughput in rows per second and the peak resident memory
+added while it runs:
+
+- ``load_data``: ``utils.load_data`` on the dataset file
+- ``load_model``: ``utils.load_model`` on a trained artifact
+- ``train``, ``predict``, ``evaluate``: ``MLModel`` methods on the file,
+  using the sklearn logistic regression demo model
+- ``tab_evaluate``: ``TabClassification._evaluate`` on an in-memory frame
+- ``upload``, ``download``: the /upload and /download endpoints in-process
+
+Everything runs offline in a temporary ML_HOME. Results are written as JSON
+and can be compared with an earlier run to spot regressions::
+
+    python -m benchmarks.hotpaths --rows 1000 100000 --output base.json
+    python -m benchmarks.hotpaths --rows 1000 100000 --output new.json --compare base.json
+
+Peak memory is measured on Linux only. 10M rows of the wide schema need
+well over 16GB of memory.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from mlservice.core.memory import peak_rss_bytes, reset_peak_rss, rss_bytes
+
+# (numeric columns, categorical columns)
+SCHEMAS = {
+    "narrow": (8, 2),
+    "wide": (200, 10),
+}
+HOT_PATHS = ("load_data", "load_model", "train", "predict", "evaluate", "tab_evaluate", "upload", "download")
+DEFAULT_ROWS = (1_000, 10_000, 100_000, 1_000_000)
+# Distinct values per categorical column
+N_CATEGORIES = 20
+
+
+def make_frame(n_rows: int, schema: str, seed: int = 0) -> pd.DataFrame:
+    """Return a synthetic binary classification frame.
+
+    Args:
+        n_rows: Number of rows
+        schema: Key of SCHEMAS
+        seed: Random seed
+
+    Returns:
+        Frame with columns x0.., c0.. and a 0/1 ``target``
+    """
+    n_numeric, n_categorical = SCHEMAS[schema]
+    rng = np.random.default_rng(seed)
+    X = rng.standard_normal((n_rows, n_numeric))
+    frame = pd.DataFrame(X, columns=[f"x{i}" for i in range(n_numeric)])
+    logits = X[:, : min(n_numeric, 8)].sum(axis=1)
+    for i in range(n_categorical):
+        codes = rng.integers(0, N_CATEGORIES, n_rows)
+        frame[f"c{i}"] = pd.Categorical.from_codes(codes, [f"v{j}" for j in range(N_CATEGORIES)]).astype(str)
+        logits += (codes % 2) - 0.5
+    frame["target"] = (logits + rng.standard_normal(n_rows) > 0).astype(int)
+    return frame
+
+
+def model_params(schema: str) -> Dict[str, Any]:
+    """Return params of the logistic regression demo model for a schema."""
+    n_categorical = SCHEMAS[schema][1]
+    return {
+        "columns": {
+            "target": "target",
+            "categorical": [f"c{i}" for i in range(n_categorical)],
+        },
+        "hyperparameters": {"max_iter": 50},
+    }
+
+
+def measure(fn: Callable[[Any], Any], repeat: int, rows: int,
+            setup: Optional[Callable[[], Any]] = None) -> Dict[str, Any]:
+    """Time fn over repeat runs and record the peak RSS it adds.
+
+    Args:
+        fn: Function to time, called with the result of setup (or None)
+        repeat: Number of timed runs
+        rows: Rows processed per run, for the throughput
+        setup: Untimed function preparing the argument of each run
+
+    Returns:
+        Latency (median, min, all runs), rows per second and peak memory
+    """
+    seconds = []
+    peak_mb = []
+    for _ in range(repeat):
+        arg = setup() if setup is not None else None
+        gc.collect()
+        peak_known = reset_peak_rss()
+        base = rss_bytes()
+        start = time.perf_counter()
+        fn(arg)
+        seconds.append(time.perf_counter() - start)
+        peak = peak_rss_bytes() if peak_known else None
+        if peak is not None:
+            peak_mb.append(max(peak - base, 0) / (1024 * 1024))
+        del arg
+    median = statistics.median(seconds)
+    return {
+        "median_s": median,
+        "min_s": min(seconds),
+        "runs_s": seconds,
+        "rows_per_s": rows / median if median > 0 else None,
+        "peak_rss_mb": max(peak_mb) if peak_mb else None,
+    }
+
+
+def run(n_rows: int, schema: str, paths: List[str], repeat: int, directory: Path) -> List[Dict[str, Any]]:
+    """Benchmark the hot paths on one dataset size and schema."""
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from external_routes.sklearn.tab_model import LogisticRegressionModel
+    from mlservice.core.upload_routes import router as upload_router
+    from mlservice.core.utils import load_data, load_model
+
+    frame = make_frame(n_rows, schema)
+    data_path = directory / f"{schema}-{n_rows}.csv"
+    frame.to_csv(data_path, index=False)
+    file_mb = data_path.stat().st_size / (1024 * 1024)
+
+    model = LogisticRegressionModel(model_params(schema))
+    model_path = model.train(str(data_path))["model_path"]
+    model = load_model(model_path)
+
+    client = TestClient(FastAPI())
+    client.app.include_router(upload_router)
+    uploaded = client.post("/upload", files={"file": (data_path.name, data_path.read_bytes())}).json()["path"]
+
+    benchmarks = {
+        "load_data": (lambda _: load_data(str(data_path)), None),
+        "load_model": (lambda _: load_model(model_path), None),
+        "train": (lambda _: LogisticRegressionModel(model_params(schema)).train(str(data_path)), None),
+        "predict": (lambda _: model.predict(str(data_path)), None),
+        "evaluate": (lambda _: model.evaluate(str(data_path)), None),
+        # _predict adds prediction columns to the frame, so each run gets a copy
+        "tab_evaluate": (lambda data: model._evaluate(data), lambda: frame.copy()),
+        "upload": (lambda content: client.post("/upload", files={"file": (data_path.name, content)}),
+                   lambda: data_path.read_bytes()),
+        "download": (lambda _: client.get("/download", params={"file_path": uploaded}).content, None),
+    }
+
+    results = []
+    for path in paths:
+        fn, setup = benchmarks[path]
+        result = measure(fn, repeat, n_rows, setup)
+        result.update({"path": path, "schema": schema, "rows": n_rows, "file_mb": file_mb})
+        results.append(result)
+        peak = f"{result['peak_rss_mb']:>9.1f}MiB" if result["peak_rss_mb"] is not None else "         n/a"
+        print(
+            f"{path:>12} {schema:>6} {n_rows:>9} rows: median {result['median_s'] * 1e3:>10.2f}ms, "
+            f"{result['rows_per_s']:>12.0f} rows/s, peak {peak}"
+        )
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], threshold: float) -> int:
+    """Print median latency ratios against a baseline run.
+
+    Returns:
+        Number of benchmarks slower than the baseline by more than threshold
+    """
+    previous = {(r["path"], r["schema"], r["rows"]): r for r in baseline}
+    regressions = 0
+    for result in results:
+        before = previous.get((result["path"], result["schema"], result["rows"]))
+        if before is None:
+            continue
+        ratio = result["median_s"] / before["median_s"]
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"{result['path']:>12} {result['schema']:>6} {result['rows']:>9} rows: {ratio:>6.2f}x{flag}")
+    return regressions
+
+
+def main():
+    """Command line entry point of the hot path benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark load_data, load_model, train/predict/evaluate and uploads")
+    parser.add_argument("--rows", type=int, nargs="+", default=list(DEFAULT_ROWS),
+                        help="Dataset sizes in rows, e.g. 1000 10000000")
+    parser.add_argument("--schemas", nargs="+", choices=sorted(SCHEMAS), default=sorted(SCHEMAS),
+                        help="Schema widths to benchmark")
+    parser.add_argument("--paths", nargs="+", choices=HOT_PATHS, default=list(HOT_PATHS),
+                        help="Hot paths to benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark")
+    parser.add_argument("--output", default=None, help="Write results as JSON to this file")
+    parser.add_argument("--compare", default=None, help="JSON results of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="Relative slowdown reported as a regression by --compare")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="mlservice-bench-") as directory:
+        saved_ml_home = os.environ.get("ML_HOME")
+        os.environ["ML_HOME"] = directory
+        try:
+            results = []
+            for schema in args.schemas:
+                for n_rows in args.rows:
+                    results += run(n_rows, schema, args.paths, args.repeat, Path(directory))
+        finally:
+            if saved_ml_home is None:
+                os.environ.pop("ML_HOME", None)
+            else:
+                os.environ["ML_HOME"] = saved_ml_home
+
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"Median latency relative to {args.compare} ({baseline.get('commit')}):")
+        if compare(results, baseline["results"], args.threshold):
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+"""
+HTTP load test of the model endpoints.
+
+Starts the service (as a local subprocess by default, or in-process in a
+thread) or targets a running one, trains the scenario's model through the
+API and then drives ``/model/{name}/predict``, ``/model/{name}/eval``,
+``/upload`` and ``/download`` from concurrent clients for a fixed duration.
+Reports requests per second, error rates and latency percentiles per
+endpoint.
+
+A scenario is a JSON file (see ``benchmarks/scenarios``)::
+
+    {
+      "model": "sklearn/logistic",
+      "params": {"columns": {"target": "target"}},
+      "schema": "narrow",
+      "train_rows": 10000,
+      "rows": 1000,
+      "concurrency": 16,
+      "duration": 30,
+      "mix": {"predict": 70, "eval": 20, "upload": 5, "download": 5}
+    }
+
+``rows`` is the payload size of predict/eval requests and uploads; ``mix``
+gives the relative frequency of each operation. Datasets are synthetic (see
+``benchmarks.hotpaths.make_frame``) and are sent to the service through
+/upload, so a remote server needs no shared filesystem.
+
+Usage:
+    python -m benchmarks.loadtest benchmarks/scenarios/sklearn_logistic.json
+    python -m benchmarks.loadtest SCENARIO --concurrency 64 --duration 60 --workers 4
+    python -m benchmarks.loadtest SCENARIO --url http://host:8000 --output results.json
+
+The in-process mode shares the GIL with the load generator, so it
+understates the throughput of a real deployment.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+import httpx
+
+from benchmarks.hotpaths import make_frame, model_params
+
+OPERATIONS = ("predict", "eval", "upload", "download")
+DEFAULT_SCENARIO = {
+    "model": "sklearn/logistic",
+    # Declares the schema's string columns categorical
+    "params": model_params("narrow"),
+    "schema": "narrow",
+    "train_rows": 10_000,
+    "rows": 1_000,
+    "concurrency": 16,
+    "duration": 30.0,
+    "mix": {"predict": 70, "eval": 20, "upload": 5, "download": 5},
+}
+# Seconds to wait for the service to report ready
+STARTUP_TIMEOUT = 60.0
+
+
+def load_scenario(path: Optional[str], overrides: Dict[str, Any]) -> Dict[str, Any]:
+    """Read a scenario file and apply command line overrides.
+
+    Raises:
+        ValueError: If the mix names an unknown operation or is empty
+    """
+    scenario = dict(DEFAULT_SCENARIO)
+    if path:
+        with open(path) as f:
+            scenario.update(json.load(f))
+    scenario.update({key: value for key, value in overrides.items() if value is not None})
+    unknown = set(scenario["mix"]) - set(OPERATIONS)
+    if unknown:
+        raise ValueError(f"Unknown operations in mix: {sorted(unknown)}")
+    if not any(weight > 0 for weight in scenario["mix"].values()):
+        raise ValueError("The request mix has no operation with a positive weight")
+    return scenario
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    """Parse 'predict=70,eval=30' into a mix."""
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        mix[name.strip()] = float(weight)
+    return mix
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_ready(url: str, timeout: float = STARTUP_TIMEOUT, process: Optional[subprocess.Popen] = None) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            if httpx.get(f"{url}/ready", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server at {url} not ready after {timeout:.0f}s")
+
+
+@contextmanager
+def subprocess_server(modules: List[str], workers: int, ml_home: str) -> Iterator[str]:
+    """Run ``python -m mlservice.main`` on a free local port."""
+    port = _free_port()
+    command = [sys.executable, "-m", "mlservice.main", "--host", "127.0.0.1", "--port", str(port),
+               "--workers", str(workers), "--external-routines", *modules]
+    process = subprocess.Popen(command, env={**os.environ, "ML_HOME": ml_home},
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    try:
+        _wait_ready(url, process=process)
+        yield url
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+@contextmanager
+def inprocess_server(modules: List[str], ml_home: str) -> Iterator[str]:
+    """Run the app with uvicorn in a thread of this process."""
+    import uvicorn
+
+    from mlservice.main import app, setup_routes
+
+    os.environ["ML_HOME"] = ml_home
+    setup_routes(modules)
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{port}"
+    try:
+        _wait_ready(url)
+        yield url
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+def _csv_bytes(n_rows: int, schema: str, seed: int) -> bytes:
+    return make_frame(n_rows, schema, seed=seed).to_csv(index=False).encode()
+
+
+def prepare(client: httpx.Client, scenario: Dict[str, Any]) -> Dict[str, Any]:
+    """Upload the datasets and train the scenario's model through the API.
+
+    Returns:
+        Server-side paths of the payload data and the trained model, and the
+        bytes sent by upload requests
+    """
+    def upload(name: str, content: bytes) -> str:
+        response = client.post("/upload", files={"file": (name, content)})
+        response.raise_for_status()
+        return response.json()["path"]
+
+    payload = _csv_bytes(scenario["rows"], scenario["schema"], seed=1)
+    train_path = upload("train.csv", _csv_bytes(scenario["train_rows"], scenario["schema"], seed=0))
+    data_path = upload("payload.csv", payload)
+    response = client.post(f"/model/{scenario['model']}/train", json={
+        "train_path": train_path,
+        "params": json.dumps(scenario["params"]),
+    }, timeout=None)
+    response.raise_for_status()
+    return {"data_path": data_path, "model_path": response.json()["model_path"], "payload": payload}
+
+
+async def _send(client: httpx.AsyncClient, operation: str, scenario: Dict[str, Any],
+                setup: Dict[str, Any]) -> httpx.Response:
+    model = scenario["model"]
+    body = {"data_path": setup["data_path"], "model_path": setup["model_path"]}
+    if operation == "predict":
+        return await client.post(f"/model/{model}/predict", json=body)
+    if operation == "eval":
+        return await client.post(f"/model/{model}/eval", json=body)
+    if operation == "upload":
+        return await client.post("/upload", files={"file": ("payload.csv", setup["payload"])})
+    return await client.get("/download", params={"file_path": setup["data_path"]})
+
+
+async def drive(url: str, scenario: Dict[str, Any], setup: Dict[str, Any], seed: int = 0) -> List[tuple]:
+    """Send the request mix from concurrent clients for the scenario's duration.
+
+    Returns:
+        (operation, seconds, status code or None on a connection error) per request
+    """
+    operations = [op for op, weight in scenario["mix"].items() if weight > 0]
+    weights = [scenario["mix"][op] for op in operations]
+    samples: List[tuple] = []
+    deadline = time.monotonic() + scenario["duration"]
+    limits = httpx.Limits(max_connections=scenario["concurrency"])
+
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=None) as client:
+        async def worker(rng: random.Random) -> None:
+            while time.monotonic() < deadline:
+                operation = rng.choices(operations, weights)[0]
+                start = time.perf_counter()
+                try:
+                    status = (await _send(client, operation, scenario, setup)).status_code
+                except httpx.HTTPError:
+                    status = None
+                samples.append((operation, time.perf_counter() - start, status))
+
+        await asyncio.gather(*(worker(random.Random(seed + i)) for i in range(scenario["concurrency"])))
+    return samples
+
+
+def _percentile(sorted_samples: List[float], q: float) -> float:
+    return sorted_samples[min(len(sorted_samples) - 1, int(len(sorted_samples) * q))]
+
+
+def summarize(samples: List[tuple], elapsed: float) -> Dict[str, Dict[str, Any]]:
+    """Return count, requests per second, error rate and latency percentiles (ms) per operation."""
+    groups: Dict[str, List[tuple]] = {"all": samples}
+    for sample in samples:
+        groups.setdefault(sample[0], []).append(sample)
+    summary = {}
+    for name, group in groups.items():
+        if not group:
+            continue
+        latencies = sorted(seconds * 1e3 for _, seconds, _ in group)
+        errors = sum(1 for _, _, status in group if status is None or status >= 400)
+        summary[name] = {
+            "requests": len(group),
+            "rps": len(group) / elapsed,
+            "error_rate": errors / len(group),
+            "p50_ms": _percentile(latencies, 0.50),
+            "p90_ms": _percentile(latencies, 0.90),
+            "p99_ms": _percentile(latencies, 0.99),
+            "max_ms": latencies[-1],
+        }
+    return summary
+
+
+def run(url: str, scenario: Dict[str, Any]) -> Dict[str, Any]:
+    """Prepare and run a scenario against the service at url."""
+    with httpx.Client(base_url=url, timeout=60.0) as client:
+        setup = prepare(client, scenario)
+    start = time.monotonic()
+    samples = asyncio.run(drive(url, scenario, setup))
+    return summarize(samples, time.monotonic() - start)
+
+
+def main():
+    """Command line entry point of the load test."""
+    parser = argparse.ArgumentParser(description="Load test the model, upload and download endpoints")
+    parser.add_argument("scenario", nargs="?", default=None, help="Scenario JSON file")
+    parser.add_argument("--url", default=None, help="Test a running server instead of starting one")
+    parser.add_argument("--in-process", action="store_true", help="Run the server in a thread of this process")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes of the started server")
+    parser.add_argument("--external-routines", nargs="+", default=["external_routes"],
+                        help="Route modules loaded by the started server")
+    parser.add_argument("--concurrency", type=int, default=None, help="Concurrent clients")
+    parser.add_argument("--duration", type=float, default=None, help="Seconds to send requests for")
+    parser.add_argument("--rows", type=int, default=None, help="Rows per predict/eval/upload payload")
+    parser.add_argument("--mix", type=parse_mix, default=None, help="Request mix, e.g. predict=70,eval=30")
+    parser.add_argument("--output", default=None, help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    scenario = load_scenario(args.scenario, {
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "rows": args.rows,
+        "mix": args.mix,
+    })
+
+    if args.url:
+        summary = run(args.url.rstrip("/"), scenario)
+    else:
+        with tempfile.TemporaryDirectory(prefix="mlservice-loadtest-") as ml_home:
+            if args.in_process:
+                server = inprocess_server(args.external_routines, ml_home)
+            else:
+                server = subprocess_server(args.external_routines, args.workers, ml_home)
+            with server as url:
+                summary = run(url, scenario)
+
+    print(f"{'operation':>10} {'requests':>9} {'rps':>9} {'errors':>7} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9}")
+    for name, stats in summary.items():
+        print(
+            f"{name:>10} {stats['requests']:>9} {stats['rps']:>9.1f} {stats['error_rate']:>6.1%} "
+            f"{stats['p50_ms']:>7.1f}ms {stats['p90_ms']:>7.1f}ms {stats['p99_ms']:>7.1f}ms {stats['max_ms']:>7.1f}ms"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"scenario": scenario, "summary": summary}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
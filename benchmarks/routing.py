@@ -0,0 +1,148 @@
+"""
+Routing-latency benchmark for per-model and catalog routing.
+
+Registers 1, 100 and 1000 trivial models and measures, for each routing
+mode, the route-table size, the time Starlette spends matching a request
+for the last registered model, the end-to-end latency of that request and
+the time to generate the OpenAPI schema.
+
+Usage:
+    python -m benchmarks.routing [--models 1 100 1000] [--repeat 200] [--output results.json]
+"""
+import argparse
+import json
+import statistics
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.routing import Match
+
+from mlservice.core.ml import MLModel, create_model_endpoints
+from mlservice.core.registry import RouteRegistry, ROUTING_MODES
+
+
+class BenchmarkModel(MLModel):
+    """Model doing nothing, used to populate the registry."""
+
+    def _train(self, train_data, eval_data=None):
+        pass
+
+    def _predict(self, data):
+        return data
+
+    def _evaluate(self, data):
+        return {}
+
+
+@contextmanager
+def isolated_registry() -> Iterator[RouteRegistry]:
+    """Give the benchmark an empty registry and restore the original afterwards."""
+    saved = {
+        "_routes": RouteRegistry._routes,
+        "_model_classes": RouteRegistry._model_classes,
+        "_lazy_models": RouteRegistry._lazy_models,
+        "routing": RouteRegistry.routing,
+    }
+    RouteRegistry._routes = []
+    RouteRegistry._model_classes = {}
+    RouteRegistry._lazy_models = {}
+    try:
+        yield RouteRegistry.get_instance()
+    finally:
+        for name, value in saved.items():
+            setattr(RouteRegistry, name, value)
+
+
+def build_app(registry: RouteRegistry, n_models: int, routing: str) -> FastAPI:
+    """Register n_models models and return an app using the given routing mode."""
+    RouteRegistry.routing = routing
+    for i in range(n_models):
+        model_class = type(f"BenchmarkModel{i}", (BenchmarkModel,), {})
+        create_model_endpoints(model_class, f"bench/model{i}")
+    app = FastAPI()
+    registry.apply_routes(app, routing=routing)
+    return app
+
+
+def match_seconds(app: FastAPI, path: str) -> float:
+    """Time Starlette's linear route scan for one POST request."""
+    scope = {"type": "http", "method": "POST", "path": path, "root_path": ""}
+    start = time.perf_counter()
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            break
+    return time.perf_counter() - start
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """Return p50/p99 of samples in microseconds."""
+    samples = sorted(samples)
+    return {
+        "p50_us": statistics.median(samples) * 1e6,
+        "p99_us": samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1e6,
+    }
+
+
+def run(n_models: int, routing: str, repeat: int) -> Dict[str, Any]:
+    """Benchmark one model count and routing mode."""
+    with isolated_registry() as registry:
+        app = build_app(registry, n_models, routing)
+        path = f"/model/bench/model{n_models - 1}/predict"
+
+        matching = [match_seconds(app, path) for _ in range(repeat)]
+
+        client = TestClient(app)
+        requests = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            # An empty body fails validation, so only routing and parsing are timed
+            response = client.post(path, json={})
+            requests.append(time.perf_counter() - start)
+            assert response.status_code == 422, response.text
+
+        start = time.perf_counter()
+        app.openapi()
+        openapi_seconds = time.perf_counter() - start
+
+        return {
+            "models": n_models,
+            "routing": routing,
+            "routes": len(app.router.routes),
+            "match": percentiles(matching),
+            "request": percentiles(requests),
+            "openapi_ms": openapi_seconds * 1e3,
+        }
+
+
+def main():
+    """Command line entry point of the routing benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark per-model vs catalog routing")
+    parser.add_argument("--models", type=int, nargs="+", default=[1, 100, 1000],
+                        help="Numbers of registered models to benchmark")
+    parser.add_argument("--repeat", type=int, default=200, help="Requests timed per configuration")
+    parser.add_argument("--output", default=None, help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = []
+    for n_models in args.models:
+        for routing in ROUTING_MODES:
+            result = run(n_models, routing, args.repeat)
+            results.append(result)
+            print(
+                f"{n_models:>5} models {routing:>9}: {result['routes']:>5} routes, "
+                f"match p50 {result['match']['p50_us']:>8.1f}us, "
+                f"request p50 {result['request']['p50_us']:>8.1f}us, "
+                f"openapi {result['openapi_ms']:>8.1f}ms"
+            )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -23,4 +23,4 @@ class DummyModel(MLModel):
         return f"DummyModel: {self.params}"
  
 
-dummy_endpoints:APIRouter = create_model_endpoints(DummyModel, "dummy")
+dummy_endpoints:Optional[APIRouter] = create_model_endpoints(DummyModel, "dummy")
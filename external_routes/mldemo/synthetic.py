@@ -0,0 +1,154 @@
+"""
+Synthetic models with a configurable cost, for capacity tests.
+
+Each call to train, predict or evaluate burns CPU time and allocates
+memory in proportion to the number of input rows (those of a DataFrame or
+SparseData, else the ``rows`` param, default 1), writes and reads back a
+temporary file and sleeps for a latency drawn from a distribution. This
+lets the server's own overhead, concurrency limits and batching be measured
+without a real estimator. Example params::
+
+    {
+        "cpu_ms_per_row": 0.05,
+        "cpu_release_gil": false,
+        "memory_bytes_per_row": 2048,
+        "io_bytes": 1048576,
+        "rows": 1,
+        "latency": {"distribution": "lognormal", "median_ms": 20, "sigma": 0.5},
+        "seed": 0
+    }
+
+Latency distributions: ``constant`` (``ms``), ``uniform`` (``low_ms``,
+``high_ms``), ``normal`` (``mean_ms``, ``std_ms``, clipped at 0),
+``lognormal`` (``median_ms``, ``sigma``) and ``exponential`` (``mean_ms``).
+"""
+import os
+import random
+import tempfile
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from mlservice.core import MLModel
+from mlservice.core.ml import model_endpoints
+from mlservice.core.utils import SparseData
+
+LATENCY_DISTRIBUTIONS = ("constant", "uniform", "normal", "lognormal", "exponential")
+# Bytes written per I/O call
+IO_CHUNK_SIZE = 1024 * 1024
+
+
+def sample_latency_ms(spec: Optional[Dict[str, Any]], rng: random.Random) -> float:
+    """Draw a latency in milliseconds from a distribution spec.
+
+    Args:
+        spec: Distribution name and parameters, or None for no latency
+        rng: Random number generator
+
+    Raises:
+        ValueError: If the distribution is unknown
+    """
+    if not spec:
+        return 0.0
+    distribution = spec.get("distribution", "constant")
+    if distribution == "constant":
+        latency = spec.get("ms", 0.0)
+    elif distribution == "uniform":
+        latency = rng.uniform(spec.get("low_ms", 0.0), spec["high_ms"])
+    elif distribution == "normal":
+        latency = rng.gauss(spec["mean_ms"], spec.get("std_ms", 0.0))
+    elif distribution == "lognormal":
+        latency = spec["median_ms"] * rng.lognormvariate(0.0, spec.get("sigma", 0.0))
+    elif distribution == "exponential":
+        latency = rng.expovariate(1.0 / spec["mean_ms"])
+    else:
+        raise ValueError(f"Unknown latency distribution: {distribution}, expected one of {LATENCY_DISTRIBUTIONS}")
+    return max(float(latency), 0.0)
+
+
+def burn_cpu(seconds: float, release_gil: bool = False) -> None:
+    """Keep the current thread busy for ``seconds`` of CPU time.
+
+    Args:
+        seconds: CPU seconds to spend
+        release_gil: Spend them in NumPy matrix products, which release the
+            GIL, instead of a Python loop holding it
+    """
+    deadline = time.thread_time() + seconds
+    if release_gil:
+        a = np.ones((64, 64))
+        while time.thread_time() < deadline:
+            a = a @ a / 64.0
+        return
+    x = 0
+    while time.thread_time() < deadline:
+        for i in range(1000):
+            x += i * i
+
+
+def exercise_io(n_bytes: int, directory: Optional[str] = None) -> None:
+    """Write ``n_bytes`` to a temporary file, fsync it and read it back."""
+    chunk = os.urandom(min(n_bytes, IO_CHUNK_SIZE))
+    with tempfile.TemporaryFile(dir=directory) as f:
+        remaining = n_bytes
+        while remaining > 0:
+            remaining -= f.write(chunk[:remaining])
+        f.flush()
+        os.fsync(f.fileno())
+        f.seek(0)
+        while f.read(IO_CHUNK_SIZE):
+            pass
+
+
+@model_endpoints("synthetic")
+class SyntheticModel(MLModel):
+    """Model whose calls cost what its params say, for capacity tests."""
+
+    def __init__(self, params=None):
+        super().__init__(params)
+        self.rng_ = random.Random(self.params.get("seed"))
+
+    def _n_rows(self, data: Any) -> int:
+        """Return the rows of tabular data, else the ``rows`` param.
+
+        ``load_data`` returns parsed JSON documents and the path itself for
+        unknown formats, whose length is not a row count.
+        """
+        if isinstance(data, (pd.DataFrame, SparseData)):
+            return data.shape[0]
+        return int(self.params.get("rows", 1))
+
+    def _spend(self, data: Any) -> Dict[str, Any]:
+        """Spend the configured CPU, memory, I/O and latency for one call."""
+        n_rows = self._n_rows(data)
+        start = time.perf_counter()
+        cpu_start = time.thread_time()
+        burn_cpu(self.params.get("cpu_ms_per_row", 0.0) * n_rows / 1000.0,
+                 self.params.get("cpu_release_gil", False))
+        # np.ones writes every page, so the memory is resident until the call returns
+        memory = np.ones(int(self.params.get("memory_bytes_per_row", 0) * n_rows), dtype=np.uint8)
+        io_bytes = int(self.params.get("io_bytes", 0))
+        if io_bytes > 0:
+            exercise_io(io_bytes, os.getenv("ML_HOME"))
+        latency_ms = sample_latency_ms(self.params.get("latency"), self.rng_)
+        time.sleep(latency_ms / 1000.0)
+        return {
+            "rows": n_rows,
+            "cpu_seconds": time.thread_time() - cpu_start,
+            "memory_bytes": memory.nbytes,
+            "io_bytes": io_bytes,
+            "latency_ms": latency_ms,
+            "seconds": time.perf_counter() - start,
+        }
+
+    def _train(self, train_data: Any, eval_data: Optional[Any] = None) -> None:
+        self._spend(train_data)
+
+    def _predict(self, data: Any) -> pd.DataFrame:
+        self._spend(data)
+        return pd.DataFrame({"prediction": np.zeros(self._n_rows(data))})
+
+    def _evaluate(self, data: Any) -> Dict[str, Any]:
+        return self._spend(data)
@@ -1,13 +1,33 @@
-from .ml import MLModel, create_model_endpoints
-from .utils import load_data, load_model
-from .tabml import TabModel, TabClassification, TabRegression
-
-__all__ = [
-    "MLModel",
-    "create_model_endpoints",
-    "load_data",
-    "load_model",
-    "TabModel",
-    "TabClassification",
-    "TabRegression",
-]
+"""
+Core ML service components.
+
+Public names are imported on first access (PEP 562), so importing
+``mlservice.core`` or one of its submodules does not load pandas, joblib or
+scikit-learn until model code actually needs them.
+"""
+import importlib
+from typing import Any
+
+_EXPORTS = {
+    "MLModel": ".ml",
+    "create_model_endpoints": ".ml",
+    "load_data": ".utils",
+    "load_model": ".utils",
+    "TabModel": ".tabml",
+    "TabClassification": ".tabml",
+    "TabRegression": ".tabml",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
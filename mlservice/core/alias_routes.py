@@ -0,0 +1,55 @@
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+
+from .aliases import alias_table
+
+router = APIRouter()
+
+# Handlers are plain functions so FastAPI runs their SQLite work and model
+# loads in its threadpool instead of on the event loop
+
+class PromoteRequest(BaseModel):
+    alias: str
+    model_path: str
+
+@router.get("/aliases", tags=["Model Aliases"])
+def list_aliases():
+    """Return all model aliases and the model paths they point at."""
+    try:
+        return alias_table.aliases()
+    except ValueError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/aliases/{alias:path}", tags=["Model Aliases"])
+def get_alias(alias: str):
+    """Return the model path an alias points at."""
+    try:
+        return {"alias": alias, "model_path": alias_table.resolve(alias)}
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+    except ValueError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.put("/aliases", tags=["Model Aliases"])
+def promote_alias(request: PromoteRequest):
+    """Point an alias at a model after loading it, so traffic moves to a warm model."""
+    try:
+        previous: Optional[str] = alias_table.promote(request.alias, request.model_path)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "alias": request.alias,
+        "model_path": alias_table.resolve(request.alias),
+        "previous": previous,
+    }
+
+@router.delete("/aliases/{alias:path}", tags=["Model Aliases"])
+def delete_alias(alias: str):
+    """Delete an alias."""
+    if not alias_table.remove(alias):
+        raise HTTPException(status_code=404, detail=f"Unknown model alias: {alias}")
+    return {"message": f"Deleted alias {alias}"}
@@ -0,0 +1,147 @@
+"""
+Named model aliases such as ``sklearn/ridge@production``.
+
+Aliases are persisted in the model index and served from an in-memory
+table that is refreshed from disk, so every worker process picks up a
+promotion within ``refresh_interval`` seconds.
+"""
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from .model_cache import model_cache
+from .model_index import ModelIndex
+
+ALIAS_SEPARATOR = "@"
+DEFAULT_REFRESH_INTERVAL = 1.0
+
+
+def is_alias(ref: str) -> bool:
+    """Return True if ref looks like '<model name>@<label>' rather than a path."""
+    name, separator, label = ref.rpartition(ALIAS_SEPARATOR)
+    return bool(separator and name and label) and "/" not in label and not os.path.exists(ref)
+
+
+class AliasTable:
+    """In-memory alias to model path table backed by the model index.
+
+    Lookups read an immutable dict snapshot; refreshes and promotions swap
+    in a new snapshot, so readers never see a partially updated table.
+    """
+
+    def __init__(self, refresh_interval: float = DEFAULT_REFRESH_INTERVAL):
+        self.refresh_interval = refresh_interval
+        self._aliases: Dict[str, str] = {}
+        self._ml_home: Optional[str] = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def _index(self) -> ModelIndex:
+        return ModelIndex.for_ml_home()
+
+    def refresh(self, force: bool = False, prewarm: bool = False) -> Dict[str, str]:
+        """Reload the table from disk if it is stale or ML_HOME changed.
+
+        While the model cache watcher runs it refreshes the table in the
+        background, so request-path refreshes only happen when forced.
+
+        Args:
+            force: Reload regardless of the refresh interval
+            prewarm: Load the new target of every changed alias into the
+                model cache before swapping the table. Targets that fail to
+                load keep their previous mapping until the next refresh.
+        """
+        ml_home = os.getenv('ML_HOME')
+        now = time.monotonic()
+        fresh = ml_home == self._ml_home and (
+            model_cache.watching or now - self._loaded_at < self.refresh_interval
+        )
+        if not force and fresh:
+            return self._aliases
+        aliases = self._index().aliases()
+        if prewarm and ml_home == self._ml_home:
+            for alias, model_path in list(aliases.items()):
+                if self._aliases.get(alias) == model_path:
+                    continue
+                try:
+                    model_cache.prewarm(model_path)
+                except Exception as e:
+                    print(f"Warning: Failed to prewarm {model_path} for alias {alias}: {e}")
+                    if alias in self._aliases:
+                        aliases[alias] = self._aliases[alias]
+                    else:
+                        del aliases[alias]
+        with self._lock:
+            self._aliases = aliases
+            self._ml_home = ml_home
+            self._loaded_at = now
+        return self._aliases
+
+    def aliases(self) -> Dict[str, str]:
+        """Return the current alias table."""
+        return dict(self.refresh())
+
+    def resolve(self, alias: str) -> str:
+        """Return the model path an alias points at.
+
+        Raises:
+            KeyError: If the alias is not defined
+        """
+        aliases = self.refresh()
+        if alias not in aliases:
+            aliases = self.refresh(force=True)
+        if alias not in aliases:
+            raise KeyError(f"Unknown model alias: {alias}")
+        return aliases[alias]
+
+    def promote(self, alias: str, model_path: str) -> Optional[str]:
+        """Point an alias at a model, prewarming the model first.
+
+        The model is loaded into the model cache before the alias moves, so
+        the first request through the alias does not pay the load.
+
+        Returns:
+            The previous target of the alias, or None
+
+        Raises:
+            ValueError: If the alias is malformed or the model cannot be loaded
+            FileNotFoundError: If the model files are not found
+        """
+        if not is_alias(alias):
+            raise ValueError(f"Invalid alias '{alias}', expected '<model name>@<label>'")
+        model_path = str(Path(model_path).resolve())
+        model_cache.prewarm(model_path)
+        self.refresh()
+        with self._lock:
+            self._index().set_alias(alias, model_path)
+            previous = self._aliases.get(alias)
+            aliases = dict(self._aliases)
+            aliases[alias] = model_path
+            self._aliases = aliases
+        return previous
+
+    def remove(self, alias: str) -> bool:
+        """Delete an alias. Returns False if it did not exist."""
+        self.refresh()
+        with self._lock:
+            removed = self._index().delete_alias(alias)
+            aliases = dict(self._aliases)
+            aliases.pop(alias, None)
+            self._aliases = aliases
+        return removed
+
+
+alias_table = AliasTable()
+
+
+def resolve_model_path(ref: str) -> str:
+    """Return the model directory for a model path or alias.
+
+    Raises:
+        KeyError: If ref is an unknown alias
+    """
+    if is_alias(ref):
+        return alias_table.resolve(ref)
+    return ref
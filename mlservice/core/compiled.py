@@ -0,0 +1,240 @@
+"""
+NumPy-only predictor artifacts for linear models.
+
+When a TabModel wrapping a supported linear estimator is trained, its
+coefficients, intercepts, link function and feature preparation (the
+FeatureSchema and CategoricalEncoder state) are also written to
+``compiled.npz`` next to model.joblib. ``load_model`` prefers that file and
+returns a compiled model predicting with one matrix product, so serving
+neither unpickles the estimator nor imports scikit-learn. Evaluation metrics
+are still computed with ``sklearn.metrics``.
+
+Existing artifacts can be compiled after the fact::
+
+    python -m mlservice.core.compiled $ML_HOME/models/sklearn/ridge/...
+"""
+import argparse
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from .features import CategoricalEncoder, FeatureSchema
+from .tabml import TabClassification, TabModel, TabRegression
+
+COMPILED_FILE = "compiled.npz"
+FORMAT_VERSION = 1
+LINKS = ("identity", "logistic", "softmax", "ovr")
+# Estimators whose predictions are link(X @ coef_.T + intercept_)
+REGRESSORS = {
+    "LinearRegression", "Ridge", "RidgeCV", "Lasso", "LassoCV",
+    "ElasticNet", "ElasticNetCV", "SGDRegressor",
+}
+CLASSIFIERS = {"LogisticRegression", "LogisticRegressionCV"}
+# TabModel methods whose overrides change what the compiled model would have to reproduce
+PREDICTION_HOOKS = ("_predict", "_predict_proba", "_transform_features", "_fit_features")
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    # exp(-log(1 + exp(-x))) does not overflow for large |x|
+    return np.exp(-np.logaddexp(0.0, -x))
+
+
+def _multiclass_link(estimator: Any) -> str:
+    """Return the link a multiclass logistic regression predicts with.
+
+    Follows scikit-learn's rule: with ``multi_class`` left at its default
+    ("auto", or "deprecated" from 1.5 on) the liblinear solver fits one-vs-rest
+    and every other solver a multinomial model.
+    """
+    multi_class = getattr(estimator, "multi_class", "auto")
+    if multi_class == "ovr":
+        return "ovr"
+    if multi_class in ("auto", "deprecated") and getattr(estimator, "solver", None) == "liblinear":
+        return "ovr"
+    return "softmax"
+
+
+def is_compilable(model: TabModel) -> bool:
+    """Return True if the class of ``model`` opted in to compilation.
+
+    A class opts in with ``compilable = True``, which asserts that its
+    ``_predict``/``_predict_proba`` are the plain ``link(X @ coef.T +
+    intercept)`` of ``model.model`` on ``_transform_features``. Subclasses
+    inherit the opt-in only if they override none of PREDICTION_HOOKS.
+    """
+    for cls in type(model).__mro__:
+        if "compilable" in vars(cls):
+            return bool(vars(cls)["compilable"])
+        if any(hook in vars(cls) for hook in PREDICTION_HOOKS):
+            return False
+    return False
+
+
+def compile_linear(model: TabModel) -> Optional[Dict[str, Any]]:
+    """Return the compiled state of a model, or None if it is not supported.
+
+    Supported are fitted TabRegression models with a single-target linear
+    regressor and TabClassification models with a logistic regression, in
+    ``model.model``, whose class opted in (see ``is_compilable``).
+    """
+    estimator = getattr(model, "model", None)
+    name = type(estimator).__name__
+    if not is_compilable(model):
+        return None
+    if not getattr(model, "fitted_", False) or not hasattr(estimator, "coef_"):
+        return None
+    coef = np.atleast_2d(np.asarray(estimator.coef_, dtype=np.float64))
+    intercept = np.atleast_1d(np.asarray(estimator.intercept_, dtype=np.float64))
+    classes = None
+    if isinstance(model, TabRegression) and name in REGRESSORS:
+        if coef.shape[0] != 1:
+            return None
+        kind, link = "regression", "identity"
+    elif isinstance(model, TabClassification) and name in CLASSIFIERS:
+        classes = np.asarray(estimator.classes_).tolist()
+        if len(classes) == 2:
+            link = "logistic"
+        else:
+            link = _multiclass_link(estimator)
+        kind = "classification"
+    else:
+        return None
+
+    schema = getattr(model, "feature_schema_", None)
+    encoder = getattr(model, "categorical_encoder_", None)
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "kind": kind,
+        "link": link,
+        "estimator": name,
+        "model_class": type(model).__name__,
+        "model_name": model.model_name,
+        "params": model.params,
+        "n_features": getattr(model, "n_features_", coef.shape[1]),
+        "feature_schema": schema.to_dict() if schema is not None else None,
+        "categorical_encoder": encoder.to_dict() if encoder is not None else None,
+        "classes": classes,
+    }
+    return {"coef": coef, "intercept": intercept, "meta": meta}
+
+
+def export_compiled(model: TabModel, model_dir: Path) -> Optional[Path]:
+    """Write ``compiled.npz`` for a supported model.
+
+    Returns:
+        Path of the written file, or None if the model is not supported
+    """
+    state = compile_linear(model)
+    if state is None:
+        return None
+    path = Path(model_dir) / COMPILED_FILE
+    tmp_file = path.with_suffix(".tmp.npz")
+    np.savez(tmp_file, coef=state["coef"], intercept=state["intercept"],
+             meta=np.array(json.dumps(state["meta"])))
+    tmp_file.replace(path)
+    return path
+
+
+class CompiledLinearModel:
+    """Prediction of compiled linear models; mixed into a TabModel."""
+
+    link = "identity"
+
+    def _set_state(self, coef: np.ndarray, intercept: np.ndarray, meta: Dict[str, Any]) -> None:
+        self.coef_ = coef
+        self.intercept_ = intercept
+        self.link = meta["link"]
+        self.model_name = meta["model_name"]
+        self.source_class = meta["model_class"]
+        self.estimator = meta["estimator"]
+        self.n_features_ = meta["n_features"]
+        self.feature_schema_ = (
+            FeatureSchema.from_dict(meta["feature_schema"]) if meta["feature_schema"] else None
+        )
+        self.categorical_encoder_ = (
+            CategoricalEncoder.from_dict(meta["categorical_encoder"]) if meta["categorical_encoder"] else None
+        )
+        self.fitted_ = True
+
+    def _decision(self, data: Any) -> np.ndarray:
+        """Return the (n_rows, n_outputs) linear scores of ``data``."""
+        X = self._transform_features(data, reuse=True)
+        scores = X @ self.coef_.T
+        return np.asarray(scores) + self.intercept_
+
+    def _train(self, train_data: Any, eval_data: Optional[Any] = None) -> None:
+        raise ValueError(f"Compiled {self.source_class} models cannot be trained; train {self.source_class}")
+
+
+class CompiledLinearRegression(CompiledLinearModel, TabRegression):
+    """TabRegression predicting with compiled linear coefficients."""
+
+    def _predict(self, data: Any) -> pd.DataFrame:
+        prediction = self._decision(data)[:, 0]
+        return self._with_predictions(data, {self.prediction_column: prediction})
+
+
+class CompiledLinearClassification(CompiledLinearModel, TabClassification):
+    """TabClassification predicting with compiled logistic regression coefficients."""
+
+    def _set_state(self, coef: np.ndarray, intercept: np.ndarray, meta: Dict[str, Any]) -> None:
+        super()._set_state(coef, intercept, meta)
+        self.classes_ = np.asarray(meta["classes"])
+
+    def _probabilities(self, scores: np.ndarray) -> np.ndarray:
+        """Return the (n_rows, n_classes) class probabilities of linear scores."""
+        if self.link == "logistic":
+            positive = _sigmoid(scores[:, 0])
+            return np.column_stack([1.0 - positive, positive])
+        if self.link == "ovr":
+            proba = _sigmoid(scores)
+            return proba / proba.sum(axis=1, keepdims=True)
+        scores = scores - scores.max(axis=1, keepdims=True)
+        proba = np.exp(scores)
+        return proba / proba.sum(axis=1, keepdims=True)
+
+    def _predict_proba(self, data: Any) -> np.ndarray:
+        return self._probabilities(self._decision(data))
+
+
+def load_compiled(path: Path) -> TabModel:
+    """Load a compiled model from ``compiled.npz``.
+
+    Raises:
+        ValueError: If the file has an unknown format version or kind
+    """
+    with np.load(path, allow_pickle=False) as arrays:
+        meta = json.loads(str(arrays["meta"]))
+        coef = arrays["coef"]
+        intercept = arrays["intercept"]
+    if meta.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported compiled model format: {meta.get('format_version')}")
+    if meta["kind"] == "regression":
+        model = CompiledLinearRegression(meta["params"])
+    elif meta["kind"] == "classification":
+        model = CompiledLinearClassification(meta["params"])
+    else:
+        raise ValueError(f"Unknown compiled model kind: {meta['kind']}")
+    model._set_state(coef, intercept, meta)
+    return model
+
+
+def main():
+    """Command line entry point compiling existing model artifacts."""
+    parser = argparse.ArgumentParser(description="Write compiled.npz for trained linear models")
+    parser.add_argument("model_dirs", nargs="+", help="Model directories containing model.joblib")
+    args = parser.parse_args()
+
+    import joblib
+
+    for model_dir in args.model_dirs:
+        model = joblib.load(Path(model_dir) / "model.joblib")
+        path = export_compiled(model, Path(model_dir)) if isinstance(model, TabModel) else None
+        print(f"{model_dir}: {path or 'not a supported linear model'}")
+
+
+if __name__ == "__main__":
+    main()
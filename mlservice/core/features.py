@@ -0,0 +1,252 @@
+"""
+Feature preparation for tabular models.
+"""
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+ENCODING_METHODS = ("ordinal", "onehot")
+# Feature matrices larger than this are never kept around for reuse
+BUFFER_MAX_BYTES = 64 * 1024 * 1024
+# Number of distinct input column layouts whose positions are cached
+MAX_CACHED_LAYOUTS = 32
+
+
+class CategoricalEncoder:
+    """Fitted encoder turning categorical columns into numeric features.
+
+    Categories are learned once by ``fit``; ``transform`` maps values to
+    category codes with a vectorized index lookup. Unseen values and missing
+    values map to code -1, which is kept as -1 by the ordinal method and
+    becomes an all-zero row by the one-hot method.
+
+    The ordinal method yields one dense float column per categorical column.
+    The one-hot method always yields a CSR sparse matrix, so high-cardinality
+    columns never expand into dense matrices.
+    """
+
+    def __init__(self, columns: List[str], method: str = "onehot"):
+        if method not in ENCODING_METHODS:
+            raise ValueError(f"Unknown categorical encoding '{method}', expected one of {ENCODING_METHODS}")
+        self.columns = list(columns)
+        self.method = method
+        self.categories_: Dict[str, pd.Index] = {}
+
+    def fit(self, data: pd.DataFrame) -> "CategoricalEncoder":
+        """Learn the categories of each column from training data."""
+        self.categories_ = {}
+        for column in self.columns:
+            values = pd.Index(pd.unique(data[column].dropna()))
+            try:
+                values = values.sort_values()
+            except TypeError:
+                pass
+            self.categories_[column] = values
+        return self
+
+    @property
+    def n_features(self) -> int:
+        """Return the number of output features."""
+        if self.method == "ordinal":
+            return len(self.columns)
+        return sum(len(categories) for categories in self.categories_.values())
+
+    @property
+    def feature_names(self) -> List[str]:
+        """Return the names of the output features."""
+        if self.method == "ordinal":
+            return list(self.columns)
+        return [
+            f"{column}={category}"
+            for column, categories in self.categories_.items()
+            for category in categories
+        ]
+
+    def codes(self, data: pd.DataFrame) -> np.ndarray:
+        """Return an (n_rows, n_columns) int array of category codes."""
+        if not self.categories_ and self.columns:
+            raise ValueError("CategoricalEncoder must be fitted before transform")
+        codes = np.empty((len(data), len(self.columns)), dtype=np.int64)
+        for i, column in enumerate(self.columns):
+            codes[:, i] = self.categories_[column].get_indexer(data[column])
+        return codes
+
+    def transform(self, data: pd.DataFrame) -> Union[np.ndarray, sp.csr_matrix]:
+        """Encode the categorical columns of ``data``.
+
+        Returns:
+            Dense float array for the ordinal method, CSR matrix for one-hot
+        """
+        codes = self.codes(data)
+        if self.method == "ordinal":
+            return codes.astype(np.float64)
+
+        n_rows = len(data)
+        offsets = np.cumsum([0] + [len(self.categories_[c]) for c in self.columns[:-1]])
+        known = codes >= 0
+        rows = np.broadcast_to(np.arange(n_rows)[:, None], codes.shape)[known]
+        cols = (codes + offsets)[known]
+        values = np.ones(len(rows), dtype=np.float64)
+        return sp.csr_matrix((values, (rows, cols)), shape=(n_rows, self.n_features))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a JSON-serialisable representation of the fitted encoder."""
+        return {
+            "columns": self.columns,
+            "method": self.method,
+            "categories": {
+                column: categories.tolist() for column, categories in self.categories_.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> "CategoricalEncoder":
+        """Rebuild a fitted encoder from ``to_dict`` output."""
+        encoder = cls(state["columns"], state["method"])
+        encoder.categories_ = {
+            column: pd.Index(categories) for column, categories in state["categories"].items()
+        }
+        return encoder
+
+
+class FeatureSchema:
+    """Compiled schema of the dense feature columns a model was trained on.
+
+    Holds the column order, the training dtypes and the output dtype of the
+    feature matrix. Positional indices into incoming frames are resolved and
+    validated once per distinct column layout and cached, so repeated
+    requests skip the per-column name scan.
+
+    ``matrix`` returns a view of the frame's data when the features are the
+    whole frame in training order with a single matching dtype. Otherwise
+    columns are copied once, straight into a contiguous Fortran-ordered
+    matrix of the output dtype; with ``reuse=True`` that matrix is a view of
+    a per-thread buffer which is recycled by the next ``reuse=True`` call on
+    the same thread, so callers must not keep it. Columns whose dtype cannot
+    be cast to the output dtype within its kind (e.g. strings or objects for
+    a float schema) are rejected.
+    """
+
+    def __init__(self, columns: Sequence[str], dtypes: Sequence[Any]):
+        self.columns = list(columns)
+        self.dtypes = [np.dtype(dtype) for dtype in dtypes]
+        for column, dtype in zip(self.columns, self.dtypes):
+            if dtype.kind not in "biuf":
+                raise ValueError(
+                    f"Feature column '{column}' has non-numeric dtype {dtype}; "
+                    "list it in columns.categorical to encode it"
+                )
+        self.dtype = np.result_type(*self.dtypes) if self.dtypes else np.dtype(np.float64)
+        if self.dtype.kind in "biu":
+            self.dtype = np.dtype(np.float64)
+        self._init_cache()
+
+    def _init_cache(self) -> None:
+        self._positions: Dict[Tuple, np.ndarray] = {}
+        self._local = threading.local()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"columns": self.columns, "dtypes": self.dtypes, "dtype": self.dtype}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._init_cache()
+
+    @classmethod
+    def from_frame(cls, data: pd.DataFrame, columns: Sequence[str]) -> "FeatureSchema":
+        """Compile the schema of ``columns`` as they appear in ``data``."""
+        dtypes = data.dtypes
+        return cls(columns, [_numpy_dtype(dtypes[column]) for column in columns])
+
+    def positions(self, frame_columns: pd.Index) -> np.ndarray:
+        """Return the positional index of every feature column in a frame.
+
+        Raises:
+            ValueError: If feature columns are missing or duplicated
+        """
+        key = tuple(frame_columns)
+        positions = self._positions.get(key)
+        if positions is None:
+            if not frame_columns.is_unique:
+                raise ValueError("Input data has duplicate column names")
+            positions = frame_columns.get_indexer(self.columns)
+            missing = [col for col, pos in zip(self.columns, positions) if pos < 0]
+            if missing:
+                raise ValueError(f"Input data is missing feature columns: {missing}")
+            if len(self._positions) >= MAX_CACHED_LAYOUTS:
+                self._positions.clear()
+            self._positions[key] = positions
+        return positions
+
+    def matrix(self, data: pd.DataFrame, reuse: bool = False) -> np.ndarray:
+        """Return the (n_rows, n_features) feature matrix of ``data``."""
+        positions = self.positions(data.columns)
+        n_rows = len(data)
+        if (
+            len(positions) == data.shape[1]
+            and np.array_equal(positions, np.arange(len(positions)))
+            and all(_numpy_dtype(dtype) == self.dtype for dtype in data.dtypes)
+        ):
+            return data.to_numpy(dtype=self.dtype, copy=False)
+
+        out = self._buffer(n_rows) if reuse else None
+        if out is None:
+            out = np.empty((n_rows, len(self.columns)), dtype=self.dtype, order="F")
+        for j, position in enumerate(positions):
+            column = data.iloc[:, position]
+            dtype = _numpy_dtype(column.dtype)
+            if not np.can_cast(dtype, self.dtype, casting="same_kind"):
+                raise ValueError(
+                    f"Feature column '{self.columns[j]}' has dtype {dtype}, "
+                    f"expected one castable to {self.dtype} (trained on {self.dtypes[j]})"
+                )
+            out[:, j] = column.to_numpy()
+        return out
+
+    def _buffer(self, n_rows: int) -> Optional[np.ndarray]:
+        """Return a contiguous (n_rows, n_features) Fortran-ordered view of a recycled buffer."""
+        size = n_rows * len(self.columns)
+        if size * self.dtype.itemsize > BUFFER_MAX_BYTES:
+            return None
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None or buffer.size < size:
+            buffer = np.empty(size, dtype=self.dtype)
+            self._local.buffer = buffer
+        return buffer[:size].reshape((n_rows, len(self.columns)), order="F")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a JSON-serialisable representation of the schema."""
+        return {"columns": self.columns, "dtypes": [dtype.str for dtype in self.dtypes]}
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> "FeatureSchema":
+        """Rebuild a schema from ``to_dict`` output."""
+        return cls(state["columns"], state["dtypes"])
+
+
+def _numpy_dtype(dtype: Any) -> np.dtype:
+    """Return the NumPy dtype a pandas column converts to."""
+    if isinstance(dtype, np.dtype):
+        return dtype
+    numpy_dtype = getattr(dtype, "numpy_dtype", None)
+    if numpy_dtype is not None:
+        return np.dtype(numpy_dtype)
+    return np.dtype(object)
+
+
+def combine_features(
+    numeric: np.ndarray,
+    encoded: Optional[Union[np.ndarray, sp.spmatrix]],
+) -> Union[np.ndarray, sp.csr_matrix]:
+    """Append encoded categorical features to the numeric feature matrix.
+
+    The result is sparse whenever ``encoded`` is sparse, dense otherwise.
+    """
+    if encoded is None:
+        return numeric
+    if sp.issparse(encoded):
+        return sp.hstack([sp.csr_matrix(numeric), encoded], format="csr")
+    return np.hstack([numeric, encoded])
@@ -0,0 +1,108 @@
+"""
+Event-loop health monitoring.
+
+A task on the event loop sleeps for a fixed interval and records how much
+later than scheduled it wakes up. That scheduling lag is what every request
+waits on top of its own work while a handler blocks the loop, and is
+exported as ``mlservice_event_loop_lag_seconds``.
+
+With a block threshold set, a watchdog thread also notices when the loop
+has not run the task for longer than the threshold and, while the loop is
+still blocked, captures the stack of the event-loop thread. The stack is
+printed and kept in ``LoopMonitor.reports``, pointing at the handler that
+blocks the loop.
+"""
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, Optional
+
+from .metrics import EVENT_LOOP_BLOCKED_TOTAL, EVENT_LOOP_LAG_SECONDS
+
+BLOCK_THRESHOLD_ENV = "MLSERVICE_LOOP_BLOCK_THRESHOLD"
+# Seconds between lag measurements
+DEFAULT_LAG_INTERVAL = 0.1
+DEFAULT_MAX_REPORTS = 100
+
+
+class LoopMonitor:
+    """Measures event-loop lag and reports the stacks of blocking code.
+
+    Args:
+        interval: Seconds between lag measurements
+        max_reports: Number of blocking reports kept in ``reports``
+    """
+
+    def __init__(self, interval: float = DEFAULT_LAG_INTERVAL, max_reports: int = DEFAULT_MAX_REPORTS):
+        self.interval = interval
+        self.block_threshold: Optional[float] = None
+        self.reports: Deque[Dict[str, Any]] = deque(maxlen=max_reports)
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._loop_thread: Optional[int] = None
+        self._last_beat = time.monotonic()
+
+    async def _measure(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            self._last_beat = time.monotonic()
+            due = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            EVENT_LOOP_LAG_SECONDS.observe(max(loop.time() - due, 0.0))
+
+    def _watch(self) -> None:
+        reported = None
+        while not self._stop.wait(min(self.block_threshold / 2, self.interval)):
+            beat = self._last_beat
+            blocked = time.monotonic() - beat - self.interval
+            if blocked <= self.block_threshold or beat == reported:
+                continue
+            # Report each blocking episode once, while it is still blocking
+            reported = beat
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            stack = "".join(traceback.format_stack(frame))
+            self.reports.append({
+                "timestamp": datetime.now().isoformat(),
+                "blocked_seconds": round(blocked, 3),
+                "stack": stack,
+            })
+            EVENT_LOOP_BLOCKED_TOTAL.inc()
+            print(f"Warning: Event loop blocked for more than {blocked:.3f}s in:\n{stack}", end="")
+
+    def start(self, block_threshold: Optional[float] = None) -> None:
+        """Start measuring on the running event loop.
+
+        Args:
+            block_threshold: Seconds the loop may be blocked before the stack
+                of the blocking code is captured, or None to only measure lag
+        """
+        if self._task is not None:
+            return
+        self._loop_thread = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._task = asyncio.get_running_loop().create_task(self._measure())
+        self.block_threshold = block_threshold
+        if block_threshold:
+            self._stop.clear()
+            self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._watchdog.start()
+
+    def stop(self) -> None:
+        """Stop measuring and stop the watchdog thread."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._watchdog is not None:
+            self._stop.set()
+            self._watchdog.join()
+            self._watchdog = None
+
+
+loop_monitor = LoopMonitor()
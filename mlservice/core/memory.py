@@ -0,0 +1,205 @@
+"""
+Memory accounting for model operations.
+
+``record_memory`` wraps one train/predict call and reports the resident
+memory of the process before and after it. ``memory_phase`` wraps the
+phases of the call and reports their RSS growth. When tracemalloc is on
+(``PYTHONTRACEMALLOC=1`` or ``python -X tracemalloc``) phases also report
+their peak Python allocation and the source lines whose allocations grew
+the most.
+
+With ``MLSERVICE_TRACK_PEAK_RSS=1`` the call's peak RSS is reported as
+well (Linux). The peak is a process-wide counter reset at the start of
+every call, so concurrent requests reset each other's peaks; enable it
+only while one request runs at a time, e.g. when benchmarking.
+
+Memory is measured per process, so requests running concurrently in the
+same worker are counted in each other's numbers.
+"""
+import os
+import sys
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+from .metrics import OPERATION_PEAK_RSS_BYTES, PHASE_PEAK_TRACED_BYTES
+
+TOP_ALLOCATIONS_ENV = "MLSERVICE_TRACEMALLOC_TOP"
+TRACK_PEAK_RSS_ENV = "MLSERVICE_TRACK_PEAK_RSS"
+DEFAULT_TOP_ALLOCATIONS = 5
+
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+)
+
+
+def rss_bytes() -> int:
+    """Return the resident set size of the current process in bytes.
+
+    Reads /proc on Linux; elsewhere falls back to the peak RSS reported by
+    ``resource.getrusage``.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS, in kilobytes elsewhere
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Return the peak resident set size since the last ``reset_peak_rss``.
+
+    Returns:
+        Peak RSS in bytes, or None where /proc is not available
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def reset_peak_rss() -> bool:
+    """Reset the peak RSS of the process to its current RSS.
+
+    Returns:
+        True if the kernel supports resetting it (Linux 4.0+)
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def top_allocations(before: tracemalloc.Snapshot, after: tracemalloc.Snapshot,
+                    limit: int = DEFAULT_TOP_ALLOCATIONS) -> List[Dict[str, Any]]:
+    """Return the source lines whose live allocations grew the most.
+
+    Args:
+        before: Snapshot taken at the start of the phase
+        after: Snapshot taken at its end
+        limit: Number of lines to return
+
+    Returns:
+        List of {"site": "file:line", "size": bytes, "count": blocks},
+        largest growth first
+    """
+    after = after.filter_traces(_SNAPSHOT_FILTERS)
+    before = before.filter_traces(_SNAPSHOT_FILTERS)
+    sites = []
+    for stat in after.compare_to(before, "lineno")[:limit]:
+        if stat.size_diff <= 0:
+            break
+        frame = stat.traceback[0]
+        sites.append({
+            "site": f"{frame.filename}:{frame.lineno}",
+            "size": stat.size_diff,
+            "count": stat.count_diff,
+        })
+    return sites
+
+
+# Memory usage of the current model operation
+_memory: ContextVar[Optional[Dict[str, Any]]] = ContextVar("mlservice_memory", default=None)
+
+
+@contextmanager
+def record_memory(model: Optional[str], operation: str) -> Iterator[Dict[str, Any]]:
+    """Collect the memory usage of one model operation and its phases.
+
+    The yielded dict is filled in when the block exits::
+
+        {"rss_before": ..., "rss_after": ..., "peak_rss": ...,
+         "phases": {"load_data": {"rss_delta": ..., "peak_traced": ...,
+                                  "top_allocations": [...]}, ...}}
+
+    ``peak_rss`` is only present with ``MLSERVICE_TRACK_PEAK_RSS=1`` and
+    where the peak can be reset per operation.
+    """
+    peak_known = (
+        os.getenv(TRACK_PEAK_RSS_ENV) == "1" and reset_peak_rss() and peak_rss_bytes() is not None
+    )
+    usage: Dict[str, Any] = {"rss_before": rss_bytes(), "phases": {}}
+    token = _memory.set(usage)
+    try:
+        yield usage
+    finally:
+        _memory.reset(token)
+        usage["rss_after"] = rss_bytes()
+        if peak_known:
+            usage["peak_rss"] = max(peak_rss_bytes() or 0, usage["rss_before"], usage["rss_after"])
+            OPERATION_PEAK_RSS_BYTES.observe(usage["peak_rss"], model=model or "", operation=operation)
+
+
+# Memory of the datasets loaded by the current model operation, by split
+_data_memory: ContextVar[Optional[Dict[str, Any]]] = ContextVar("mlservice_data_memory", default=None)
+
+
+@contextmanager
+def record_data_memory() -> Iterator[Dict[str, Any]]:
+    """Collect the memory of datasets loaded within the block, by split.
+
+    Kept per call rather than on the model, since cached models serve
+    concurrent requests.
+    """
+    usage: Dict[str, Any] = {}
+    token = _data_memory.set(usage)
+    try:
+        yield usage
+    finally:
+        _data_memory.reset(token)
+
+
+def add_data_memory(split: str, before: int, after: int) -> None:
+    """Record the memory of a dataset before and after post-processing it."""
+    usage = _data_memory.get()
+    if usage is not None:
+        usage[split] = {"before": before, "after": after}
+
+
+@contextmanager
+def memory_phase(model: Optional[str], operation: str, name: str) -> Iterator[None]:
+    """Record the memory usage of one phase of a model operation.
+
+    Outside ``record_memory`` and without tracemalloc nothing is measured.
+    """
+    tracing = tracemalloc.is_tracing()
+    if not tracing and _memory.get() is None:
+        yield
+        return
+    limit = int(os.getenv(TOP_ALLOCATIONS_ENV, DEFAULT_TOP_ALLOCATIONS))
+    snapshot = None
+    rss_before = rss_bytes()
+    if tracing:
+        if limit > 0:
+            snapshot = tracemalloc.take_snapshot()
+        # Baseline taken last, so the snapshot is not counted in the phase
+        tracemalloc.reset_peak()
+        traced_before = tracemalloc.get_traced_memory()[0]
+    try:
+        yield
+    finally:
+        stats: Dict[str, Any] = {"rss_delta": rss_bytes() - rss_before}
+        if tracing and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            stats["peak_traced"] = max(peak - traced_before, 0)
+            stats["traced_delta"] = current - traced_before
+            PHASE_PEAK_TRACED_BYTES.observe(stats["peak_traced"], model=model or "",
+                                            operation=operation, phase=name)
+            if snapshot is not None:
+                stats["top_allocations"] = top_allocations(snapshot, tracemalloc.take_snapshot(), limit)
+        usage = _memory.get()
+        if usage is not None:
+            usage["phases"][name] = stats
@@ -0,0 +1,521 @@
+"""
+In-process metrics with Prometheus text exposition.
+
+Counters, gauges and histograms are kept in memory per process. When
+``MLSERVICE_METRICS_DIR`` is set (the production server sets it for its
+workers), every process also writes a snapshot of its values to
+``<dir>/<pid>.json`` at most every ``MLSERVICE_METRICS_FLUSH_INTERVAL``
+seconds and at exit, and ``/metrics`` merges the snapshots of all processes:
+counters and histograms are summed, including those of exited (recycled)
+workers so totals never go backwards, while gauges only count live
+processes.
+"""
+import atexit
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+METRICS_DIR_ENV = "MLSERVICE_METRICS_DIR"
+FLUSH_INTERVAL_ENV = "MLSERVICE_METRICS_FLUSH_INTERVAL"
+DEFAULT_FLUSH_INTERVAL = 1.0
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers millisecond predictions up to multi-minute training runs
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0,
+)
+
+# Bytes; 1MiB to 64GiB in powers of 4
+MEMORY_BUCKETS = tuple(float(4 ** i * 1024 * 1024) for i in range(9))
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class Metric:
+    """Base class of metrics with a fixed set of label names."""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"Metric {self.name} expects labels {self.labelnames}, got {sorted(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values = {}
+
+    def snapshot(self) -> List[list]:
+        """Return [label values, value] pairs as JSON-serialisable lists."""
+        with self._lock:
+            return [[list(key), value] for key, value in self._values.items()]
+
+
+class Counter(Metric):
+    """Monotonically increasing value."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+        _mark_dirty()
+
+
+class Gauge(Metric):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+        _mark_dirty()
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+        _mark_dirty()
+
+    @contextmanager
+    def track_inprogress(self, **labels: str) -> Iterator[None]:
+        """Increment the gauge for the duration of the block."""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(Metric):
+    """Distribution of observations over cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket (non-cumulative) counts, +Inf last, then sum
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            counts = state[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            state[1] += value
+        _mark_dirty()
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the duration of the block in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self) -> List[list]:
+        with self._lock:
+            return [[list(key), [list(counts), total]] for key, (counts, total) in self._values.items()]
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together in the text format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._flusher: Optional[threading.Thread] = None
+
+    def _register(self, metric: Metric) -> Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} is already registered differently")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def reset(self) -> None:
+        """Zero every metric of this process."""
+        for metric in list(self._metrics.values()):
+            metric.reset()
+
+    @staticmethod
+    def metrics_dir() -> Optional[Path]:
+        """Return the shared snapshot directory, or None in single-process mode."""
+        path = os.getenv(METRICS_DIR_ENV)
+        return Path(path) if path else None
+
+    def snapshot(self) -> Dict[str, List[list]]:
+        return {name: metric.snapshot() for name, metric in list(self._metrics.items())}
+
+    def mark_dirty(self) -> None:
+        if self._dirty:
+            return
+        self._dirty = True
+        if self.metrics_dir() is not None and (self._flusher is None or not self._flusher.is_alive()):
+            with self._lock:
+                if self._flusher is None or not self._flusher.is_alive():
+                    self._flusher = threading.Thread(target=self._flush_loop, name="metrics-flush", daemon=True)
+                    self._flusher.start()
+
+    def _flush_loop(self) -> None:
+        interval = float(os.getenv(FLUSH_INTERVAL_ENV, DEFAULT_FLUSH_INTERVAL))
+        while True:
+            time.sleep(interval)
+            self.flush()
+
+    def flush(self) -> None:
+        """Write this process's snapshot to the metrics directory, if any."""
+        directory = self.metrics_dir()
+        if directory is None or not self._dirty:
+            return
+        self._dirty = False
+        pid = os.getpid()
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            tmp_file = directory / f"{pid}.json.tmp"
+            with open(tmp_file, "w") as f:
+                json.dump(self.snapshot(), f)
+            os.replace(tmp_file, directory / f"{pid}.json")
+        except OSError as e:
+            self._dirty = True
+            print(f"Warning: Could not write metrics snapshot to {directory}: {e}")
+
+    def _after_fork(self) -> None:
+        """Start a forked worker from zero; the parent keeps reporting its own values."""
+        # Locks may have been held by other threads of the parent at fork time
+        self._lock = threading.Lock()
+        for metric in self._metrics.values():
+            metric._lock = threading.Lock()
+            metric._values = {}
+        self._dirty = False
+        self._flusher = None
+
+    def _snapshots(self) -> List[Tuple[bool, Dict[str, List[list]]]]:
+        """Return (alive, snapshot) of every process, this one live."""
+        snapshots = [(True, self.snapshot())]
+        directory = self.metrics_dir()
+        if directory is None:
+            return snapshots
+        own = os.getpid()
+        for file in directory.glob("*.json"):
+            try:
+                pid = int(file.stem)
+            except ValueError:
+                continue
+            if pid == own:
+                continue
+            try:
+                with open(file) as f:
+                    snapshots.append((_pid_alive(pid), json.load(f)))
+            except (OSError, ValueError):
+                continue
+        return snapshots
+
+    def render(self) -> str:
+        """Return all metrics, merged across processes, in the text format."""
+        snapshots = self._snapshots()
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            merged: Dict[Tuple[str, ...], object] = {}
+            for alive, snapshot in snapshots:
+                if metric.kind == "gauge" and not alive:
+                    continue
+                for key, value in snapshot.get(name, []):
+                    key = tuple(key)
+                    if metric.kind == "histogram":
+                        counts, total = value
+                        state = merged.setdefault(key, [[0] * len(counts), 0.0])
+                        if len(state[0]) != len(counts):
+                            continue
+                        state[0] = [a + b for a, b in zip(state[0], counts)]
+                        state[1] += total
+                    else:
+                        merged[key] = merged.get(key, 0.0) + value
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for key in sorted(merged):
+                labels = _format_labels(metric.labelnames, key)
+                if metric.kind == "histogram":
+                    counts, total = merged[key]
+                    cumulative = 0
+                    for bound, count in zip(list(metric.buckets) + [math.inf], counts):
+                        cumulative += count
+                        bucket_labels = _format_labels(
+                            metric.labelnames + ("le",), key + (_format_value(bound),)
+                        )
+                        lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+                    lines.append(f"{name}_sum{labels} {_format_value(total)}")
+                    lines.append(f"{name}_count{labels} {cumulative}")
+                else:
+                    lines.append(f"{name}{labels} {_format_value(merged[key])}")
+        return "\n".join(lines) + "\n"
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def clear_metrics_dir() -> None:
+    """Remove snapshots left by previous runs; call once before starting workers."""
+    directory = MetricsRegistry.metrics_dir()
+    if directory is None or not directory.exists():
+        return
+    for file in directory.glob("*.json*"):
+        try:
+            file.unlink()
+        except OSError:
+            pass
+
+
+metrics_registry = MetricsRegistry()
+
+
+def _mark_dirty() -> None:
+    metrics_registry.mark_dirty()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=metrics_registry._after_fork)
+atexit.register(metrics_registry.flush)
+
+
+HTTP_REQUEST_SECONDS = metrics_registry.histogram(
+    "mlservice_http_request_duration_seconds",
+    "HTTP request latency by route template, model and status code",
+    ("method", "route", "model", "status"),
+)
+HTTP_REQUESTS_IN_PROGRESS = metrics_registry.gauge(
+    "mlservice_http_requests_in_progress",
+    "HTTP requests currently being served",
+    ("method",),
+)
+MODEL_REQUESTS_IN_PROGRESS = metrics_registry.gauge(
+    "mlservice_model_requests_in_progress",
+    "Model train/predict/eval requests currently being served",
+    ("model", "operation"),
+)
+PHASE_SECONDS = metrics_registry.histogram(
+    "mlservice_phase_duration_seconds",
+    "Duration of the phases of MLModel.train/predict/evaluate",
+    ("model", "operation", "phase"),
+)
+MODEL_LOAD_SECONDS = metrics_registry.histogram(
+    "mlservice_model_load_duration_seconds",
+    "Time to load a model artifact from disk",
+    ("model_class",),
+)
+DATA_LOAD_SECONDS = metrics_registry.histogram(
+    "mlservice_data_load_duration_seconds",
+    "Time to load a dataset by file format",
+    ("format",),
+)
+PHASE_PEAK_TRACED_BYTES = metrics_registry.histogram(
+    "mlservice_phase_peak_traced_bytes",
+    "Peak Python allocations during a phase of MLModel.train/predict/evaluate, when tracemalloc is on",
+    ("model", "operation", "phase"),
+    buckets=MEMORY_BUCKETS,
+)
+OPERATION_PEAK_RSS_BYTES = metrics_registry.histogram(
+    "mlservice_operation_peak_rss_bytes",
+    "Peak resident memory of the process during MLModel.train/predict/evaluate",
+    ("model", "operation"),
+    buckets=MEMORY_BUCKETS,
+)
+EVENT_LOOP_LAG_SECONDS = metrics_registry.histogram(
+    "mlservice_event_loop_lag_seconds",
+    "Delay between when a timer on the event loop was due and when it ran",
+)
+EVENT_LOOP_BLOCKED_TOTAL = metrics_registry.counter(
+    "mlservice_event_loop_blocked_total",
+    "Times the event loop was blocked for longer than the block threshold",
+)
+
+
+
+MODEL_OPERATIONS = ("train", "predict", "eval")
+
+
+def _route_labels(scope: Dict[str, Any]) -> Tuple[str, str]:
+    """Return the (route template, model name) labels of a routed request.
+
+    Unmatched paths are reported as 'unmatched' so arbitrary URLs do not
+    create new label values.
+    """
+    from .registry import registry
+
+    route = scope.get("route")
+    template = getattr(route, "path", None) or "unmatched"
+    model = ""
+    if template.startswith("/model/"):
+        prefix, _, operation = template.rpartition("/")
+        if operation in MODEL_OPERATIONS:
+            model = scope.get("path_params", {}).get("model_name") or prefix[len("/model/"):]
+            if not registry.has_model(model):
+                model = "unknown"
+    return template, model
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency and in-flight HTTP requests.
+
+    Phases recorded while handling a request (see ``phase``) are returned in
+    a ``Server-Timing`` response header.
+    """
+
+    def __init__(self, app: Callable):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        status = 500
+        start = time.perf_counter()
+        timings: List[Tuple[str, float]] = []
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if timings:
+                    header = server_timing(timings, time.perf_counter() - start)
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"server-timing", header.encode("latin-1"))
+                    ]
+            await send(message)
+
+        HTTP_REQUESTS_IN_PROGRESS.inc(method=method)
+        token = _timings.set(timings)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _timings.reset(token)
+            HTTP_REQUESTS_IN_PROGRESS.dec(method=method)
+            route, model = _route_labels(scope)
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - start, method=method, route=route, model=model, status=str(status)
+            )
+
+
+# Phase timings of the current request or recording, as (phase, seconds)
+_timings: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("mlservice_timings", default=None)
+
+
+def observe_phase(model: Optional[str], operation: str, name: str, seconds: float) -> None:
+    """Record a phase duration in the phase histogram and the current timings."""
+    PHASE_SECONDS.observe(seconds, model=model or "", operation=operation, phase=name)
+    timings = _timings.get()
+    if timings is not None:
+        timings.append((name, seconds))
+
+
+@contextmanager
+def phase(model: Optional[str], operation: str, name: str) -> Iterator[None]:
+    """Record the duration of one phase of a model operation."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_phase(model, operation, name, time.perf_counter() - start)
+
+
+@contextmanager
+def record_timings() -> Iterator[List[Tuple[str, float]]]:
+    """Collect the phases recorded in the block.
+
+    Phases are also passed on to an enclosing recording, such as the one of
+    the current HTTP request.
+    """
+    outer = _timings.get()
+    timings: List[Tuple[str, float]] = []
+    token = _timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _timings.reset(token)
+        if outer is not None:
+            outer.extend(timings)
+
+
+def summarize_timings(timings: Sequence[Tuple[str, float]]) -> Dict[str, float]:
+    """Return total seconds per phase, in the order phases first ran."""
+    totals: Dict[str, float] = {}
+    for name, seconds in timings:
+        totals[name] = totals.get(name, 0.0) + seconds
+    return {name: round(seconds, 6) for name, seconds in totals.items()}
+
+
+def server_timing(timings: Sequence[Tuple[str, float]], total: Optional[float] = None) -> str:
+    """Format phase timings as a Server-Timing header value (durations in ms)."""
+    entries = [f"{name};dur={seconds * 1000:.3f}" for name, seconds in summarize_timings(timings).items()]
+    if total is not None:
+        entries.append(f"total;dur={total * 1000:.3f}")
+    return ", ".join(entries)
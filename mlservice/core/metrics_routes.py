@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from .metrics import metrics_registry, CONTENT_TYPE
+
+router = APIRouter()
+
+@router.get("/metrics", tags=["General"])
+def metrics():
+    """Prometheus text exposition of the metrics of all worker processes."""
+    return Response(metrics_registry.render(), media_type=CONTENT_TYPE)
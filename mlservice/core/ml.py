@@ -1,17 +1,23 @@
 import os
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 from datetime import datetime
 import pickle
+import time
 import traceback
 import uuid
 import json
 from pathlib import Path
-from typing import Optional, Union, Dict, Any, Type
+from typing import Optional, Union, Dict, Any, Type, Callable
 
-import joblib
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from .utils import load_data, load_model
+from fastapi.concurrency import run_in_threadpool
+from .model_index import ModelIndex
+from .model_cache import model_cache
+from .aliases import resolve_model_path
+from .memory import memory_phase, record_data_memory, record_memory
+from .metrics import MODEL_REQUESTS_IN_PROGRESS, observe_phase, phase, record_timings, summarize_timings
 
 
 
@@ -23,10 +29,12 @@ class TrainRequest(BaseModel):
 
 class PredictRequest(BaseModel):
     data_path: str
+    # Model directory or alias such as "sklearn/ridge@production"
     model_path: str
 
 class EvalRequest(BaseModel):
     data_path: str
+    # Model directory or alias such as "sklearn/ridge@production"
     model_path: str
 
 def model_endpoints(model_name: str):
@@ -44,7 +52,7 @@ def model_endpoints(model_name: str):
         return model_class
     return decorator
 
-def create_model_endpoints(model_class: Type["MLModel"], model_name: str) -> APIRouter:
+def create_model_endpoints(model_class: Type["MLModel"], model_name: str) -> Optional[APIRouter]:
     """
     Create FastAPI endpoints for an MLModel class and register them with registry.
     
@@ -53,76 +61,156 @@ def create_model_endpoints(model_class: Type["MLModel"], model_name: str) -> API
         model_name: Name of the model for URL paths
         
     Returns:
-        FastAPI router with /train, /predict, and /eval endpoints
+        FastAPI router with /train, /predict, and /eval endpoints, or None in
+        catalog routing mode, where the catalog routes serve every model
     """
     from mlservice.core.registry import registry
     
+    # Default name for models used directly; endpoints name each instance
+    # they train, so a class registered under several names, or a subclass
+    # of a registered class, reports the name it was requested under
+    if "model_name" not in vars(model_class):
+        model_class.model_name = model_name
+    if registry.routing == "catalog":
+        registry.register_model_class(model_name, model_class)
+        return None
+    router = _model_router(lambda: model_class, model_name)
+    # Lazily registered models already have their routes in the registry
+    if not registry.is_lazy_model(model_name):
+        registry.add_router_routes(router, model_name)
+    registry.register_model_class(model_name, model_class)
+    return router
+
+def _model_router(get_model_class: Callable[[], Type["MLModel"]], model_name: str) -> APIRouter:
+    """
+    Build the /train, /predict and /eval endpoints of a model.
+    
+    Args:
+        get_model_class: Returns the MLModel class; called when a model is trained
+        model_name: Name of the model for URL paths
+        
+    Returns:
+        FastAPI router with /train, /predict, and /eval endpoints
+    """
     router = APIRouter(prefix=f"/model/{model_name}")
     
     @router.post("/train", tags=["ML Model"])
     async def train_model(request: TrainRequest):
-        try:
+        return _train(model_name, get_model_class, request)
+    
+    @router.post("/predict", tags=["ML Model"])
+    async def predict(request: PredictRequest):
+        return _predict(model_name, await _resolve(request.model_path), request)
+    
+    @router.post("/eval", tags=["ML Model"])
+    async def evaluate(request: EvalRequest):
+        return _evaluate(model_name, await _resolve(request.model_path), request)
+    
+    return router
+
+def catalog_router() -> APIRouter:
+    """
+    Build one set of /model/{model_name}/train|predict|eval endpoints for all models.
+    
+    The model class is looked up in the registry per request, so the route
+    table stays the same size however many models are registered.
+    
+    Returns:
+        FastAPI router with the catalog dispatch endpoints
+    """
+    from mlservice.core.registry import registry
+
+    router = APIRouter(prefix="/model")
+
+    def model_class_getter(model_name: str) -> Callable[[], Type["MLModel"]]:
+        if not registry.has_model(model_name):
+            raise HTTPException(status_code=404, detail=f"Model {model_name} not found")
+        return lambda: registry.get_model_class(model_name)
+
+    @router.post("/{model_name:path}/train", tags=["ML Model"])
+    async def train_model(model_name: str, request: TrainRequest):
+        return _train(model_name, model_class_getter(model_name), request)
+
+    @router.post("/{model_name:path}/predict", tags=["ML Model"])
+    async def predict(model_name: str, request: PredictRequest):
+        model_class_getter(model_name)
+        return _predict(model_name, await _resolve(request.model_path), request)
+
+    @router.post("/{model_name:path}/eval", tags=["ML Model"])
+    async def evaluate(model_name: str, request: EvalRequest):
+        model_class_getter(model_name)
+        return _evaluate(model_name, await _resolve(request.model_path), request)
+
+    return router
+
+def _train(model_name: str, get_model_class: Callable[[], Type["MLModel"]],
+           request: TrainRequest) -> Dict[str, Any]:
+    try:
+        model_class = get_model_class()
+        with MODEL_REQUESTS_IN_PROGRESS.track_inprogress(model=model_name, operation="train"):
             model = model_class(request.params)
+            model.model_name = model_name
             result = model.train(
                 train_path=request.train_path,
                 eval_path=request.eval_path,
                 test_path=request.test_path
             )
-            return result
-        except Exception as e:
-            traceback.print_exc()
-            raise HTTPException(status_code=500, detail=str(e))
-    
-    @router.post("/predict", tags=["ML Model"])
-    async def predict(request: PredictRequest):
-        try:
-            # Load latest model
-            model = load_model(request.model_path)
+        return result
+    except Exception as e:
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def _resolve(model_path: str) -> str:
+    # Alias refreshes read the model index, so they run off the event loop
+    try:
+        return await run_in_threadpool(resolve_model_path, model_path)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+    except ValueError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _predict(model_name: str, model_path: str, request: PredictRequest) -> str:
+    try:
+        # Pin the current model so a hot-swap cannot release it mid-request
+        start = time.perf_counter()
+        with MODEL_REQUESTS_IN_PROGRESS.track_inprogress(model=model_name, operation="predict"), \
+                model_cache.acquire(model_path) as model:
+            observe_phase(model_name, "predict", "load_model", time.perf_counter() - start)
             if not isinstance(model, MLModel):
                 raise ValueError(f"Loaded object is not an MLModel instance: {type(model)}")
             if not model:
                 raise HTTPException(status_code=404, detail=f"Model {model_name} not found")
             result = model.predict(data=request.data_path)
-            return result
-        except Exception as e:
-            traceback.print_exc()
-            raise HTTPException(status_code=500, detail=str(e))
-    
-    @router.post("/eval", tags=["ML Model"])
-    async def evaluate(request: EvalRequest):
-        try:
-            # Load latest model
-            model = load_model(request.model_path)
+        return result
+    except Exception as e:
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _evaluate(model_name: str, model_path: str, request: EvalRequest) -> Dict[str, Any]:
+    try:
+        # Pin the current model so a hot-swap cannot release it mid-request
+        start = time.perf_counter()
+        with MODEL_REQUESTS_IN_PROGRESS.track_inprogress(model=model_name, operation="eval"), \
+                model_cache.acquire(model_path) as model:
+            observe_phase(model_name, "evaluate", "load_model", time.perf_counter() - start)
             if not isinstance(model, MLModel):
                 raise ValueError("Loaded object is not an MLModel instance")
             if not model:
                 raise HTTPException(status_code=404, detail=f"Model {model_name} not found")
             result = model.evaluate(data=request.data_path)
-            return result
-        except Exception as e:
-            traceback.print_exc()
-            raise HTTPException(status_code=500, detail=str(e))
-    
-    # Register routes in registry system
-    for route in router.routes:
-        methods = list(route.methods)  # Convert set to list
-        registry._routes.append({
-            'path': route.path_format,
-            'methods': methods,
-            'handler': route.endpoint,
-            'kwargs': {
-                'response_model': route.response_model,
-                'status_code': route.status_code,
-                'tags': route.tags
-            }
-        })
-    
-    return router
+        return result
+    except Exception as e:
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
 
 
 
 class MLModel(ABC):
     """Base class for ML models with training, prediction, and evaluation capabilities."""
+
+    # Name used in the URL paths; set per instance by the train endpoint,
+    # with a class default set by create_model_endpoints
+    model_name: Optional[str] = None
     
     def __init__(self, params: Optional[Union[str|dict]] = None):
         if params is None:
@@ -132,6 +220,11 @@ class MLModel(ABC):
         self.params = params
         self.fitted_ = False
     
+    @property
+    def model_version(self) -> str:
+        """Return the model version, taken from params["version"]."""
+        return str(self.params.get("version", "model_version"))
+
     def _get_model_dir(self, name: str, version: str) -> Path:
         """Generate model directory path with versioning."""
         ml_home = os.getenv('ML_HOME')
@@ -155,33 +248,44 @@ class MLModel(ABC):
         Returns:
             Dict containing training metrics and metadata
         """
-        # Load data
-        train_data = load_data(train_path)
-        eval_data = load_data(eval_path)
-        test_data = load_data(test_path)
-        
-        # Train model
-        self._train(train_data, eval_data)
-        self.fitted_ = True
-
-        # Evaluate on available datasets
-        metrics = {}
-        if train_data is not None:
-            metrics['train'] = self._evaluate(train_data)
-        if eval_data is not None:
-            metrics['validation'] = self._evaluate(eval_data)
-        if test_data is not None:
-            metrics['test'] = self._evaluate(test_data)
-        
-        # Save model and metadata
-        model_dir = self._get_model_dir('model_name', 'model_version')
-        
-        # Save model
-        joblib.dump(self, model_dir / "model.joblib")
-        
-        # Save parameters
-        with open(model_dir / "params.json", 'w') as f:
-            json.dump(self.params, f, indent=2)
+        with record_timings() as timings, record_memory(self._metric_name, "train") as memory, \
+                record_data_memory() as data_memory:
+            # Load data
+            with self._phase("train", "load_data"):
+                train_data = self._load_data(train_path, 'train')
+                eval_data = self._load_data(eval_path, 'validation')
+                test_data = self._load_data(test_path, 'test')
+            
+            # Train model
+            with self._phase("train", "fit"):
+                self._train(train_data, eval_data)
+            self.fitted_ = True
+
+            # Evaluate on available datasets
+            metrics = {}
+            with self._phase("train", "evaluate"):
+                if train_data is not None:
+                    metrics['train'] = self._evaluate(train_data)
+                if eval_data is not None:
+                    metrics['validation'] = self._evaluate(eval_data)
+                if test_data is not None:
+                    metrics['test'] = self._evaluate(test_data)
+            
+            # Timed by hand: write_artifact ends with the metadata write
+            # below, once the timings and memory it records are complete
+            artifact_start = time.perf_counter()
+            with memory_phase(self._metric_name, "train", "write_artifact"):
+                # Save model and metadata
+                model_dir = self._get_model_dir(self.model_name or 'model_name', self.model_version)
+                
+                # Save model
+                import joblib
+                joblib.dump(self, model_dir / "model.joblib")
+                exported = self._export(model_dir)
+                
+                # Save parameters
+                with open(model_dir / "params.json", 'w') as f:
+                    json.dump(self.params, f, indent=2)
             
         # Save metadata
         metadata = {
@@ -190,14 +294,77 @@ class MLModel(ABC):
             'eval_path': eval_path,
             'test_path': test_path,
             "model_path": str(model_dir),
-            'metrics': metrics
+            'model_name': self.model_name,
+            'model_version': self.model_version,
+            'model_class': type(self).__name__,
+            'metrics': metrics,
+            # Seconds spent per phase; write_artifact up to the metadata write
+            'timings': summarize_timings([*timings, ("write_artifact", time.perf_counter() - artifact_start)]),
+            # Resident and traced memory in bytes, overall and per phase
+            'memory': memory,
         }
+        if data_memory:
+            metadata['data_memory'] = data_memory
+        if exported:
+            metadata['compiled'] = exported
         
-        with open(model_dir / "metadata.json", 'w') as f:
-            json.dump(metadata, f, indent=2)
-        
+        try:
+            self._write_metadata(model_dir, metadata)
+        finally:
+            observe_phase(self._metric_name, "train", "write_artifact", time.perf_counter() - artifact_start)
         return metadata
 
+    def _export(self, model_dir: Path) -> Optional[str]:
+        """Write serving artifacts besides model.joblib.
+
+        The default writes nothing; TabModel compiles supported linear
+        models (see ``mlservice.core.compiled``).
+
+        Returns:
+            File name of the written artifact, or None
+        """
+        return None
+
+    @property
+    def _metric_name(self) -> str:
+        return self.model_name or type(self).__name__
+
+    @contextmanager
+    def _phase(self, operation: str, name: str):
+        """Record the duration and memory usage of one phase of train/predict/evaluate."""
+        with phase(self._metric_name, operation, name), memory_phase(self._metric_name, operation, name):
+            yield
+
+    def _write_metadata(self, model_dir: Path, metadata: Dict[str, Any]) -> None:
+        """Write metadata.json and record the model in the model index.
+
+        The index row is committed only once metadata.json has been atomically
+        replaced, so the index never points at a half-written artifact.
+        """
+        tmp_file = model_dir / "metadata.json.tmp"
+        index = ModelIndex.for_ml_home()
+        with index.connect() as conn:
+            index.add(metadata, conn)
+            with open(tmp_file, 'w') as f:
+                json.dump(metadata, f, indent=2)
+            os.replace(tmp_file, model_dir / "metadata.json")
+
+    def _load_data(self, data_path: Optional[str], split: str) -> Any:
+        """Load the dataset for a split.
+        
+        Subclasses may post-process the loaded data and record before/after
+        memory usage with ``memory.add_data_memory``.
+        
+        Args:
+            data_path: Path to the data, or None
+            split: One of 'train', 'validation', 'test', 'predict', 'evaluate'
+            
+        Returns:
+            Loaded data, or None if data_path is None
+        """
+        from .utils import load_data
+        return load_data(data_path)
+
     @abstractmethod
     def _train(self, train_data: Any, eval_data: Optional[Any] = None) -> None:
         """Implementation of model training logic."""
@@ -226,13 +393,32 @@ class MLModel(ABC):
         """
         if not self.fitted_:
             raise ValueError("Model must be trained before prediction")
-        if isinstance(data, str):
-            data = load_data(data)
-        predicted =  self._predict(data)
-        # Save prediction to file
-        predict_path = self._get_prediction_path()
-        with open(predict_path, 'wb') as f:
-            pickle.dump(predicted, f)
+        data_path = data if isinstance(data, str) else None
+        with record_memory(self._metric_name, "predict") as memory, record_data_memory() as data_memory:
+            if isinstance(data, str):
+                with self._phase("predict", "load_data"):
+                    data = self._load_data(data, 'predict')
+            with self._phase("predict", "predict"):
+                predicted =  self._predict(data)
+            with self._phase("predict", "write_prediction"):
+                # Save prediction to file
+                predict_path = self._get_prediction_path()
+                with open(predict_path, 'wb') as f:
+                    pickle.dump(predicted, f)
+            # Free the data so rss_after is measured without it
+            del predicted, data
+
+        # Save prediction metadata next to the prediction file
+        metadata = {
+            'timestamp': datetime.now().isoformat(),
+            'data_path': data_path,
+            'prediction_path': predict_path,
+            'memory': memory,
+        }
+        if data_memory:
+            metadata['data_memory'] = data_memory
+        with open(Path(predict_path).with_suffix(".json"), 'w') as f:
+            json.dump(metadata, f, indent=2)
         return predict_path
                                     
         
@@ -252,11 +438,24 @@ class MLModel(ABC):
         """
         if not self.fitted_:
             raise ValueError("Model must be trained before evaluation")
+        # Evaluation returns only metrics, so its memory is not recorded
+        # beyond the phase metrics kept under tracemalloc
         if isinstance(data, str):
-            data = load_data(data)
-        return self._evaluate(data)
+            with self._phase("evaluate", "load_data"):
+                data = self._load_data(data, 'evaluate')
+        with self._phase("evaluate", "evaluate"):
+            return self._evaluate(data)
         
     @abstractmethod
     def _evaluate(self, data: Any) -> Dict[str, Any]:
         """Implementation of evaluation logic."""
         pass
+
+    def warmup(self) -> None:
+        """Exercise the prediction path once on synthetic data.
+        
+        Called after a model is preloaded so first-call costs are paid
+        before the service reports ready. The default does nothing; models
+        that can build synthetic input override it.
+        """
+        pass
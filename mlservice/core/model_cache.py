@@ -0,0 +1,296 @@
+"""
+In-process cache of loaded models with zero-downtime hot-swap.
+
+When a cached artifact changes on disk the replacement is loaded in the
+background while requests keep using the current instance. Once the new
+model is ready it is swapped in atomically; requests that already hold the
+old instance finish on it, and the old instance is released when the last
+of them is done.
+"""
+import os
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+
+from .metrics import MODEL_LOAD_SECONDS
+
+DEFAULT_CACHE_SIZE = 16
+DEFAULT_WATCH_INTERVAL = 2.0
+
+
+def _artifact_version(model_path: str) -> Tuple[int, ...]:
+    """Return (mtime_ns, size) of a model's model.joblib followed by those of
+    its compiled.npz, with (0, 0) for a missing file.
+
+    ``load_model`` prefers compiled.npz, so a change to either file is a new
+    version.
+    """
+    from .compiled import COMPILED_FILE
+
+    version: Tuple[int, ...] = ()
+    for name in ("model.joblib", COMPILED_FILE):
+        try:
+            stat = os.stat(Path(model_path) / name)
+        except OSError:
+            version += (0, 0)
+        else:
+            version += (stat.st_mtime_ns, stat.st_size)
+    return version
+
+
+def _load_model(model_path: str) -> Any:
+    """Load a model artifact, recording the load time by model class."""
+    from .utils import load_model
+
+    start = time.perf_counter()
+    model = load_model(model_path)
+    MODEL_LOAD_SECONDS.observe(time.perf_counter() - start, model_class=type(model).__name__)
+    return model
+
+
+class ModelHandle:
+    """A loaded model instance with a count of the requests using it."""
+
+    def __init__(self, key: str, version: Tuple[int, int], model: Any):
+        self.key = key
+        self.version = version
+        self.model = model
+        self.refcount = 0
+        self.retired = False
+        # Artifact version whose reload failed, not retried until it changes
+        self.failed_version: Optional[Tuple[int, ...]] = None
+
+    def is_stale(self) -> bool:
+        """Return True if the artifact on disk changed since this was loaded."""
+        version = _artifact_version(self.key)
+        return version != self.version and version != self.failed_version
+
+    def release(self) -> None:
+        """Free the model once it is retired and no request uses it."""
+        close = getattr(self.model, "close", None)
+        if callable(close):
+            try:
+                close()
+            except Exception:
+                traceback.print_exc()
+        self.model = None
+
+
+class ModelCache:
+    """Least-recently-used cache of models loaded with ``load_model``.
+
+    Entries are keyed by resolved model directory. A miss loads the model
+    synchronously, and concurrent requests for the same model wait for a
+    single load. A changed model.joblib is detected either on access or by
+    the background watcher (``start_watcher``), and triggers a background
+    reload followed by an atomic swap.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE):
+        self.max_size = max_size
+        self._handles: "OrderedDict[str, ModelHandle]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading: Dict[str, threading.Lock] = {}
+        self._reloading: Set[str] = set()
+        self._reload_threads: List[threading.Thread] = []
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_watcher = threading.Event()
+
+    @staticmethod
+    def _key(model_path: str) -> str:
+        return str(Path(model_path).resolve())
+
+    @property
+    def watching(self) -> bool:
+        """Return True while the background watcher is running."""
+        return self._watcher is not None and self._watcher.is_alive()
+
+    def _handle(self, model_path: str) -> ModelHandle:
+        """Return the current handle of a model, loading it on a miss."""
+        key = self._key(model_path)
+        with self._lock:
+            handle = self._handles.get(key)
+            if handle is not None:
+                self._handles.move_to_end(key)
+        if handle is not None:
+            if not self.watching and handle.is_stale():
+                self._reload_async(key)
+            return handle
+
+        with self._lock:
+            loading = self._loading.setdefault(key, threading.Lock())
+        with loading:
+            try:
+                with self._lock:
+                    handle = self._handles.get(key)
+                if handle is None:
+                    version = _artifact_version(key)
+                    handle = ModelHandle(key, version, _load_model(key))
+                    self._swap(handle)
+            finally:
+                with self._lock:
+                    self._loading.pop(key, None)
+            return handle
+
+    def _swap(self, handle: ModelHandle) -> None:
+        """Make handle the current entry for its key and retire the old one."""
+        retired = []
+        with self._lock:
+            old = self._handles.get(handle.key)
+            self._handles[handle.key] = handle
+            self._handles.move_to_end(handle.key)
+            if old is not None:
+                retired.append(old)
+            while len(self._handles) > self.max_size:
+                retired.append(self._handles.popitem(last=False)[1])
+            to_release = []
+            for old in retired:
+                old.retired = True
+                if old.refcount == 0:
+                    to_release.append(old)
+        for old in to_release:
+            old.release()
+
+    @contextmanager
+    def acquire(self, model_path: str) -> Iterator[Any]:
+        """Pin the current model instance for the duration of a request.
+
+        A miss loads the model. The instance must only be used inside the
+        block; once the block exits a hot-swap or eviction may release it.
+
+        Raises:
+            FileNotFoundError: If model files are not found
+            ValueError: If model files are corrupted
+        """
+        while True:
+            handle = self._handle(model_path)
+            with self._lock:
+                if handle.model is not None:
+                    handle.refcount += 1
+                    break
+        try:
+            yield handle.model
+        finally:
+            with self._lock:
+                handle.refcount -= 1
+                release = handle.retired and handle.refcount == 0
+            if release:
+                handle.release()
+
+    def prewarm(self, model_path: str) -> None:
+        """Load a model into the cache ahead of traffic."""
+        with self.acquire(model_path):
+            pass
+
+    def _reload(self, key: str) -> bool:
+        """Load a changed artifact and swap it in. Returns True on success.
+
+        A failed load, or an artifact that changes while it is being read
+        (e.g. still being written), keeps the current instance in service.
+        """
+        try:
+            version = _artifact_version(key)
+            model = _load_model(key)
+            if _artifact_version(key) != version:
+                return False
+            self._swap(ModelHandle(key, version, model))
+            print(f"Reloaded model {key}")
+            return True
+        except Exception as e:
+            print(f"Warning: Failed to reload model {key}, keeping current version: {e}")
+            with self._lock:
+                current = self._handles.get(key)
+                if current is not None:
+                    current.failed_version = version
+            return False
+        finally:
+            with self._lock:
+                self._reloading.discard(key)
+
+    def _reload_async(self, key: str) -> None:
+        """Start a background reload of key unless one is already running."""
+        with self._lock:
+            if key in self._reloading:
+                return
+            self._reloading.add(key)
+            self._reload_threads = [t for t in self._reload_threads if t.is_alive()]
+            thread = threading.Thread(target=self._reload, args=(key,), daemon=True)
+            self._reload_threads.append(thread)
+        thread.start()
+
+    def wait_for_reloads(self, timeout: Optional[float] = None) -> None:
+        """Block until running background reloads have finished."""
+        with self._lock:
+            threads = list(self._reload_threads)
+        for thread in threads:
+            thread.join(timeout)
+
+    def check_for_updates(self) -> List[str]:
+        """Start background reloads for cached models whose artifact changed.
+
+        Returns:
+            Keys of the models being reloaded
+        """
+        with self._lock:
+            handles = list(self._handles.values())
+        changed = [h.key for h in handles if h.is_stale()]
+        for key in changed:
+            self._reload_async(key)
+        return changed
+
+    def _watch(self, interval: float) -> None:
+        from .aliases import alias_table
+
+        while not self._stop_watcher.wait(interval):
+            try:
+                self.check_for_updates()
+                if os.getenv('ML_HOME'):
+                    alias_table.refresh(force=True, prewarm=True)
+            except Exception:
+                traceback.print_exc()
+
+    def start_watcher(self, interval: float = DEFAULT_WATCH_INTERVAL) -> None:
+        """Watch cached artifacts and alias targets from a background thread."""
+        if self.watching:
+            return
+        self._stop_watcher.clear()
+        self._watcher = threading.Thread(
+            target=self._watch, args=(interval,), name="model-cache-watcher", daemon=True
+        )
+        self._watcher.start()
+
+    def stop_watcher(self) -> None:
+        """Stop the background watcher."""
+        self._stop_watcher.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    def __contains__(self, model_path: str) -> bool:
+        with self._lock:
+            return self._key(model_path) in self._handles
+
+    def evict(self, model_path: str) -> None:
+        """Drop a model from the cache."""
+        with self._lock:
+            handle = self._handles.pop(self._key(model_path), None)
+            if handle is not None:
+                handle.retired = True
+                release = handle.refcount == 0
+        if handle is not None and release:
+            handle.release()
+
+    def clear(self) -> None:
+        """Drop all cached models."""
+        with self._lock:
+            keys = list(self._handles)
+        for key in keys:
+            self.evict(key)
+
+
+model_cache = ModelCache(int(os.getenv("MLSERVICE_MODEL_CACHE_SIZE", DEFAULT_CACHE_SIZE)))
@@ -0,0 +1,326 @@
+"""
+Embedded SQLite index of trained model artifacts.
+
+Every ``MLModel.train`` run records its metadata here, so models can be
+listed and searched by name, version, class, time and metric value without
+walking ``ML_HOME/models`` and opening every ``metadata.json``.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+INDEX_FILENAME = "index.sqlite"
+MAX_PAGE_SIZE = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS models (
+    model_path TEXT PRIMARY KEY,
+    model_name TEXT,
+    model_version TEXT,
+    model_class TEXT,
+    timestamp TEXT,
+    metadata TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS models_name_version_time
+    ON models (model_name, model_version, timestamp);
+CREATE INDEX IF NOT EXISTS models_time ON models (timestamp);
+CREATE TABLE IF NOT EXISTS metrics (
+    model_path TEXT NOT NULL REFERENCES models (model_path) ON DELETE CASCADE,
+    split TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (model_path, split, name)
+);
+CREATE INDEX IF NOT EXISTS metrics_lookup ON metrics (split, name, value);
+CREATE TABLE IF NOT EXISTS aliases (
+    alias TEXT PRIMARY KEY,
+    model_path TEXT NOT NULL,
+    updated TEXT NOT NULL
+);
+"""
+
+
+def _model_identity(metadata: Dict[str, Any], models_root: Optional[Path] = None) -> Dict[str, Optional[str]]:
+    """Return name/version/class of a model from its metadata.
+
+    Older metadata has no name or version; they are then derived from the
+    ``models/<name>/<version>/YYYY/MM/DD/<uuid>`` directory layout.
+    """
+    name = metadata.get("model_name")
+    version = metadata.get("model_version")
+    if (name is None or version is None) and models_root is not None:
+        try:
+            parts = Path(metadata["model_path"]).relative_to(models_root).parts
+        except ValueError:
+            parts = ()
+        if len(parts) >= 6:
+            name = name or "/".join(parts[:-5])
+            version = version or parts[-5]
+    return {"model_name": name, "model_version": version, "model_class": metadata.get("model_class")}
+
+
+class ModelIndex:
+    """SQLite-backed index of model artifacts under ``ML_HOME/models``."""
+
+    # Indexes returned by for_ml_home, by database path
+    _instances: Dict[str, "ModelIndex"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, db_path: str):
+        self.db_path = str(db_path)
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        with self.connect() as conn:
+            # WAL mode is stored in the database file, so it is set once here
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @classmethod
+    def for_ml_home(cls, ml_home: Optional[str] = None) -> "ModelIndex":
+        """Return the index stored in ``ML_HOME/models``.
+
+        One instance is kept per database path, so the schema is only
+        created once per process; it is created again if the database file
+        was removed.
+
+        Raises:
+            ValueError: If no ml_home is given and ML_HOME is not set
+        """
+        ml_home = ml_home or os.getenv('ML_HOME')
+        if not ml_home:
+            raise ValueError("ML_HOME environment variable not set")
+        db_path = str(Path(ml_home) / "models" / INDEX_FILENAME)
+        index = cls._instances.get(db_path)
+        if index is None or not os.path.exists(db_path):
+            with cls._instances_lock:
+                index = cls._instances.get(db_path)
+                if index is None or not os.path.exists(db_path):
+                    index = cls._instances[db_path] = cls(db_path)
+        return index
+
+    @contextmanager
+    def connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection; the block runs as one transaction."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            conn.execute("PRAGMA foreign_keys=ON")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def add(self, metadata: Dict[str, Any], conn: Optional[sqlite3.Connection] = None,
+            models_root: Optional[Path] = None) -> None:
+        """Insert or replace the entry of one trained model.
+
+        Args:
+            metadata: Metadata dict as written to metadata.json
+            conn: Connection of an enclosing transaction, if any
+            models_root: ``ML_HOME/models``, used to recover name and version
+                from the directory layout of older artifacts
+        """
+        if conn is None:
+            with self.connect() as conn:
+                return self.add(metadata, conn, models_root)
+
+        model_path = metadata["model_path"]
+        identity = _model_identity(metadata, models_root)
+        conn.execute("DELETE FROM metrics WHERE model_path = ?", (model_path,))
+        conn.execute(
+            "INSERT OR REPLACE INTO models VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                model_path,
+                identity["model_name"],
+                identity["model_version"],
+                identity["model_class"],
+                metadata.get("timestamp"),
+                json.dumps(metadata),
+            ),
+        )
+        rows = [
+            (model_path, split, name, float(value))
+            for split, values in (metadata.get("metrics") or {}).items()
+            if isinstance(values, dict)
+            for name, value in values.items()
+            if isinstance(value, (int, float)) and not isinstance(value, bool)
+        ]
+        conn.executemany("INSERT INTO metrics VALUES (?, ?, ?, ?)", rows)
+
+    def remove(self, model_path: str) -> None:
+        """Remove the entry of a model artifact."""
+        with self.connect() as conn:
+            conn.execute("DELETE FROM models WHERE model_path = ?", (model_path,))
+
+    def get(self, model_path: str) -> Optional[Dict[str, Any]]:
+        """Return the indexed metadata of a model artifact, or None."""
+        with self.connect() as conn:
+            row = conn.execute(
+                "SELECT metadata FROM models WHERE model_path = ?", (model_path,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def search(
+        self,
+        name: Optional[str] = None,
+        version: Optional[str] = None,
+        model_class: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        metric: Optional[str] = None,
+        min_value: Optional[float] = None,
+        max_value: Optional[float] = None,
+        sort: str = "timestamp",
+        order: str = "desc",
+        limit: int = 50,
+        offset: int = 0,
+    ) -> Dict[str, Any]:
+        """Search indexed models.
+
+        Args:
+            name: Exact model name, e.g. 'sklearn/ridge'
+            version: Exact model version
+            model_class: Exact model class name
+            since: Only models trained at or after this ISO timestamp
+            until: Only models trained before this ISO timestamp
+            metric: Metric as '<split>.<name>', e.g. 'test.auc_score'. Only
+                models reporting it are returned.
+            min_value: Minimum metric value (requires metric)
+            max_value: Maximum metric value (requires metric)
+            sort: 'timestamp' or 'metric'
+            order: 'asc' or 'desc'
+            limit: Page size, at most MAX_PAGE_SIZE
+            offset: Number of matches to skip
+
+        Returns:
+            Dict with the total match count and one page of items
+
+        Raises:
+            ValueError: If the arguments are inconsistent
+        """
+        if sort not in ("timestamp", "metric"):
+            raise ValueError(f"Unsupported sort key: {sort}")
+        if order not in ("asc", "desc"):
+            raise ValueError(f"Unsupported sort order: {order}")
+        if metric is None and (sort == "metric" or min_value is not None or max_value is not None):
+            raise ValueError("A metric is required to sort or filter by metric value")
+        limit = max(0, min(limit, MAX_PAGE_SIZE))
+
+        joins = ""
+        clauses: List[str] = []
+        args: List[Any] = []
+        if metric is not None:
+            split, _, metric_name = metric.partition(".")
+            if not metric_name:
+                raise ValueError(f"Metric must look like '<split>.<name>', got '{metric}'")
+            joins = "JOIN metrics m ON m.model_path = models.model_path AND m.split = ? AND m.name = ?"
+            args += [split, metric_name]
+        for column, value in (
+            ("model_name", name),
+            ("model_version", version),
+            ("model_class", model_class),
+        ):
+            if value is not None:
+                clauses.append(f"models.{column} = ?")
+                args.append(value)
+        if since is not None:
+            clauses.append("models.timestamp >= ?")
+            args.append(since)
+        if until is not None:
+            clauses.append("models.timestamp < ?")
+            args.append(until)
+        if min_value is not None:
+            clauses.append("m.value >= ?")
+            args.append(min_value)
+        if max_value is not None:
+            clauses.append("m.value <= ?")
+            args.append(max_value)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sort_column = "m.value" if sort == "metric" else "models.timestamp"
+        direction = order.upper()
+        with self.connect() as conn:
+            total = conn.execute(
+                f"SELECT COUNT(*) FROM models {joins} {where}", args
+            ).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT models.metadata FROM models {joins} {where} "
+                f"ORDER BY {sort_column} {direction}, models.model_path {direction} "
+                f"LIMIT ? OFFSET ?",
+                args + [limit, offset],
+            ).fetchall()
+        return {
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+            "items": [json.loads(row[0]) for row in rows],
+        }
+
+    def set_alias(self, alias: str, model_path: str) -> None:
+        """Point an alias such as 'sklearn/ridge@production' at a model path."""
+        with self.connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO aliases VALUES (?, ?, ?)",
+                (alias, model_path, datetime.now().isoformat()),
+            )
+
+    def delete_alias(self, alias: str) -> bool:
+        """Delete an alias. Returns False if it did not exist."""
+        with self.connect() as conn:
+            cursor = conn.execute("DELETE FROM aliases WHERE alias = ?", (alias,))
+        return cursor.rowcount > 0
+
+    def aliases(self) -> Dict[str, str]:
+        """Return all aliases as a mapping of alias to model path."""
+        with self.connect() as conn:
+            rows = conn.execute("SELECT alias, model_path FROM aliases").fetchall()
+        return dict(rows)
+
+    def rebuild(self, ml_home: Optional[str] = None) -> int:
+        """Recreate the index by scanning ``ML_HOME/models`` for metadata.json.
+
+        Returns:
+            Number of indexed models
+        """
+        ml_home = ml_home or os.getenv('ML_HOME')
+        if not ml_home:
+            raise ValueError("ML_HOME environment variable not set")
+        models_root = Path(ml_home) / "models"
+        count = 0
+        with self.connect() as conn:
+            # Aliases are not derived from artifacts and survive a rebuild
+            conn.execute("DELETE FROM metrics")
+            conn.execute("DELETE FROM models")
+            for metadata_file in models_root.rglob("metadata.json"):
+                try:
+                    with open(metadata_file) as f:
+                        metadata = json.load(f)
+                except (OSError, ValueError) as e:
+                    print(f"Warning: Skipping unreadable {metadata_file}: {e}")
+                    continue
+                metadata.setdefault("model_path", str(metadata_file.parent))
+                self.add(metadata, conn, models_root)
+                count += 1
+        return count
+
+
+def main():
+    """Command line entry point for model index maintenance."""
+    parser = argparse.ArgumentParser(description="Maintain the ML Service model index")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    rebuild_parser = subparsers.add_parser("rebuild", help="Rescan ML_HOME and rebuild the index")
+    rebuild_parser.add_argument("--ml-home", default=None, help="ML_HOME to scan (defaults to $ML_HOME)")
+    args = parser.parse_args()
+
+    if args.command == "rebuild":
+        index = ModelIndex.for_ml_home(args.ml_home)
+        count = index.rebuild(args.ml_home)
+        print(f"Indexed {count} models into {index.db_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+
+from .model_index import ModelIndex, MAX_PAGE_SIZE
+
+router = APIRouter()
+
+# Handlers are plain functions so FastAPI runs their SQLite queries in its
+# threadpool instead of on the event loop
+
+@router.get("/models", tags=["Model Index"])
+def list_models(
+    name: Optional[str] = Query(None, description="Model name, e.g. sklearn/ridge"),
+    version: Optional[str] = Query(None, description="Model version"),
+    model_class: Optional[str] = Query(None, description="Model class name"),
+    since: Optional[str] = Query(None, description="Trained at or after this ISO timestamp"),
+    until: Optional[str] = Query(None, description="Trained before this ISO timestamp"),
+    metric: Optional[str] = Query(None, description="Metric as <split>.<name>, e.g. test.auc_score"),
+    min_value: Optional[float] = Query(None, description="Minimum metric value"),
+    max_value: Optional[float] = Query(None, description="Maximum metric value"),
+    sort: str = Query("timestamp", description="Sort by 'timestamp' or 'metric'"),
+    order: str = Query("desc", description="Sort order, 'asc' or 'desc'"),
+    limit: int = Query(50, ge=0, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+):
+    """List and search trained models recorded in the model index."""
+    try:
+        index = ModelIndex.for_ml_home()
+    except ValueError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    try:
+        return index.search(
+            name=name,
+            version=version,
+            model_class=model_class,
+            since=since,
+            until=until,
+            metric=metric,
+            min_value=min_value,
+            max_value=max_value,
+            sort=sort,
+            order=order,
+            limit=limit,
+            offset=offset,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/models/latest", tags=["Model Index"])
+def latest_model(
+    name: str = Query(..., description="Model name, e.g. sklearn/ridge"),
+    version: Optional[str] = Query(None, description="Model version"),
+):
+    """Return the metadata of the most recently trained model with a name."""
+    try:
+        index = ModelIndex.for_ml_home()
+    except ValueError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    result = index.search(name=name, version=version, limit=1)
+    if not result["items"]:
+        raise HTTPException(status_code=404, detail=f"No indexed model named {name}")
+    return result["items"][0]
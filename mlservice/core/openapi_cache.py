@@ -0,0 +1,203 @@
+"""
+Precomputed OpenAPI schema with an on-disk cache.
+
+FastAPI builds the schema on the first request to ``/openapi.json`` (or
+``/docs``), which with many model routes is slow and happens on a request
+thread. ``install_openapi_cache`` makes the app serve the schema as static
+bytes, stored in the cache directory under a key derived from the registered
+route set, so a restarted server with the same routes loads it from disk.
+The schema is generated again whenever routes change: every lookup
+compares the paths and methods of ``app.routes`` with those the schema was
+built from, however the routes were added, and any change in paths,
+methods, handlers or handler source files yields a new on-disk key.
+
+Usage (build time, for the same routes the server will run with):
+    python -m mlservice.core.openapi_cache --external-routines external_routes
+"""
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from fastapi import FastAPI, Request, Response
+
+from .registry import _default_cache_dir
+
+
+def _dumps(schema: Dict[str, Any]) -> bytes:
+    """Serialise a schema the way FastAPI's JSONResponse does."""
+    return json.dumps(
+        schema, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def _source_version(obj: Any) -> Optional[list]:
+    """Return (mtime_ns, size) of the file defining obj, or None."""
+    try:
+        stat = os.stat(inspect.getsourcefile(obj))
+    except (TypeError, OSError):
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+class OpenAPICache:
+    """Serves an app's OpenAPI schema from memory and an on-disk cache.
+
+    Args:
+        app: FastAPI application
+        cache_dir: Cache directory, defaults to $MLSERVICE_CACHE_DIR or
+            ~/.cache/mlservice (resolved on each use)
+    """
+
+    def __init__(self, app: FastAPI, cache_dir: Optional[str] = None):
+        self.app = app
+        self._cache_dir = cache_dir
+        self._schema: Optional[Dict[str, Any]] = None
+        self._body = b""
+        self._routes: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @property
+    def cache_dir(self) -> Path:
+        return Path(self._cache_dir) if self._cache_dir else _default_cache_dir()
+
+    def key(self) -> str:
+        """Return a hash of everything the generated schema depends on."""
+        import fastapi
+        import pydantic
+
+        app = self.app
+        routes = []
+        sources = {}
+        for route in app.routes:
+            endpoint = getattr(route, "endpoint", None)
+            if endpoint is not None:
+                module = getattr(endpoint, "__module__", None)
+                if module and module not in sources:
+                    sources[module] = _source_version(endpoint)
+            routes.append([
+                getattr(route, "path", None),
+                sorted(getattr(route, "methods", None) or []),
+                getattr(endpoint, "__module__", None),
+                getattr(endpoint, "__qualname__", None),
+                getattr(route, "include_in_schema", None),
+                [str(tag) for tag in getattr(route, "tags", None) or []],
+                getattr(route, "status_code", None),
+                repr(getattr(route, "response_model", None)),
+            ])
+        state = {
+            "app": [app.title, app.version, app.description, app.summary, app.openapi_version,
+                    app.servers, app.openapi_tags, app.root_path],
+            "versions": [fastapi.__version__, pydantic.VERSION],
+            "routes": routes,
+            "sources": sources,
+        }
+        return hashlib.sha256(json.dumps(state, sort_keys=True, default=str).encode()).hexdigest()[:32]
+
+    def route_table(self) -> int:
+        """Return a hash of the paths and methods of the app's routes."""
+        return hash(tuple(
+            (getattr(route, "path", None), tuple(sorted(getattr(route, "methods", None) or ())))
+            for route in self.app.routes
+        ))
+
+    def _is_current(self, routes: int) -> bool:
+        schema = self.app.openapi_schema
+        return schema is not None and schema is self._schema and routes == self._routes
+
+    def schema(self) -> Dict[str, Any]:
+        """Return the schema, loading or generating it if routes changed."""
+        routes = self.route_table()
+        if not self._is_current(routes):
+            with self._lock:
+                if not self._is_current(routes):
+                    self._load_or_generate()
+                    self._routes = routes
+        return self._schema
+
+    def body(self) -> bytes:
+        """Return the serialised schema."""
+        self.schema()
+        return self._body
+
+    def _load_or_generate(self) -> None:
+        cache_file = self.cache_dir / f"openapi-{self.key()}.json"
+        try:
+            body = cache_file.read_bytes()
+            schema = json.loads(body)
+        except (OSError, ValueError):
+            self.app.openapi_schema = None
+            schema = FastAPI.openapi(self.app)
+            body = _dumps(schema)
+            try:
+                cache_file.parent.mkdir(parents=True, exist_ok=True)
+                tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+                tmp_file.write_bytes(body)
+                os.replace(tmp_file, cache_file)
+            except OSError as e:
+                print(f"Warning: Could not write OpenAPI cache {cache_file}: {e}")
+        self.app.openapi_schema = schema
+        self._schema = schema
+        self._body = body
+
+
+def install_openapi_cache(app: FastAPI, cache_dir: Optional[str] = None) -> OpenAPICache:
+    """Serve app's OpenAPI schema through an ``OpenAPICache``.
+
+    Replaces ``app.openapi`` (also used by /docs) and the ``/openapi.json``
+    route, which then returns the cached bytes without re-serialising.
+
+    Returns:
+        The installed cache, also stored as ``app.state.openapi_cache``
+    """
+    cache = OpenAPICache(app, cache_dir)
+    app.openapi = cache.schema
+    app.state.openapi_cache = cache
+    if app.openapi_url:
+        app.router.routes[:] = [
+            route for route in app.router.routes if getattr(route, "path", None) != app.openapi_url
+        ]
+
+        def openapi(request: Request) -> Response:
+            return Response(cache.body(), media_type="application/json")
+
+        app.add_route(app.openapi_url, openapi, include_in_schema=False)
+    return cache
+
+
+def precompute_openapi(app: FastAPI) -> None:
+    """Generate or load the schema now instead of on the first request."""
+    try:
+        app.openapi()
+    except Exception as e:
+        print(f"Warning: Could not precompute OpenAPI schema: {e}")
+
+
+def main():
+    """Command line entry point writing the OpenAPI cache for a route set."""
+    from mlservice.core.registry import ROUTING_MODES
+    from mlservice.main import app, setup_routes
+
+    parser = argparse.ArgumentParser(description="Precompute the ML Service OpenAPI schema")
+    parser.add_argument("--external-routines", nargs="+", help="List of external routine modules to import")
+    parser.add_argument("--lazy-routes", action="store_true",
+                        help="Register model routes without importing their modules")
+    parser.add_argument("--routing", choices=ROUTING_MODES, default="per-model",
+                        help="Model routing mode the server will use")
+    parser.add_argument("--no-plugins", dest="plugins", action="store_false",
+                        help="Do not load models and routes from installed entry point plugins")
+    args = parser.parse_args()
+
+    setup_routes(args.external_routines, lazy=args.lazy_routes, routing=args.routing,
+                 plugins=args.plugins)
+    cache = app.state.openapi_cache
+    cache.schema()
+    print(f"Wrote {cache.cache_dir / f'openapi-{cache.key()}.json'}")
+
+
+if __name__ == "__main__":
+    main()
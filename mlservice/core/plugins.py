@@ -0,0 +1,110 @@
+"""
+Discovery of installed model and route plugins through package entry points.
+
+A package registers models by declaring entry points in the
+``mlservice.models`` group, named after the model and pointing at the model
+class (or at a module whose ``@model_endpoints`` decorators register it)::
+
+    [tool.poetry.plugins."mlservice.models"]
+    "acme/churn" = "acme_models.churn:ChurnModel"
+
+Modules that register arbitrary routes through the registry go in the
+``mlservice.routes`` group and are always imported at startup::
+
+    [tool.poetry.plugins."mlservice.routes"]
+    acme = "acme_models.routes"
+
+Reading entry points scans the metadata of every installed distribution,
+so the result is cached in the cache directory and reused until a
+``sys.path`` directory changes (as it does when packages are installed or
+removed).
+"""
+import hashlib
+import json
+import os
+import sys
+from importlib.metadata import entry_points
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .registry import registry, _default_cache_dir
+
+MODEL_GROUP = "mlservice.models"
+ROUTE_GROUP = "mlservice.routes"
+PLUGIN_GROUPS = (MODEL_GROUP, ROUTE_GROUP)
+
+
+def _index_key() -> str:
+    """Return a hash of the sys.path directories and their modification times."""
+    state = []
+    for entry in sys.path:
+        try:
+            mtime = os.stat(entry or ".").st_mtime_ns
+        except OSError:
+            mtime = None
+        state.append([entry, mtime])
+    return hashlib.sha1(json.dumps(state).encode()).hexdigest()[:16]
+
+
+def discover_plugins(cache_dir: Optional[str] = None, use_cache: bool = True) -> Dict[str, List[List[str]]]:
+    """Return the installed plugin entry points.
+
+    Args:
+        cache_dir: Directory of the discovery index, defaults to
+            $MLSERVICE_CACHE_DIR or ~/.cache/mlservice
+        use_cache: Read and write the discovery index
+
+    Returns:
+        Mapping of entry point group to a list of [name, value] pairs
+    """
+    cache_file = (Path(cache_dir) if cache_dir else _default_cache_dir()) / f"plugins-{_index_key()}.json"
+    if use_cache:
+        try:
+            with open(cache_file) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    plugins = {
+        group: sorted({(ep.name, ep.value) for ep in entry_points(group=group)})
+        for group in PLUGIN_GROUPS
+    }
+    plugins = {group: [list(pair) for pair in pairs] for group, pairs in plugins.items()}
+    if use_cache:
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_file, "w") as f:
+                json.dump(plugins, f)
+            os.replace(tmp_file, cache_file)
+        except OSError as e:
+            print(f"Warning: Could not write plugin index {cache_file}: {e}")
+    return plugins
+
+
+def load_plugins(lazy: bool = False, cache_dir: Optional[str] = None) -> List[str]:
+    """Register the models and routes of all installed plugins.
+
+    Args:
+        lazy: Register model endpoints without importing the plugin modules;
+            each is imported by the first request that needs the model class
+        cache_dir: Directory of the discovery index
+
+    Returns:
+        Names of the registered plugin entry points
+    """
+    plugins = discover_plugins(cache_dir)
+    loaded = []
+    for name, value in plugins.get(ROUTE_GROUP, []):
+        try:
+            registry._timed_import(value.partition(":")[0])
+            loaded.append(name)
+        except Exception as e:
+            print(f"Warning: Failed to load route plugin {name} ({value}): {e}")
+    for name, value in plugins.get(MODEL_GROUP, []):
+        try:
+            registry.register_plugin_model(name, value, lazy=lazy)
+            loaded.append(name)
+        except Exception as e:
+            print(f"Warning: Failed to load model plugin {name} ({value}): {e}")
+    return loaded
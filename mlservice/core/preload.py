@@ -0,0 +1,123 @@
+"""
+Startup model preloading, warm-up and readiness state.
+"""
+import json
+import threading
+import time
+import traceback
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .aliases import resolve_model_path
+from .model_cache import model_cache
+
+
+class Readiness:
+    """Readiness of the service: 'starting', 'warming_up', 'ready' or 'failed'."""
+
+    def __init__(self):
+        self.status = "starting"
+        self.models: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        """Return True once every preloaded model is warm."""
+        return self.status == "ready"
+
+    def start(self, refs: List[str]) -> None:
+        """Mark the given models as pending warm-up."""
+        with self._lock:
+            self.status = "warming_up"
+            self.models = {ref: {"status": "pending"} for ref in refs}
+
+    def record(self, ref: str, info: Dict[str, Any]) -> None:
+        """Record the preload outcome of one model."""
+        with self._lock:
+            self.models[ref] = info
+
+    def finish(self) -> None:
+        """Mark preloading as done; any failed model makes the service 'failed'."""
+        with self._lock:
+            failed = any(info.get("status") == "failed" for info in self.models.values())
+            self.status = "failed" if failed else "ready"
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the status and per-model preload results."""
+        with self._lock:
+            return {"status": self.status, "models": dict(self.models)}
+
+
+readiness = Readiness()
+
+
+def warm_up_model(ref: str) -> Dict[str, Any]:
+    """Load a model path or alias into the model cache and warm it up.
+
+    Returns:
+        Dict with the resolved model path and load/warm-up durations
+    """
+    start = time.perf_counter()
+    model_path = resolve_model_path(ref)
+    with model_cache.acquire(model_path) as model:
+        loaded = time.perf_counter()
+        model.warmup()
+        warmed = time.perf_counter()
+    return {
+        "status": "ready",
+        "model_path": model_path,
+        "load_seconds": round(loaded - start, 6),
+        "warmup_seconds": round(warmed - loaded, 6),
+    }
+
+
+def preload_models(refs: List[str]) -> bool:
+    """Preload and warm up models, updating the readiness state.
+
+    Args:
+        refs: Model paths or aliases
+
+    Returns:
+        True if every model was loaded and warmed up
+    """
+    readiness.start(refs)
+    for ref in refs:
+        try:
+            info = warm_up_model(ref)
+            print(f"Preloaded model {ref} in {info['load_seconds'] + info['warmup_seconds']:.3f}s")
+        except Exception as e:
+            traceback.print_exc()
+            info = {"status": "failed", "error": str(e)}
+        readiness.record(ref, info)
+    readiness.finish()
+    return readiness.ready
+
+
+def read_preload_config(config_path: str) -> List[str]:
+    """Read the models to preload from a JSON config file.
+
+    The file holds either a list of model paths/aliases or an object with
+    a ``"models"`` list.
+
+    Raises:
+        FileNotFoundError: If the file does not exist
+        ValueError: If the file is not a valid preload config
+    """
+    with open(Path(config_path)) as f:
+        config = json.load(f)
+    models = config.get("models") if isinstance(config, dict) else config
+    if not isinstance(models, list) or not all(isinstance(ref, str) for ref in models):
+        raise ValueError(f"Preload config {config_path} must list model paths or aliases")
+    return models
+
+
+def start_preload(refs: Optional[List[str]]) -> Optional[threading.Thread]:
+    """Preload models on a background thread; the service is ready once done."""
+    if not refs:
+        readiness.start([])
+        readiness.finish()
+        return None
+    readiness.start(refs)
+    thread = threading.Thread(target=preload_models, args=(refs,), name="model-preload", daemon=True)
+    thread.start()
+    return thread
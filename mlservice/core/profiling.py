@@ -0,0 +1,279 @@
+"""
+On-demand request profiling.
+
+A request is profiled when it carries the admin token from
+``MLSERVICE_PROFILE_TOKEN`` in the ``X-MLService-Profile`` header or the
+``profile`` query parameter, or when it is one of every
+``MLSERVICE_PROFILE_SAMPLE_RATE`` model requests (``/model/...``).
+
+The request runs under cProfile while a background thread samples its
+stack. Results are written to ``ML_HOME/profiles``:
+
+- ``<id>.prof``: cProfile statistics, readable with ``pstats`` or snakeviz
+- ``<id>.collapsed``: sampled stacks in the collapsed format read by
+  flamegraph.pl and speedscope
+- ``<id>.json``: request path, status and timing
+
+The profile ID is returned in the ``X-Profile-Id`` response header. Only
+one request per process is profiled at a time; others run normally. The
+/profiles endpoints require the token and are disabled without one.
+
+cProfile and the sampler watch the event-loop thread, so requests served
+concurrently on the loop show up in the profile as well. ``<id>.json``
+counts them in ``concurrent_requests``; profiles with a count of 0 show
+the profiled request alone.
+"""
+import cProfile
+import hmac
+import itertools
+import json
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import parse_qs
+
+PROFILE_TOKEN_ENV = "MLSERVICE_PROFILE_TOKEN"
+SAMPLE_RATE_ENV = "MLSERVICE_PROFILE_SAMPLE_RATE"
+KEEP_ENV = "MLSERVICE_PROFILE_KEEP"
+PROFILE_HEADER = "x-mlservice-profile"
+PROFILE_QUERY_PARAM = "profile"
+PROFILE_ID_HEADER = "x-profile-id"
+DEFAULT_KEEP = 100
+# Seconds between stack samples
+SAMPLE_INTERVAL = 0.001
+
+_PROFILE_ID = re.compile(r"^[0-9]{8}T[0-9]{6}-[0-9a-f]{8}$")
+
+
+def profiles_dir() -> Path:
+    """Return ``ML_HOME/profiles``.
+
+    Raises:
+        ValueError: If ML_HOME is not set
+    """
+    ml_home = os.getenv('ML_HOME')
+    if not ml_home:
+        raise ValueError("ML_HOME environment variable not set")
+    return Path(ml_home) / "profiles"
+
+
+def is_profile_id(profile_id: str) -> bool:
+    """Return True if profile_id has the format of generated IDs."""
+    return bool(_PROFILE_ID.match(profile_id))
+
+
+def check_token(token: Optional[str]) -> bool:
+    """Return True if token matches the configured admin token."""
+    expected = os.getenv(PROFILE_TOKEN_ENV)
+    return bool(expected and token) and hmac.compare_digest(token.encode(), expected.encode())
+
+
+def _frame_name(code) -> str:
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+
+
+class StackSampler:
+    """Samples the stack of one thread into collapsed-stack counts."""
+
+    def __init__(self, thread_id: int, interval: float = SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_name(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.counts[";".join(reversed(stack))] += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.counts
+
+
+class Profiler:
+    """Decides which requests to profile and writes their profiles."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counter = itertools.count(1)
+        # Requests in flight, and those overlapping the profiled request
+        self.active = 0
+        self.overlapping = 0
+
+    def should_profile(self, scope: Dict[str, Any]) -> bool:
+        """Return True if the request asks for profiling or is sampled."""
+        headers = dict(scope.get("headers") or [])
+        token = headers.get(PROFILE_HEADER.encode())
+        if token is None:
+            query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+            token = (query.get(PROFILE_QUERY_PARAM) or [None])[0]
+        elif isinstance(token, bytes):
+            token = token.decode("latin-1")
+        if token is not None and check_token(token):
+            return True
+        rate = int(os.getenv(SAMPLE_RATE_ENV, "0") or 0)
+        return rate > 0 and scope.get("path", "").startswith("/model/") and next(self._counter) % rate == 0
+
+    def enter(self) -> None:
+        """Count a request in flight."""
+        self.active += 1
+        if self._lock.locked():
+            self.overlapping += 1
+
+    def leave(self) -> None:
+        self.active -= 1
+
+    def try_start(self) -> bool:
+        """Claim the profiler; False if another request is being profiled."""
+        if not self._lock.acquire(blocking=False):
+            return False
+        self.overlapping = self.active - 1
+        return True
+
+    def finish(self) -> None:
+        self._lock.release()
+
+    def write(self, profile_id: str, profile: cProfile.Profile, stacks: Counter,
+              info: Dict[str, Any]) -> None:
+        """Write the profile files and drop the oldest beyond the retention limit."""
+        directory = profiles_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        profile.dump_stats(str(directory / f"{profile_id}.prof"))
+        with open(directory / f"{profile_id}.collapsed", "w") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        with open(directory / f"{profile_id}.json", "w") as f:
+            json.dump(info, f, indent=2)
+        keep = int(os.getenv(KEEP_ENV, DEFAULT_KEEP))
+        for old in list_profiles(limit=None)[keep:]:
+            delete_profile(old["id"])
+
+
+profiler = Profiler()
+
+
+def list_profiles(limit: Optional[int] = 50) -> List[Dict[str, Any]]:
+    """Return the metadata of stored profiles, newest first."""
+    try:
+        files = [(f.stat().st_mtime_ns, f) for f in profiles_dir().glob("*.json")]
+    except (OSError, ValueError):
+        return []
+    files = [f for _, f in sorted(files, reverse=True)]
+    profiles = []
+    for file in files[:limit] if limit is not None else files:
+        if not is_profile_id(file.stem):
+            continue
+        try:
+            with open(file) as f:
+                profiles.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return profiles
+
+
+def profile_file(profile_id: str, kind: str) -> Path:
+    """Return the path of a stored profile file.
+
+    Args:
+        profile_id: Profile ID from the X-Profile-Id header
+        kind: 'prof', 'collapsed' or 'json'
+
+    Raises:
+        FileNotFoundError: If the profile does not exist
+    """
+    if not is_profile_id(profile_id) or kind not in ("prof", "collapsed", "json"):
+        raise FileNotFoundError(f"Profile not found: {profile_id}")
+    path = profiles_dir() / f"{profile_id}.{kind}"
+    if not path.exists():
+        raise FileNotFoundError(f"Profile not found: {profile_id}")
+    return path
+
+
+def delete_profile(profile_id: str) -> None:
+    """Delete the files of a stored profile."""
+    for kind in ("prof", "collapsed", "json"):
+        try:
+            (profiles_dir() / f"{profile_id}.{kind}").unlink()
+        except OSError:
+            pass
+
+
+class ProfilingMiddleware:
+    """ASGI middleware running selected requests under the profiler."""
+
+    def __init__(self, app: Callable):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        profiler.enter()
+        try:
+            if profiler.should_profile(scope) and profiler.try_start():
+                await self._profile(scope, receive, send)
+            else:
+                await self.app(scope, receive, send)
+        finally:
+            profiler.leave()
+
+    async def _profile(self, scope, receive, send):
+        profile_id = f"{datetime.now():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (PROFILE_ID_HEADER.encode(), profile_id.encode())
+                ]
+            await send(message)
+
+        profile = cProfile.Profile()
+        sampler = StackSampler(threading.get_ident())
+        start = time.perf_counter()
+        try:
+            sampler.start()
+            profile.enable()
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                profile.disable()
+                stacks = sampler.stop()
+            info = {
+                "id": profile_id,
+                "timestamp": datetime.now().isoformat(),
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status,
+                "duration_seconds": round(time.perf_counter() - start, 6),
+                "samples": sum(stacks.values()),
+                "concurrent_requests": profiler.overlapping,
+                "pid": os.getpid(),
+            }
+            try:
+                profiler.write(profile_id, profile, stacks, info)
+            except (OSError, ValueError) as e:
+                print(f"Warning: Could not write profile {profile_id}: {e}")
+        finally:
+            profiler.finish()
@@ -0,0 +1,47 @@
+import os
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import FileResponse
+
+from .profiling import PROFILE_TOKEN_ENV, check_token, list_profiles, profile_file
+
+router = APIRouter()
+
+_MEDIA_TYPES = {
+    "prof": "application/octet-stream",
+    "collapsed": "text/plain",
+    "json": "application/json",
+}
+
+def _require_admin(token: Optional[str]) -> None:
+    # Profiles expose code paths, so they are only served with the admin token
+    if not os.getenv(PROFILE_TOKEN_ENV):
+        raise HTTPException(status_code=403, detail=f"Profiles are disabled; set {PROFILE_TOKEN_ENV}")
+    if not check_token(token):
+        raise HTTPException(status_code=403, detail="Profiling requires the admin token")
+
+@router.get("/profiles", tags=["Profiling"])
+async def get_profiles(
+    limit: int = Query(50, ge=1, le=1000),
+    x_mlservice_profile: Optional[str] = Header(None),
+):
+    """Return the most recent request profiles, newest first."""
+    _require_admin(x_mlservice_profile)
+    return list_profiles(limit)
+
+@router.get("/profiles/{profile_id}", tags=["Profiling"])
+async def download_profile(
+    profile_id: str,
+    format: str = Query("prof", pattern="^(prof|collapsed|json)$"),
+    x_mlservice_profile: Optional[str] = Header(None),
+):
+    """Download a profile as cProfile stats (prof), collapsed stacks or its metadata (json)."""
+    _require_admin(x_mlservice_profile)
+    try:
+        path = profile_file(profile_id, format)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return FileResponse(path, media_type=_MEDIA_TYPES[format], filename=path.name)
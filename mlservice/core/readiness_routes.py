@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from .preload import readiness
+
+router = APIRouter()
+
+@router.get("/ready", tags=["General"])
+async def ready():
+    """Readiness probe: 200 once startup model preloading has finished, 503 before."""
+    state = readiness.snapshot()
+    return JSONResponse(state, status_code=200 if state["status"] == "ready" else 503)
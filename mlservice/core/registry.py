@@ -1,16 +1,91 @@
 """
 Core route registry functionality.
 """
-from typing import Any, Callable, Dict, List
+from typing import Any, Callable, Dict, List, Optional, Type
+import ast
+import hashlib
 import importlib.util
+import json
+import os
+import threading
+import time
 from pathlib import Path
 from fastapi import FastAPI, APIRouter
 
+# Decorator/function names that declare model endpoints
+_MODEL_DECLARATIONS = {"model_endpoints": 0, "create_model_endpoints": 1}
+# "per-model" adds /model/<name>/... routes for every model, "catalog" one
+# set of /model/{model_name}/... routes dispatching through the registry
+ROUTING_MODES = ("per-model", "catalog")
+# Names whose use means a module registers routes by itself
+_REGISTRY_NAMES = ("registry", "RouteRegistry")
+
+
+def _default_cache_dir() -> Path:
+    """Return the directory for cached route manifests."""
+    return Path(os.getenv("MLSERVICE_CACHE_DIR", Path.home() / ".cache" / "mlservice"))
+
+
+def _is_test_file(relative_path: Path) -> bool:
+    """Return True for test modules and files inside tests directories."""
+    name = relative_path.name
+    return (
+        name.startswith("test_")
+        or name.endswith("_test.py")
+        or name == "conftest.py"
+        or any(part in ("test", "tests") for part in relative_path.parent.parts)
+    )
+
+
+def scan_route_source(source: str) -> Dict[str, Any]:
+    """Find the routes a module declares without importing it.
+
+    Model endpoints declared with a literal name through ``@model_endpoints``
+    or ``create_model_endpoints`` can be registered lazily. Any other use of
+    the route registry (or a non-literal model name) needs the module to be
+    imported, since handler signatures define the routes.
+
+    Returns:
+        Dict with the lazily registrable model names and whether the module
+        must be imported eagerly
+    """
+    tree = ast.parse(source)
+    models: List[str] = []
+    eager = False
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call):
+            func = node.func
+            name = func.id if isinstance(func, ast.Name) else getattr(func, "attr", None)
+            if name in _MODEL_DECLARATIONS:
+                position = _MODEL_DECLARATIONS[name]
+                arg = node.args[position] if len(node.args) > position else None
+                for keyword in node.keywords:
+                    if keyword.arg == "model_name":
+                        arg = keyword.value
+                if isinstance(arg, ast.Constant) and isinstance(arg.value, str):
+                    models.append(arg.value)
+                else:
+                    eager = True
+        elif isinstance(node, ast.Name) and node.id in _REGISTRY_NAMES:
+            eager = True
+        elif isinstance(node, ast.alias) and node.name.split(".")[-1] in _REGISTRY_NAMES:
+            eager = True
+    return {"models": models, "eager": eager}
+
 class RouteRegistry:
     """Registry for managing API routes across multiple modules and projects."""
     
     _instance = None
     _routes: List[Dict[str, Any]] = []
+    # Model name -> MLModel class, for every model whose module was imported
+    _model_classes: Dict[str, Type] = {}
+    # Model name -> module declaring it (or 'module:attr' of the class), for
+    # lazily registered models
+    _lazy_models: Dict[str, str] = {}
+    # Module name -> seconds spent importing it
+    import_timings: Dict[str, float] = {}
+    routing = "per-model"
+    _import_lock = threading.RLock()
     
     def __init__(self):
         """Initialize the route registry."""
@@ -71,51 +146,244 @@ class RouteRegistry:
         """Decorator for registering DELETE endpoints."""
         return cls.register_endpoint(path, ['DELETE'], **kwargs)
 
-    def apply_routes(self, app: FastAPI) -> None:
+    def add_router_routes(self, router: APIRouter, model_name: Optional[str] = None) -> None:
+        """Register every route of a router in the registry.
+        
+        Args:
+            router: Router whose routes are registered
+            model_name: Model the routes belong to; these routes are replaced
+                by the catalog routes in catalog routing mode
+        """
+        for route in router.routes:
+            methods = list(route.methods)  # Convert set to list
+            self._routes.append({
+                'path': route.path_format,
+                'methods': methods,
+                'handler': route.endpoint,
+                'model_name': model_name,
+                'kwargs': {
+                    'response_model': route.response_model,
+                    'status_code': route.status_code,
+                    'tags': route.tags
+                }
+            })
+
+    def register_model_class(self, model_name: str, model_class: Type) -> None:
+        """Record the MLModel class serving a model name."""
+        self._model_classes[model_name] = model_class
+
+    def has_model(self, model_name: str) -> bool:
+        """Return True if a model with that name is registered, lazily or not."""
+        return model_name in self._model_classes or model_name in self._lazy_models
+
+    def model_names(self) -> List[str]:
+        """Return the names of all registered models."""
+        return sorted(set(self._model_classes) | set(self._lazy_models))
+
+    def is_lazy_model(self, model_name: str) -> bool:
+        """Return True if the model's routes were registered lazily."""
+        return model_name in self._lazy_models
+
+    def get_model_class(self, model_name: str) -> Type:
+        """Return the MLModel class of a model, importing its module if it
+        was registered lazily.
+
+        Raises:
+            KeyError: If no model with that name is registered
+        """
+        model_class = self._model_classes.get(model_name)
+        if model_class is not None:
+            return model_class
+        target = self._lazy_models.get(model_name)
+        if target is None:
+            raise KeyError(f"Unknown model: {model_name}")
+        return self._load_model_target(model_name, target)
+
+    def _load_model_target(self, model_name: str, target: str) -> Type:
+        """Import 'module' or 'module:attr' and return the class of model_name.
+
+        A class given as 'module:attr' that its module does not register
+        itself (no ``@model_endpoints``) is registered under model_name.
+        """
+        from mlservice.core.ml import create_model_endpoints
+
+        module_name, _, attr = target.partition(":")
+        module = self._timed_import(module_name)
+        with self._import_lock:
+            if model_name not in self._model_classes and attr:
+                model_class = module
+                for part in attr.split("."):
+                    model_class = getattr(model_class, part)
+                create_model_endpoints(model_class, model_name)
+        if model_name not in self._model_classes:
+            raise KeyError(f"Module {module_name} did not register model {model_name}")
+        return self._model_classes[model_name]
+
+    def register_lazy_model(self, model_name: str, target: str) -> None:
+        """Register the endpoints of a model whose module is imported on first use.
+
+        Args:
+            model_name: Name of the model for URL paths
+            target: Module registering the model, or 'module:attr' of its class
+        """
+        from mlservice.core.ml import _model_router
+
+        if model_name in self._lazy_models or model_name in self._model_classes:
+            return
+        self._lazy_models[model_name] = target
+        if self.routing == "catalog":
+            return
+        self.add_router_routes(
+            _model_router(lambda: self.get_model_class(model_name), model_name), model_name
+        )
+
+    def register_plugin_model(self, model_name: str, target: str, lazy: bool = False) -> None:
+        """Register a model declared by a package entry point.
+
+        Args:
+            model_name: Name of the model for URL paths
+            target: Entry point value, 'module' or 'module:attr'
+            lazy: Defer importing the module until the model class is needed
+        """
+        if lazy:
+            self.register_lazy_model(model_name, target)
+        elif model_name not in self._model_classes:
+            self._load_model_target(model_name, target)
+
+    def _timed_import(self, module_name: str) -> Any:
+        """Import a module and record how long it took."""
+        with self._import_lock:
+            start = time.perf_counter()
+            module = importlib.import_module(module_name)
+            if module_name not in self.import_timings:
+                self.import_timings[module_name] = time.perf_counter() - start
+                print(f"Imported {module_name} in {self.import_timings[module_name]:.3f}s")
+            return module
+
+    def apply_routes(self, app: FastAPI, routing: Optional[str] = None) -> None:
         """
         Apply all registered routes to a FastAPI application.
         
         Args:
             app: FastAPI application instance
+            routing: One of ROUTING_MODES, defaults to ``self.routing``. In
+                catalog mode the per-model endpoints are replaced by one set
+                of /model/{model_name}/train|predict|eval endpoints. Models
+                registered while ``self.routing`` is "catalog" have no
+                per-model endpoints to begin with.
         """
+        routing = routing or self.routing
+        if routing not in ROUTING_MODES:
+            raise ValueError(f"Unknown routing mode '{routing}', expected one of {ROUTING_MODES}")
         router = APIRouter()
         for route in self._routes:
+            if routing == "catalog" and route.get('model_name'):
+                continue
             for method in route['methods']:
                 endpoint = getattr(router, method.lower())
                 endpoint(route['path'], **route['kwargs'])(route['handler'])
+        if routing == "catalog":
+            from mlservice.core.ml import catalog_router
+            router.include_router(catalog_router())
         app.include_router(router)
 
-    def import_routes_from_module(self, module_name: str) -> None:
+    def _submodules(self, module_name: str, module_path: Path):
+        """Yield (submodule name, file) for all non-private Python files in a package."""
+        for file in module_path.rglob("*.py"):
+            if file.name.startswith("_") or _is_test_file(file.relative_to(module_path)):
+                continue
+            
+            # Calculate relative path from module root to build full module name
+            relative_path = file.relative_to(module_path)
+            submodule_parts = list(relative_path.parent.parts)
+            if submodule_parts == ["."]:
+                submodule_parts = []
+                
+            submodule_name = ".".join(
+                [module_name] + submodule_parts + [file.stem]
+            )
+            
+            if submodule_name != module_name:  # Skip the root module
+                yield submodule_name, file
+
+    def import_routes_from_module(self, module_name: str, lazy: bool = False,
+                                  cache_dir: Optional[str] = None) -> None:
         """
         Import routes from a Python module and its submodules.
         
+        In lazy mode submodules are scanned without being imported (see
+        ``scan_route_source``). Model endpoints are registered right away and
+        their module is imported by the first request that needs the model
+        class; modules that use the registry directly are imported eagerly,
+        and modules declaring no routes are skipped. Scan results are cached
+        per file in ``cache_dir`` and reused while the file is unchanged.
+        
         Args:
             module_name: Full Python module name (e.g. 'external_routes')
+            lazy: Register model endpoints without importing their modules
+            cache_dir: Directory for the route manifest cache, defaults to
+                $MLSERVICE_CACHE_DIR or ~/.cache/mlservice
         """
         try:
-            module = importlib.import_module(module_name)
+            module = self._timed_import(module_name)
             # Get the module directory to scan for submodules
             module_path = Path(module.__file__).parent
             
-            # Import all non-private Python files in the module directory
-            for file in module_path.rglob("*.py"):
-                if file.name.startswith("_"):
-                    continue
-                
-                # Calculate relative path from module root to build full module name
-                relative_path = file.relative_to(module_path)
-                submodule_parts = list(relative_path.parent.parts)
-                if submodule_parts == ["."]:
-                    submodule_parts = []
-                    
-                submodule_name = ".".join(
-                    [module_name] + submodule_parts + [file.stem]
-                )
-                
-                if submodule_name != module_name:  # Skip the root module
-                    importlib.import_module(submodule_name)
+            if not lazy:
+                for submodule_name, _ in self._submodules(module_name, module_path):
+                    self._timed_import(submodule_name)
+                return
+
+            manifest = self.build_manifest(module_name, module_path, cache_dir)
+            for submodule_name, entry in manifest.items():
+                if entry["eager"]:
+                    self._timed_import(submodule_name)
+                else:
+                    for model_name in entry["models"]:
+                        self.register_lazy_model(model_name, submodule_name)
         except ImportError as e:
             raise ValueError(f"Could not import module {module_name}: {e}")
 
+    def build_manifest(self, module_name: str, module_path: Path,
+                       cache_dir: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Scan a package's submodules for route declarations without importing them.
+        
+        Returns:
+            Mapping of submodule name to its ``scan_route_source`` result
+        """
+        cache_dir = Path(cache_dir) if cache_dir else _default_cache_dir()
+        key = hashlib.sha1(f"{module_name}:{module_path.resolve()}".encode()).hexdigest()[:16]
+        cache_file = cache_dir / f"routes-{key}.json"
+        try:
+            with open(cache_file) as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            cached = {}
+
+        manifest = {}
+        entries = {}
+        changed = False
+        for submodule_name, file in self._submodules(module_name, module_path):
+            stat = file.stat()
+            signature = [stat.st_mtime_ns, stat.st_size]
+            entry = cached.get(submodule_name)
+            if entry is None or entry.get("signature") != signature:
+                entry = dict(scan_route_source(file.read_text()), signature=signature)
+                changed = True
+            entries[submodule_name] = entry
+            manifest[submodule_name] = {"models": entry["models"], "eager": entry["eager"]}
+
+        if changed or set(entries) != set(cached):
+            try:
+                cache_dir.mkdir(parents=True, exist_ok=True)
+                tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+                with open(tmp_file, "w") as f:
+                    json.dump(entries, f)
+                os.replace(tmp_file, cache_file)
+            except OSError as e:
+                print(f"Warning: Could not write route manifest cache {cache_file}: {e}")
+        return manifest
+
 # Create the singleton instance
 registry = RouteRegistry.get_instance()
@@ -1,5 +1,15 @@
 from fastapi import APIRouter
 from .upload_routes import router as upload_router
+from .model_index_routes import router as model_index_router
+from .alias_routes import router as alias_router
+from .readiness_routes import router as readiness_router
+from .metrics_routes import router as metrics_router
+from .profiling_routes import router as profiling_router
 
 router = APIRouter()
-router.include_router(upload_router)
\ No newline at end of file
+router.include_router(upload_router)
+router.include_router(model_index_router)
+router.include_router(alias_router)
+router.include_router(readiness_router)
+router.include_router(metrics_router)
+router.include_router(profiling_router)
\ No newline at end of file
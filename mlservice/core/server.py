@@ -0,0 +1,245 @@
+"""
+Production server: a pre-forking supervisor running uvicorn workers.
+
+The parent process binds the listening socket, imports every model module,
+builds the OpenAPI schema and loads the preload models, then forks the
+workers. Everything loaded before the fork is shared copy-on-write between
+workers. Each worker runs a uvicorn server on the inherited socket, with
+uvloop and httptools when they are installed.
+
+Workers are recycled gracefully: a worker stops accepting connections and
+exits after ``max_requests`` requests (plus random jitter, so workers do not
+restart together) or once its resident memory exceeds ``max_rss_mb``. The
+supervisor replaces every worker that exits until it is asked to stop with
+SIGINT or SIGTERM, which it forwards to the workers. Workers share metrics
+through snapshot files in ``MLSERVICE_METRICS_DIR`` (a temporary directory
+unless set).
+"""
+import importlib.util
+import os
+import random
+import signal
+import socket
+import sys
+import tempfile
+import time
+import traceback
+from typing import List, Optional
+
+import uvicorn
+from fastapi import FastAPI
+
+from .memory import rss_bytes
+from .metrics import METRICS_DIR_ENV, clear_metrics_dir
+
+DEFAULT_BACKLOG = 2048
+DEFAULT_GRACEFUL_TIMEOUT = 30
+# Seconds between RSS checks in a worker
+RSS_CHECK_INTERVAL = 1.0
+
+
+def event_loop_implementation() -> str:
+    """Return 'uvloop' if it is installed, else 'asyncio'."""
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+
+def http_implementation() -> str:
+    """Return 'httptools' if it is installed, else 'h11'."""
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+
+class WorkerServer(uvicorn.Server):
+    """uvicorn server that also exits once its RSS exceeds a threshold.
+
+    Args:
+        config: uvicorn configuration
+        max_rss_mb: Resident memory in MiB above which the worker exits
+            gracefully, or None for no limit
+    """
+
+    def __init__(self, config: uvicorn.Config, max_rss_mb: Optional[float] = None):
+        super().__init__(config)
+        self.max_rss_mb = max_rss_mb
+        self._next_rss_check = 0.0
+
+    async def on_tick(self, counter: int) -> bool:
+        if await super().on_tick(counter):
+            return True
+        if self.max_rss_mb is not None:
+            now = time.monotonic()
+            if now >= self._next_rss_check:
+                self._next_rss_check = now + RSS_CHECK_INTERVAL
+                rss_mb = rss_bytes() / (1024 * 1024)
+                if rss_mb > self.max_rss_mb:
+                    print(f"Worker {os.getpid()} RSS {rss_mb:.0f}MiB exceeds {self.max_rss_mb:.0f}MiB, recycling")
+                    return True
+        return False
+
+
+def bind_socket(host: str, port: int, backlog: int = DEFAULT_BACKLOG) -> socket.socket:
+    """Create the listening socket shared by all workers."""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def preload_app(app: FastAPI, preload: Optional[List[str]] = None) -> None:
+    """Load everything workers would otherwise load on their own.
+
+    Imports the modules of lazily registered models, builds the OpenAPI
+    schema and loads and warms up the preload models. The app is marked as
+    preloaded so forked workers inherit the warm models and readiness state
+    instead of preloading again.
+    """
+    from .openapi_cache import precompute_openapi
+    from .preload import preload_models
+    from .registry import registry
+
+    for model_name in registry.model_names():
+        try:
+            registry.get_model_class(model_name)
+        except Exception as e:
+            print(f"Warning: Could not import model {model_name}: {e}")
+    precompute_openapi(app)
+    preload_models(preload or [])
+    app.state.preloaded = True
+
+
+class PreforkServer:
+    """Supervisor forking and replacing uvicorn worker processes.
+
+    Args:
+        app: FastAPI application, fully set up before ``run``
+        host: Host to bind to
+        port: Port to bind to
+        workers: Number of worker processes
+        backlog: Listen backlog of the shared socket
+        limit_concurrency: Maximum concurrent connections and tasks per
+            worker before it responds with 503, or None for no limit
+        max_requests: Requests after which a worker is recycled, or None
+        max_requests_jitter: Random extra requests added per worker to
+            ``max_requests``
+        max_rss_mb: Resident memory in MiB above which a worker is recycled
+        timeout_graceful_shutdown: Seconds a stopping worker waits for
+            in-flight requests
+        preload: Model paths or aliases to load before forking
+    """
+
+    def __init__(
+        self,
+        app: FastAPI,
+        host: str = "0.0.0.0",
+        port: int = 8000,
+        workers: int = 1,
+        backlog: int = DEFAULT_BACKLOG,
+        limit_concurrency: Optional[int] = None,
+        max_requests: Optional[int] = None,
+        max_requests_jitter: int = 0,
+        max_rss_mb: Optional[float] = None,
+        timeout_graceful_shutdown: int = DEFAULT_GRACEFUL_TIMEOUT,
+        preload: Optional[List[str]] = None,
+    ):
+        if workers < 1:
+            raise ValueError(f"workers must be at least 1, got {workers}")
+        self.app = app
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.backlog = backlog
+        self.limit_concurrency = limit_concurrency
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.max_rss_mb = max_rss_mb
+        self.timeout_graceful_shutdown = timeout_graceful_shutdown
+        self.preload = list(preload or [])
+        self.children: dict = {}
+        self._stopping = False
+
+    def _config(self) -> uvicorn.Config:
+        max_requests = self.max_requests
+        if max_requests is not None and self.max_requests_jitter > 0:
+            max_requests += random.randint(0, self.max_requests_jitter)
+        return uvicorn.Config(
+            self.app,
+            loop=event_loop_implementation(),
+            http=http_implementation(),
+            backlog=self.backlog,
+            limit_concurrency=self.limit_concurrency,
+            limit_max_requests=max_requests,
+            timeout_graceful_shutdown=self.timeout_graceful_shutdown,
+        )
+
+    def _spawn(self, sock: socket.socket) -> int:
+        # Unflushed output would otherwise be written again by the worker
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid:
+            self.children[pid] = time.monotonic()
+            return pid
+        # Worker process
+        code = 0
+        try:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            random.seed()
+            WorkerServer(self._config(), self.max_rss_mb).run(sockets=[sock])
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(code)
+
+    def _stop(self, signum, frame) -> None:
+        self._stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self) -> None:
+        """Bind, preload, fork the workers and supervise them until stopped."""
+        if not hasattr(os, "fork"):
+            raise RuntimeError("The production server requires os.fork")
+        sock = bind_socket(self.host, self.port, self.backlog)
+        # Workers share their metrics through snapshot files
+        if not os.getenv(METRICS_DIR_ENV):
+            os.environ[METRICS_DIR_ENV] = tempfile.mkdtemp(prefix="mlservice-metrics-")
+        clear_metrics_dir()
+        print(
+            f"Starting {self.workers} workers on {self.host}:{self.port} "
+            f"(loop={event_loop_implementation()}, http={http_implementation()})"
+        )
+        preload_app(self.app, self.preload)
+
+        previous = {sig: signal.signal(sig, self._stop) for sig in (signal.SIGINT, signal.SIGTERM)}
+        try:
+            for _ in range(self.workers):
+                self._spawn(sock)
+            while self.children:
+                try:
+                    pid, status = os.wait()
+                except ChildProcessError:
+                    break
+                except InterruptedError:
+                    continue
+                started = self.children.pop(pid, None)
+                if started is None or self._stopping:
+                    continue
+                code = os.waitstatus_to_exitcode(status)
+                print(f"Worker {pid} exited with code {code}, starting a replacement")
+                if code != 0 and time.monotonic() - started < 1.0:
+                    # Avoid a tight restart loop when workers crash on startup
+                    time.sleep(1.0)
+                self._spawn(sock)
+        finally:
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
+            sock.close()
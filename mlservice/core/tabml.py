@@ -4,28 +4,29 @@ from datetime import datetime
 import uuid
 import json
 from pathlib import Path
-from typing import List, Optional, Union, Dict, Any
-
-import joblib
-from sklearn.metrics import (
-    mean_squared_error,
-    mean_absolute_error,
-    r2_score,
-    accuracy_score,
-    f1_score,
-    precision_score,
-    recall_score,
-    roc_auc_score,
-)
-from .utils import load_data
+from typing import List, Optional, Tuple, Union, Dict, Any
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from .utils import load_data, memory_usage, optimize_dtypes, SparseData
+from .features import CategoricalEncoder, FeatureSchema, combine_features
+from .memory import add_data_memory
 from .ml import MLModel
 
+# Number of synthetic rows predicted by TabModel.warmup
+WARMUP_ROWS = 8
+
 
 
 
 class TabModel(MLModel):
     """Base class for regression models."""
 
+    # Set to True by classes whose predictions compiled.npz can reproduce
+    # (see mlservice.core.compiled.is_compilable)
+    compilable = False
+
     def __init__(self, params=None):
         super().__init__(params)
 
@@ -68,6 +69,173 @@ class TabModel(MLModel):
         """Return categorical columns used by the model."""
         return self.params.get("columns", {}).get("categorical", [])
 
+    @property
+    def categorical_encoding(self) -> str:
+        """Return the categorical encoding method, 'onehot' or 'ordinal'."""
+        return self.params.get("columns", {}).get("categorical_encoding", "onehot")
+
+    def _fit_features(self, data: Union[pd.DataFrame, SparseData]) -> Any:
+        """Fit the feature encoders on training data and return its feature matrix.
+
+        Feature columns are taken from ``params["columns"]["features"]`` when
+        set, and otherwise inferred from the training data (every column but
+        the target and prediction columns) and stored there, fixing them for
+        prediction. The numeric ones are compiled into ``feature_schema_``.
+        Categorical feature columns are encoded with
+        ``categorical_encoding`` and appended after the numeric features. The
+        matrix is CSR sparse for SparseData input, for frames whose features
+        are all pandas sparse columns, and when one-hot encoding is used; it
+        is a dense array otherwise.
+        """
+        self.categorical_encoder_ = None
+        self.feature_schema_ = None
+        if isinstance(data, SparseData) or sp.issparse(data):
+            self.n_features_ = data.shape[1]
+            return self._transform_features(data)
+
+        feature_columns = self._infer_features_columns(data.columns)
+        self._set_feature_columns(feature_columns)
+        self.n_features_ = len(feature_columns)
+        categorical = [col for col in self.categorical_columns if col in feature_columns]
+        if categorical:
+            self.categorical_encoder_ = CategoricalEncoder(
+                categorical, self.categorical_encoding
+            ).fit(data)
+        numeric = [col for col in feature_columns if col not in categorical]
+        if not self._is_sparse_frame(data, numeric):
+            self.feature_schema_ = FeatureSchema.from_frame(data, numeric)
+        return self._transform_features(data)
+
+    def _transform_features(self, data: Union[pd.DataFrame, SparseData], reuse: bool = False) -> Any:
+        """Return the feature matrix for ``data`` using the fitted encoders.
+
+        With ``reuse`` the dense part may be written into a per-thread buffer
+        that the next ``reuse=True`` call on the thread overwrites (see
+        FeatureSchema). Only predict paths that consume the matrix straight
+        away and do not keep it should pass it.
+        """
+        if isinstance(data, SparseData) or sp.issparse(data):
+            return self._sparse_features(data.X if isinstance(data, SparseData) else data)
+
+        encoder = getattr(self, "categorical_encoder_", None)
+        schema = getattr(self, "feature_schema_", None)
+        if schema is not None:
+            X = schema.matrix(data, reuse=reuse)
+        else:
+            feature_columns = self._infer_features_columns(data.columns)
+            numeric = feature_columns
+            if encoder is not None:
+                numeric = [col for col in feature_columns if col not in encoder.columns]
+            frame = data[numeric]
+            if self._is_sparse_frame(frame, numeric):
+                X = frame.sparse.to_coo().tocsr()
+            else:
+                X = frame.values
+        if encoder is None:
+            return X
+        return combine_features(X, encoder.transform(data))
+
+    @staticmethod
+    def _is_sparse_frame(data: pd.DataFrame, columns: List[str]) -> bool:
+        """Return True if every one of ``columns`` is a pandas sparse column."""
+        return bool(columns) and all(isinstance(data[col].dtype, pd.SparseDtype) for col in columns)
+
+    def _sparse_features(self, X: sp.spmatrix) -> sp.csr_matrix:
+        """Return ``X`` as CSR with the number of features seen at train time.
+
+        svmlight files only imply as many features as their largest index, so
+        narrower matrices are widened with empty columns.
+        """
+        X = sp.csr_matrix(X)
+        n_features = getattr(self, "n_features_", X.shape[1])
+        if X.shape[1] > n_features:
+            raise ValueError(f"Expected at most {n_features} features, got {X.shape[1]}")
+        if X.shape[1] < n_features:
+            X = sp.csr_matrix((X.data, X.indices, X.indptr), shape=(X.shape[0], n_features))
+        return X
+
+    def _target_values(self, data: Union[pd.DataFrame, SparseData]) -> np.ndarray:
+        """Return the target vector of ``data``."""
+        if isinstance(data, SparseData):
+            if data.target is None:
+                raise ValueError("Sparse data has no target values")
+            return data.target
+        return data[self.target_column].values
+
+    def _with_predictions(self, data: Any, columns: Dict[str, np.ndarray]) -> pd.DataFrame:
+        """Attach prediction columns to ``data``.
+
+        DataFrames get the columns added in place; for sparse inputs a new
+        DataFrame holding only the prediction columns is returned.
+        """
+        if not isinstance(data, pd.DataFrame):
+            return pd.DataFrame(columns)
+        for name, values in columns.items():
+            data[name] = values
+        return data
+
+    def _synthetic_data(self, n_rows: int = WARMUP_ROWS) -> Optional[Union[pd.DataFrame, SparseData]]:
+        """Return all-zero input shaped like the training features.
+
+        Returns None if the model has not been fitted on features yet.
+        """
+        schema = getattr(self, "feature_schema_", None)
+        encoder = getattr(self, "categorical_encoder_", None)
+        n_features = getattr(self, "n_features_", None)
+        if schema is None and encoder is None:
+            if n_features is None:
+                return None
+            if not self.feature_columns:
+                return SparseData(sp.csr_matrix((n_rows, n_features)))
+            return pd.DataFrame(np.zeros((n_rows, len(self.feature_columns))), columns=self.feature_columns)
+
+        columns = {}
+        if schema is not None:
+            for column, dtype in zip(schema.columns, schema.dtypes):
+                columns[column] = np.zeros(n_rows, dtype=dtype)
+        if encoder is not None:
+            for column in encoder.columns:
+                categories = encoder.categories_[column]
+                columns[column] = [categories[0] if len(categories) else None] * n_rows
+        return pd.DataFrame(columns)
+
+    def warmup(self) -> None:
+        """Run ``_predict`` once on synthetic all-zero input."""
+        data = self._synthetic_data()
+        if data is not None:
+            self._predict(data)
+
+    @property
+    def optimize_memory(self) -> bool:
+        """Return whether loaded frames should have their dtypes narrowed."""
+        return bool(self.params.get("columns", {}).get("optimize_memory", False))
+
+    @property
+    def float_tolerance(self) -> float:
+        """Return the relative error accepted when narrowing float columns (0 keeps values exact)."""
+        return float(self.params.get("columns", {}).get("float_tolerance", 0.0))
+
+    def _load_data(self, data_path: Optional[str], split: str) -> Any:
+        """Load data, narrowing dtypes when ``columns.optimize_memory`` is set."""
+        data = super()._load_data(data_path, split)
+        if self.optimize_memory and isinstance(data, pd.DataFrame):
+            before = memory_usage(data)
+            data = optimize_dtypes(
+                data,
+                categorical_columns=self.categorical_columns,
+                keep_columns=[self.target_column],
+                float_tolerance=self.float_tolerance,
+            )
+            add_data_memory(split, before, memory_usage(data))
+        return data
+
+    def _export(self, model_dir: Path) -> Optional[str]:
+        """Write compiled.npz when the estimator is a supported linear model."""
+        from .compiled import export_compiled
+
+        path = export_compiled(self, model_dir)
+        return path.name if path is not None else None
+
     @property
     def hyperparameters(self) -> Dict[str, Any]:
         """Return hyperparameters used by the model."""
@@ -80,8 +248,10 @@ class TabRegression(TabModel):
 
     def _evaluate(self, data):
         """Implementation of evaluation logic."""
+        from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
+
         df = self._predict(data)
-        gt = data[self.target_column].values
+        gt = self._target_values(data)
         pred = df[self.prediction_column].values
 
         mse = mean_squared_error(gt, pred)
@@ -90,14 +260,178 @@ class TabRegression(TabModel):
         return {"mse": mse, "mae": mae, "r2": r2}
 
 
+class ClassPredictions:
+    """Class probabilities of a batch, with the labels and top-k derived from them.
+
+    Args:
+        proba: (n_rows, n_classes) probability matrix
+        classes: Class labels in the column order of ``proba``
+    """
+
+    def __init__(self, proba: np.ndarray, classes: Any):
+        self.proba = np.asarray(proba)
+        self.classes = np.asarray(classes)
+        if self.proba.ndim != 2 or self.proba.shape[1] != len(self.classes):
+            raise ValueError(
+                f"Expected probabilities of shape (n_rows, {len(self.classes)}), got {self.proba.shape}"
+            )
+        self._indices: Optional[np.ndarray] = None
+
+    @property
+    def is_binary(self) -> bool:
+        return len(self.classes) == 2
+
+    @property
+    def indices(self) -> np.ndarray:
+        """Return the column index of the most probable class of each row."""
+        if self._indices is None:
+            self._indices = self.proba.argmax(axis=1)
+        return self._indices
+
+    @property
+    def labels(self) -> np.ndarray:
+        """Return the most probable class of each row."""
+        return self.classes[self.indices]
+
+    @property
+    def score(self) -> np.ndarray:
+        """Return P(positive class) for binary problems, else the probability of the label."""
+        if self.is_binary:
+            return self.proba[:, 1]
+        return np.take_along_axis(self.proba, self.indices[:, None], axis=1)[:, 0]
+
+    def top_k(self, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the (n_rows, k) labels and probabilities of the k most probable classes."""
+        k = min(k, len(self.classes))
+        indices = np.argsort(-self.proba, axis=1, kind="stable")[:, :k]
+        return self.classes[indices], np.take_along_axis(self.proba, indices, axis=1)
+
+
 class TabClassification(TabModel):
+    """Base class for classification models.
+
+    Models implement ``_predict_proba``; labels, the probability column,
+    top-k columns and evaluation metrics are all derived from that single
+    call. Subclasses that implement ``_predict`` instead are evaluated on
+    the columns of the frame it returns. ``_predict`` stays abstract until
+    one of the two is implemented.
+    """
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # ABCMeta collects abstract methods after this runs, so a class
+        # implementing only _predict_proba gets a concrete _predict
+        if (getattr(cls._predict, "__isabstractmethod__", False)
+                and cls._predict_proba is not TabClassification._predict_proba):
+            cls._predict = TabClassification._predict_from_proba
+
     def __init__(self, params=None):
         super().__init__(params)
 
+    @property
+    def top_k(self) -> int:
+        """Return the number of top classes added as prediction columns (0 for none)."""
+        return int(self.params.get("columns", {}).get("top_k", 0))
+
+    @property
+    def classes(self) -> Optional[np.ndarray]:
+        """Return the class labels, from ``classes_`` or the estimator in ``self.model``."""
+        classes = getattr(self, "classes_", None)
+        if classes is None:
+            classes = getattr(getattr(self, "model", None), "classes_", None)
+        return None if classes is None else np.asarray(classes)
+
+    def _predict_proba(self, data: Any) -> Optional[np.ndarray]:
+        """Return the (n_rows, n_classes) class probabilities of ``data``.
+
+        Columns follow ``classes``. The default returns None, meaning the
+        model implements ``_predict`` itself.
+        """
+        return None
+
+    def _class_predictions(self, data: Any) -> Optional[ClassPredictions]:
+        """Score ``data`` once, or return None if ``_predict_proba`` is not implemented."""
+        proba = self._predict_proba(data)
+        if proba is None:
+            return None
+        return ClassPredictions(proba, self.classes)
+
+    def _predict_from_proba(self, data: Any) -> pd.DataFrame:
+        """Attach the label and probability columns derived from ``_predict_proba``.
+
+        Used as ``_predict`` of subclasses implementing ``_predict_proba``.
+        The probability column holds P(positive class) for binary problems
+        and the probability of the predicted label otherwise. With
+        ``columns.top_k`` set, ``<prediction>_top<i>`` and
+        ``<predict_proba>_top<i>`` columns hold the i-th most probable class.
+        """
+        predictions = self._class_predictions(data)
+        columns = {
+            self.prediction_column: predictions.labels,
+            self.predict_proba_column: predictions.score,
+        }
+        if self.top_k > 0:
+            labels, proba = predictions.top_k(self.top_k)
+            for i in range(labels.shape[1]):
+                columns[f"{self.prediction_column}_top{i + 1}"] = labels[:, i]
+                columns[f"{self.predict_proba_column}_top{i + 1}"] = proba[:, i]
+        return self._with_predictions(data, columns)
+
     def _evaluate(self, data):
         """Implementation of evaluation logic."""
+        predictions = self._class_predictions(data)
+        if predictions is None:
+            return self._evaluate_frame(data)
+        return self._classification_metrics(self._target_values(data), predictions)
+
+    @staticmethod
+    def _classification_metrics(gt: np.ndarray, predictions: ClassPredictions) -> Dict[str, Any]:
+        """Return accuracy, F1, precision, recall and ROC AUC of scored predictions.
+
+        Binary problems score the second class as positive; multiclass
+        problems report macro averages and one-vs-rest AUC. AUC is None when
+        the data holds a single class.
+        """
+        from sklearn.metrics import (
+            accuracy_score,
+            f1_score,
+            precision_score,
+            recall_score,
+            roc_auc_score,
+        )
+
+        labels = predictions.labels
+        if predictions.is_binary:
+            averaging = {"pos_label": predictions.classes[1]}
+        else:
+            averaging = {"average": "macro", "labels": predictions.classes}
+        try:
+            if predictions.is_binary:
+                auc_score = roc_auc_score(gt == predictions.classes[1], predictions.proba[:, 1])
+            else:
+                auc_score = roc_auc_score(gt, predictions.proba, multi_class="ovr", labels=predictions.classes)
+        except ValueError:
+            auc_score = None
+        return {
+            "accuracy": accuracy_score(gt, labels),
+            "f1": f1_score(gt, labels, zero_division=0, **averaging),
+            "precision": precision_score(gt, labels, zero_division=0, **averaging),
+            "recall": recall_score(gt, labels, zero_division=0, **averaging),
+            "auc_score": auc_score,
+        }
+
+    def _evaluate_frame(self, data):
+        """Evaluate on the prediction frame of a model implementing ``_predict``."""
+        from sklearn.metrics import (
+            accuracy_score,
+            f1_score,
+            precision_score,
+            recall_score,
+            roc_auc_score,
+        )
+
         df = self._predict(data)
-        gt = data[self.target_column].values
+        gt = self._target_values(data)
         accuracy = None
         f1 = None
         precision = None
@@ -1,23 +1,215 @@
 import os
 import json
 from pathlib import Path
-from typing import Optional, Union, Dict, Any
+from typing import Optional, Union, Dict, Any, Iterator, Iterable
 
+import numpy as np
 import pandas as pd
-import joblib
+import scipy.sparse as sp
 
-def load_data(data_path: Optional[str]) -> Optional[Union[pd.DataFrame, Dict[str, Any]]]:
-    """Load data from specified path. Supports CSV and JSON formats.
+from .metrics import DATA_LOAD_SECONDS
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional fast JSON parser
+    orjson = None
+
+JSON_LINES_SUFFIXES = ('.jsonl', '.ndjson')
+JSON_LINES_CHUNK_SIZE = 10000
+# JSON files in the columnar layout, loaded as DataFrames
+COLUMNAR_JSON_SUFFIX = '.columns.json'
+SVMLIGHT_SUFFIXES = ('.svm', '.svmlight', '.libsvm')
+# Set to 0 to load model.joblib even where a compiled.npz exists
+COMPILED_MODELS_ENV = 'MLSERVICE_COMPILED_MODELS'
+
+
+class SparseData:
+    """Sparse feature matrix with an optional target vector.
+
+    Returned by ``load_data`` for svmlight/libsvm and ``.npz`` CSR files.
+    Features are positional; ``feature_names`` is informational only.
+    """
+
+    def __init__(
+        self,
+        X: sp.spmatrix,
+        target: Optional[np.ndarray] = None,
+        feature_names: Optional[list] = None,
+    ):
+        self.X = sp.csr_matrix(X)
+        self.target = None if target is None else np.asarray(target)
+        self.feature_names = feature_names
+
+    @property
+    def shape(self):
+        """Return (n_rows, n_features)."""
+        return self.X.shape
+
+    def __len__(self) -> int:
+        return self.X.shape[0]
+
+    def __repr__(self) -> str:
+        return f"SparseData(shape={self.X.shape}, nnz={self.X.nnz}, target={self.target is not None})"
+
+
+def _load_svmlight(data_path: str) -> SparseData:
+    """Load an svmlight/libsvm file as CSR features plus target."""
+    from sklearn.datasets import load_svmlight_file
+
+    X, y = load_svmlight_file(data_path)
+    return SparseData(X, y)
+
+
+def _load_npz(data_path: str) -> Union[SparseData, Dict[str, np.ndarray]]:
+    """Load an ``.npz`` file.
+
+    Files written by ``scipy.sparse.save_npz`` (or ``save_sparse_data``) are
+    returned as SparseData; an optional ``target`` array becomes the target.
+    Any other archive is returned as a dict of arrays.
+    """
+    with np.load(data_path, allow_pickle=False) as archive:
+        if "format" not in archive.files:
+            return {name: archive[name] for name in archive.files}
+        target = archive["target"] if "target" in archive.files else None
+    return SparseData(sp.load_npz(data_path), target)
+
+
+def save_sparse_data(data_path: str, data: SparseData) -> None:
+    """Save SparseData as a CSR ``.npz`` file readable by ``load_data``."""
+    X = data.X.tocsr()
+    arrays = {
+        "format": np.array(X.format),
+        "shape": np.array(X.shape),
+        "data": X.data,
+        "indices": X.indices,
+        "indptr": X.indptr,
+    }
+    if data.target is not None:
+        arrays["target"] = data.target
+    np.savez_compressed(data_path, **arrays)
+
+
+def _json_loads(raw: Union[str, bytes]) -> Any:
+    """Parse a JSON document with orjson when available, else the stdlib.
+
+    Documents orjson rejects but the stdlib accepts, such as ``NaN`` and
+    ``Infinity`` (which ``json.dump`` writes by default) or integers wider
+    than 64 bits, are parsed again with the stdlib.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(raw)
+
+
+def _is_columnar_json(obj: Any) -> bool:
+    """Return True for the columnar layout ``{"columns": {name: [values]}}``.
+
+    An optional ``"dtypes"`` mapping of column name to NumPy dtype may sit
+    next to ``"columns"``.
+    """
+    return (
+        isinstance(obj, dict)
+        and isinstance(obj.get("columns"), dict)
+        and set(obj) <= {"columns", "dtypes"}
+        and all(isinstance(v, list) for v in obj["columns"].values())
+    )
+
+
+def _columnar_json_to_frame(obj: Dict[str, Any]) -> pd.DataFrame:
+    """Build a DataFrame from columnar JSON, one NumPy array per column."""
+    dtypes = obj.get("dtypes") or {}
+    arrays = {
+        name: np.asarray(values, dtype=dtypes.get(name))
+        for name, values in obj["columns"].items()
+    }
+    return pd.DataFrame(arrays, copy=False)
+
+
+def iter_json_lines(data_path: str, chunk_size: int = JSON_LINES_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """Stream a JSON Lines file as DataFrame chunks.
+
+    Records are accumulated column by column so only ``chunk_size`` rows are
+    held as Python objects at a time. Keys missing from a record become None.
+
+    Args:
+        data_path: Path to a ``.jsonl``/``.ndjson`` file
+        chunk_size: Maximum number of rows per yielded DataFrame
+
+    Yields:
+        DataFrame chunks in file order
+    """
+    columns: Dict[str, list] = {}
+    rows = 0
+    with open(data_path, 'rb') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = _json_loads(line)
+            if not isinstance(record, dict):
+                raise ValueError(f"Expected a JSON object per line in {data_path}, got {type(record).__name__}")
+            for key, value in record.items():
+                column = columns.get(key)
+                if column is None:
+                    column = columns[key] = [None] * rows
+                column.append(value)
+            rows += 1
+            if len(record) != len(columns):
+                for column in columns.values():
+                    if len(column) < rows:
+                        column.append(None)
+            if rows >= chunk_size:
+                yield pd.DataFrame(columns)
+                columns = {key: [] for key in columns}
+                rows = 0
+    if rows or not columns:
+        yield pd.DataFrame(columns)
+
+
+def _load_json(data_path: str) -> Any:
+    """Load a JSON file as parsed."""
+    with open(data_path, 'rb') as f:
+        return _json_loads(f.read())
+
+
+def _load_columnar_json(data_path: str) -> pd.DataFrame:
+    """Load a ``.columns.json`` file as a DataFrame.
+
+    Raises:
+        ValueError: If the file is not in the columnar layout
+    """
+    obj = _load_json(data_path)
+    if not _is_columnar_json(obj):
+        raise ValueError(
+            f"Expected {{\"columns\": {{name: [values]}}}} in {data_path}"
+        )
+    return _columnar_json_to_frame(obj)
+
+
+def load_data(data_path: Optional[str]) -> Optional[Union[pd.DataFrame, SparseData, Dict[str, Any]]]:
+    """Load data from specified path. Supports CSV, JSON, JSON Lines,
+    svmlight/libsvm and ``.npz`` CSR formats.
+
+    JSON Lines files (``.jsonl``/``.ndjson``) are streamed in columnar chunks.
+    ``.columns.json`` files hold the columnar layout
+    ``{"columns": {name: [values]}}`` and are converted straight to
+    NumPy-backed DataFrames; other JSON files are returned as parsed.
     
     Args:
         data_path: Path to the data file. If None, returns None.
         
     Returns:
-        DataFrame for CSV files, dict for JSON files, or None if path is None
+        DataFrame for CSV, JSON Lines and ``.columns.json`` files, SparseData for
+        svmlight and CSR ``.npz`` files, parsed object for other JSON files,
+        or None if path is None
         
     Raises:
         FileNotFoundError: If the file does not exist
-        ValueError: If the file format is not supported
+        ValueError: If the file format is not supported, or a
+            ``.columns.json`` file is not in the columnar layout
     """
     if data_path is None:
         return None
@@ -25,17 +217,119 @@ def load_data(data_path: Optional[str]) -> Optional[Union[pd.DataFrame, Dict[str
     if not os.path.exists(data_path):
         raise FileNotFoundError(f"Data file not found: {data_path}")
         
+    data_format = _data_format(data_path)
+    with DATA_LOAD_SECONDS.time(format=data_format):
+        if data_format == 'csv':
+            return pd.read_csv(data_path)
+        elif data_format == 'jsonl':
+            return pd.concat(iter_json_lines(data_path), ignore_index=True)
+        elif data_format == 'json_columns':
+            return _load_columnar_json(data_path)
+        elif data_format == 'json':
+            return _load_json(data_path)
+        elif data_format == 'svmlight':
+            return _load_svmlight(data_path)
+        elif data_format == 'npz':
+            return _load_npz(data_path)
+        else:
+            return data_path
+
+def _data_format(data_path: str) -> str:
+    """Return the format name ``load_data`` reads data_path as."""
     if data_path.endswith('.csv'):
-        return pd.read_csv(data_path)
+        return 'csv'
+    elif data_path.endswith(JSON_LINES_SUFFIXES):
+        return 'jsonl'
+    elif data_path.endswith(COLUMNAR_JSON_SUFFIX):
+        return 'json_columns'
     elif data_path.endswith('.json'):
-        with open(data_path, 'r') as f:
-            return json.load(f)
-    else:
-        return data_path
+        return 'json'
+    elif data_path.endswith(SVMLIGHT_SUFFIXES):
+        return 'svmlight'
+    elif data_path.endswith('.npz'):
+        return 'npz'
+    return 'path'
+
+def memory_usage(df: pd.DataFrame) -> int:
+    """Return the deep memory usage of a DataFrame in bytes, index included."""
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+def _arrow_string_dtype() -> Optional[pd.StringDtype]:
+    """Return the Arrow-backed string dtype, or None if pyarrow is missing."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return None
+    return pd.StringDtype("pyarrow")
+
+def optimize_dtypes(
+    df: pd.DataFrame,
+    categorical_columns: Optional[Iterable[str]] = None,
+    keep_columns: Optional[Iterable[str]] = None,
+    float_tolerance: float = 0.0,
+) -> pd.DataFrame:
+    """Shrink a DataFrame's memory footprint by narrowing column dtypes.
+
+    - float64 columns become float32 when every value survives the round
+      trip through float32 within ``float_tolerance`` (relative); with the
+      default of 0 only columns whose values float32 holds exactly, so no
+      value changes
+    - int64 columns become int32 when every value fits in int32
+    - ``categorical_columns`` become pandas Categoricals
+    - remaining string columns become Arrow-backed strings when pyarrow is
+      installed
+
+    Args:
+        df: DataFrame to optimise
+        categorical_columns: Columns to convert to Categorical
+        keep_columns: Columns left untouched, e.g. the target
+        float_tolerance: Largest relative error accepted when narrowing
+            float64 columns, e.g. 1e-6; 0 keeps values exact
+
+    Returns:
+        New DataFrame with narrowed dtypes; ``df`` is not modified
+    """
+    categorical = set(categorical_columns or [])
+    keep = set(keep_columns or [])
+    string_dtype = _arrow_string_dtype()
+    int32_info = np.iinfo(np.int32)
+
+    converted = {}
+    for name, column in df.items():
+        if name in keep:
+            continue
+        dtype = column.dtype
+        if name in categorical:
+            if not isinstance(dtype, pd.CategoricalDtype):
+                converted[name] = column.astype("category")
+        elif dtype == np.float64:
+            values = column.to_numpy()
+            # Values beyond the float32 range overflow to inf and fail the check
+            with np.errstate(over="ignore"):
+                narrowed = values.astype(np.float32)
+            if np.allclose(narrowed, values, rtol=float_tolerance, atol=0.0, equal_nan=True):
+                converted[name] = pd.Series(narrowed, index=column.index, name=name)
+        elif dtype == np.int64:
+            if column.empty or (column.min() >= int32_info.min and column.max() <= int32_info.max):
+                converted[name] = column.astype(np.int32)
+        elif dtype == object and string_dtype is not None:
+            if pd.api.types.infer_dtype(column, skipna=True) == "string":
+                converted[name] = column.astype(string_dtype)
+
+    if not converted:
+        return df
+    df = df.copy(deep=False)
+    for name, column in converted.items():
+        df[name] = column
+    return df
 
 def load_model(model_path: str) -> Any:
     """Load a saved model from a file.
     
+    A NumPy-only ``compiled.npz`` next to model.joblib is preferred unless
+    ``MLSERVICE_COMPILED_MODELS`` is set to 0 (see ``mlservice.core.compiled``)
+    or it is older than model.joblib, which was then replaced after compiling.
+    
     Args:
         model_path: Path to the model directory containing model.joblib
         
@@ -49,13 +343,26 @@ def load_model(model_path: str) -> Any:
     model_dir = Path(model_path)
     if not model_dir.exists():
         raise FileNotFoundError(f"Model directory not found: {model_path}")
-        
+    
+    from .compiled import COMPILED_FILE
+    compiled_file = model_dir / COMPILED_FILE
     model_file = model_dir / "model.joblib"
+    if compiled_file.exists() and os.getenv(COMPILED_MODELS_ENV, "1") != "0":
+        if model_file.exists() and compiled_file.stat().st_mtime_ns < model_file.stat().st_mtime_ns:
+            print(f"Warning: {compiled_file} is older than model.joblib, loading model.joblib")
+        else:
+            from .compiled import load_compiled
+            try:
+                return load_compiled(compiled_file)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Warning: Could not load {compiled_file}, loading model.joblib: {e}")
+        
     
     if not model_file.exists():
         raise FileNotFoundError(f"Model files missing in: {model_path}")
         
     try:
+        import joblib
         return joblib.load(model_file)
     except Exception as e:
         raise ValueError(f"Error loading model file: {str(e)}")
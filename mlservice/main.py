@@ -7,11 +7,45 @@ at /docs endpoint.
 """
 
 import argparse
+import os
+from contextlib import asynccontextmanager
+
 import uvicorn
 from fastapi import FastAPI
 
-from mlservice.core.registry import registry
+from mlservice.core.registry import registry, ROUTING_MODES
 from mlservice.core.router import router as core_router
+from mlservice.core.model_cache import model_cache, DEFAULT_WATCH_INTERVAL
+from mlservice.core.preload import start_preload, read_preload_config
+from mlservice.core.plugins import load_plugins
+from mlservice.core.metrics import MetricsMiddleware
+from mlservice.core.profiling import ProfilingMiddleware
+from mlservice.core.loop_monitor import loop_monitor, BLOCK_THRESHOLD_ENV
+from mlservice.core.server import PreforkServer, DEFAULT_BACKLOG, DEFAULT_GRACEFUL_TIMEOUT
+from mlservice.core.openapi_cache import install_openapi_cache, precompute_openapi
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Preload models and run the model hot-swap watcher for the lifetime of the server.
+
+    Preloading runs in the background; /ready reports 503 until it is done.
+    Workers forked from a preloaded parent skip it and serve the inherited
+    models and readiness state.
+    The OpenAPI schema is built (or loaded from its cache) before serving.
+    Event-loop lag is measured while serving, and blocking code is reported
+    when a block threshold is set.
+    """
+    precompute_openapi(app)
+    block_threshold = getattr(app.state, "loop_block_threshold", None) or os.getenv(BLOCK_THRESHOLD_ENV)
+    loop_monitor.start(float(block_threshold) if block_threshold else None)
+    if not getattr(app.state, "preloaded", False):
+        start_preload(getattr(app.state, "preload_models", None))
+    interval = getattr(app.state, "model_watch_interval", DEFAULT_WATCH_INTERVAL)
+    if interval and interval > 0:
+        model_cache.start_watcher(interval)
+    yield
+    model_cache.stop_watcher()
+    loop_monitor.stop()
 
 app = FastAPI(
     title="ML Service",
@@ -27,9 +61,19 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json",
-    swagger_ui_parameters={"defaultModelsExpandDepth": 1}
+    swagger_ui_parameters={"defaultModelsExpandDepth": 1},
+    lifespan=lifespan
 )
 
+# Serve /openapi.json from a cache keyed by the registered routes
+install_openapi_cache(app)
+
+# Profile requests that ask for it with the admin token, or 1 in N model requests
+app.add_middleware(ProfilingMiddleware)
+
+# Record request latency and in-flight requests for /metrics
+app.add_middleware(MetricsMiddleware)
+
 # Include core routes
 app.include_router(core_router)
 
@@ -51,32 +95,46 @@ async def hello():
     """
     return {"message": "Hello World"}
 
-def setup_routes(module_names: list[str] | None = None):
+def setup_routes(module_names: list[str] | None = None, lazy: bool = False,
+                 routing: str | None = None, plugins: bool = False):
     """
     Setup all registered routes and import external routes.
     
     Args:
         module_names (list[str] | None): List of external route module names to import.
             If None, no external routes are imported.
+        lazy (bool): Register model endpoints without importing their modules;
+            each module is imported by the first request that needs it.
+        routing (str | None): Model routing mode, "per-model" or "catalog".
+            Defaults to the registry's current mode. Set before importing the
+            modules so catalog mode skips building per-model endpoints.
+        plugins (bool): Also register models and routes of installed packages
+            declaring ``mlservice.models`` / ``mlservice.routes`` entry points.
     """
 
     print(f"Setting up routes with module names: {module_names}")
+    if routing:
+        registry.routing = routing
 
     # Import external routes if provided
     if module_names:
         for module_name in module_names:
             try:
                 print(f"Attempting to import routes from module: {module_name}")
-                registry.import_routes_from_module(module_name)
+                registry.import_routes_from_module(module_name, lazy=lazy)
                 print(f"Successfully imported routes from module: {module_name}")
             except ValueError as e:
                 print(f"Warning: Failed to import external routes from {module_name}: {e}")
             except Exception as e:
                 print(f"Unexpected error importing routes from {module_name}: {str(e)}")
 
+    if plugins:
+        loaded = load_plugins(lazy=lazy)
+        print(f"Loaded plugins: {loaded}")
+
     # Apply all registered routes to the FastAPI app
     print("Applying registered routes to FastAPI app")
-    registry.apply_routes(app)
+    registry.apply_routes(app, routing=routing)
     print("Finished applying routes")
 
 def main():
@@ -85,10 +143,60 @@ def main():
     parser.add_argument("--host", default="0.0.0.0", help="Host to bind the server to")
     parser.add_argument("--port", type=int, default=8000, help="Port to bind the server to")
     parser.add_argument("--external-routines", nargs="+", help="List of external routine modules to import")
+    parser.add_argument("--watch-interval", type=float, default=DEFAULT_WATCH_INTERVAL,
+                        help="Seconds between checks for replaced model artifacts and alias changes (0 disables hot-swap)")
+    parser.add_argument("--preload", nargs="+", default=[],
+                        help="Model paths or aliases to load and warm up before reporting ready")
+    parser.add_argument("--preload-config", default=None,
+                        help="JSON file listing model paths or aliases to preload")
+    parser.add_argument("--lazy-routes", action="store_true",
+                        help="Import model route modules on first request instead of at startup")
+    parser.add_argument("--routing", choices=ROUTING_MODES, default="per-model",
+                        help="'catalog' serves all models through one set of /model/{name}/... routes")
+    parser.add_argument("--no-plugins", dest="plugins", action="store_false",
+                        help="Do not load models and routes from installed entry point plugins")
+    parser.add_argument("--production", action="store_true",
+                        help="Run pre-forked workers that share preloaded models (implied by --workers > 1)")
+    parser.add_argument("--workers", type=int, default=1, help="Number of worker processes")
+    parser.add_argument("--backlog", type=int, default=DEFAULT_BACKLOG, help="Listen backlog of the server socket")
+    parser.add_argument("--limit-concurrency", type=int, default=None,
+                        help="Maximum concurrent connections per worker before responding 503")
+    parser.add_argument("--max-requests", type=int, default=None,
+                        help="Recycle a worker after this many requests")
+    parser.add_argument("--max-requests-jitter", type=int, default=0,
+                        help="Random extra requests per worker added to --max-requests")
+    parser.add_argument("--max-worker-rss", type=float, default=None,
+                        help="Recycle a worker once its resident memory exceeds this many MiB")
+    parser.add_argument("--timeout-graceful-shutdown", type=int, default=DEFAULT_GRACEFUL_TIMEOUT,
+                        help="Seconds a stopping worker waits for in-flight requests")
+    parser.add_argument("--loop-block-threshold", type=float, default=None,
+                        help="Print the stack of code blocking the event loop for longer than this many seconds")
     args = parser.parse_args()
     
-    setup_routes(args.external_routines)
-    uvicorn.run(app, host=args.host, port=args.port)
+    preload = list(args.preload or [])
+    if args.preload_config:
+        preload += read_preload_config(args.preload_config)
+    app.state.preload_models = preload
+    app.state.model_watch_interval = args.watch_interval
+    app.state.loop_block_threshold = args.loop_block_threshold
+    setup_routes(args.external_routines, lazy=args.lazy_routes, routing=args.routing,
+                 plugins=args.plugins)
+    if args.production or args.workers > 1:
+        PreforkServer(
+            app,
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            backlog=args.backlog,
+            limit_concurrency=args.limit_concurrency,
+            max_requests=args.max_requests,
+            max_requests_jitter=args.max_requests_jitter,
+            max_rss_mb=args.max_worker_rss,
+            timeout_graceful_shutdown=args.timeout_graceful_shutdown,
+            preload=preload,
+        ).run()
+    else:
+        uvicorn.run(app, host=args.host, port=args.port)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,161 @@
+"""
+Tests for model aliases and the model cache.
+"""
+import os
+import time
+import pickle
+import pytest
+from fastapi.testclient import TestClient
+
+from external_routes.mldemo.dummy import DummyModel
+from mlservice.core.aliases import AliasTable, is_alias, resolve_model_path, alias_table
+from mlservice.core.model_cache import ModelCache, model_cache
+from mlservice.main import setup_routes, app
+
+@pytest.fixture
+def trained_models(tmp_path):
+    os.environ['ML_HOME'] = str(tmp_path)
+    train_path = tmp_path / "train.csv"
+    train_path.write_text("col1\n1\n")
+    return [DummyModel(params={"run": i}).train(str(train_path))['model_path'] for i in range(2)]
+
+def touch_artifact(model_path):
+    model_file = os.path.join(model_path, "model.joblib")
+    stat = os.stat(model_file)
+    os.utime(model_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+@pytest.fixture
+def client():
+    setup_routes(['external_routes'])
+    return TestClient(app)
+
+def test_is_alias(tmp_path):
+    assert is_alias("sklearn/ridge@production")
+    assert not is_alias("/models/ridge/v1")
+    assert not is_alias("@production")
+    assert not is_alias("ridge@")
+    odd_dir = tmp_path / "model@dir"
+    odd_dir.mkdir()
+    assert not is_alias(str(odd_dir))
+
+def test_promote_and_resolve(trained_models):
+    table = AliasTable()
+    assert table.promote("dummy@production", trained_models[0]) is None
+    assert table.resolve("dummy@production") == trained_models[0]
+    assert table.promote("dummy@production", trained_models[1]) == trained_models[0]
+    assert table.resolve("dummy@production") == trained_models[1]
+
+    # A second table, e.g. in another worker, sees the promotion from disk
+    assert AliasTable().resolve("dummy@production") == trained_models[1]
+
+    assert table.remove("dummy@production")
+    with pytest.raises(KeyError):
+        table.resolve("dummy@production")
+
+def test_promote_prewarms_model(trained_models):
+    model_cache.clear()
+    alias_table.promote("dummy@staging", trained_models[0])
+    assert trained_models[0] in model_cache
+    assert resolve_model_path("dummy@staging") == trained_models[0]
+    assert resolve_model_path(trained_models[1]) == trained_models[1]
+
+def test_promote_invalid(trained_models, tmp_path):
+    with pytest.raises(ValueError):
+        alias_table.promote("production", trained_models[0])
+    with pytest.raises(FileNotFoundError):
+        alias_table.promote("dummy@production", str(tmp_path / "missing"))
+
+def test_model_cache_reloads_changed_artifact(trained_models):
+    cache = ModelCache(max_size=1)
+    with cache.acquire(trained_models[0]) as first, cache.acquire(trained_models[0]) as second:
+        assert second is first
+
+    # A replaced artifact is reloaded in the background; the old instance
+    # keeps serving until the new one is ready
+    touch_artifact(trained_models[0])
+    with cache.acquire(trained_models[0]) as model:
+        assert model is first
+    cache.wait_for_reloads()
+    with cache.acquire(trained_models[0]) as model:
+        assert model is not first
+
+    # The cache holds at most max_size models
+    cache.prewarm(trained_models[1])
+    assert trained_models[0] not in cache
+    assert trained_models[1] in cache
+
+def test_predict_by_alias(client, trained_models, tmp_path):
+    response = client.put("/aliases", json={"alias": "dummy@production", "model_path": trained_models[0]})
+    assert response.status_code == 200
+    assert response.json()["model_path"] == trained_models[0]
+
+    predict_path = tmp_path / "predict.csv"
+    predict_path.write_text("col1\n1\n")
+    response = client.post("/model/dummy/predict", json={
+        "data_path": str(predict_path),
+        "model_path": "dummy@production",
+    })
+    assert response.status_code == 200
+    with open(response.json(), 'rb') as f:
+        assert pickle.load(f) == {"message": "Dummy model prediction"}
+
+    response = client.post("/model/dummy/eval", json={
+        "data_path": str(predict_path),
+        "model_path": "dummy@production",
+    })
+    assert response.status_code == 200
+
+    assert client.get("/aliases").json() == {"dummy@production": trained_models[0]}
+    assert client.get("/aliases/dummy@production").json()["model_path"] == trained_models[0]
+    assert client.delete("/aliases/dummy@production").status_code == 200
+
+    response = client.post("/model/dummy/predict", json={
+        "data_path": str(predict_path),
+        "model_path": "dummy@production",
+    })
+    assert response.status_code == 404
+    assert client.put("/aliases", json={"alias": "bad", "model_path": trained_models[0]}).status_code == 400
+
+def test_hot_swap_waits_for_in_flight_requests(trained_models):
+    cache = ModelCache()
+    released = []
+    with cache.acquire(trained_models[0]) as old_model:
+        old_model.close = lambda: released.append(True)
+        touch_artifact(trained_models[0])
+        assert cache.check_for_updates() == [trained_models[0]]
+        cache.wait_for_reloads()
+        # New requests get the replacement, the in-flight one keeps the old
+        with cache.acquire(trained_models[0]) as new_model:
+            assert new_model is not old_model
+        assert old_model.fitted_
+        assert released == []
+    assert released == [True]
+
+def test_failed_reload_keeps_current_model(trained_models):
+    cache = ModelCache()
+    with cache.acquire(trained_models[0]) as current:
+        pass
+    model_file = os.path.join(trained_models[0], "model.joblib")
+    with open(model_file, "wb") as f:
+        f.write(b"not a model")
+    cache.check_for_updates()
+    cache.wait_for_reloads()
+    with cache.acquire(trained_models[0]) as model:
+        assert model is current
+    # The broken version is not retried until the artifact changes again
+    assert cache.check_for_updates() == []
+
+def test_watcher_prewarms_alias_targets(trained_models):
+    alias_table.promote("dummy@canary", trained_models[0])
+    model_cache.clear()
+    model_cache.start_watcher(interval=0.05)
+    try:
+        # Another worker repoints the alias on disk
+        alias_table._index().set_alias("dummy@canary", trained_models[1])
+        deadline = time.monotonic() + 5
+        while alias_table.resolve("dummy@canary") != trained_models[1]:
+            assert time.monotonic() < deadline
+            time.sleep(0.05)
+        assert trained_models[1] in model_cache
+    finally:
+        model_cache.stop_watcher()
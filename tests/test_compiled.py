@@ -0,0 +1,200 @@
+"""
+Tests for NumPy-only compiled linear model artifacts.
+"""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from external_routes.sklearn.tab_model import LogisticRegressionModel, RidgeModel
+from mlservice.core.compiled import (
+    COMPILED_FILE, CompiledLinearClassification, CompiledLinearRegression, export_compiled, load_compiled,
+)
+from mlservice.core.utils import load_model
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    n = 300
+    df = pd.DataFrame({
+        "x0": rng.standard_normal(n),
+        "x1": rng.standard_normal(n).astype(np.float32),
+        "color": rng.choice(["red", "green", "blue"], n),
+    })
+    df["target"] = (df["x0"] + (df["color"] == "red") > 0.3).astype(int)
+    df["multi"] = np.digitize(df["x0"], [-0.5, 0.5])
+    return df
+
+
+def _train(model, frame, tmp_path):
+    os.environ["ML_HOME"] = str(tmp_path)
+    train_path = tmp_path / "train.csv"
+    frame.to_csv(train_path, index=False)
+    return model.train(str(train_path))
+
+
+@pytest.mark.parametrize("model_class, columns, compiled_class", [
+    (RidgeModel, {"target": "target", "categorical": ["color"]}, CompiledLinearRegression),
+    (RidgeModel, {"target": "target", "categorical": ["color"], "categorical_encoding": "ordinal"},
+     CompiledLinearRegression),
+    (LogisticRegressionModel, {"target": "target", "categorical": ["color"]}, CompiledLinearClassification),
+])
+def test_compiled_matches_estimator(frame, tmp_path, model_class, columns, compiled_class):
+    model = model_class(params={"columns": columns})
+    metadata = _train(model, frame.drop(columns=["multi"]), tmp_path)
+    assert metadata["compiled"] == COMPILED_FILE
+
+    compiled = load_model(metadata["model_path"])
+    assert isinstance(compiled, compiled_class)
+    assert compiled.model_name == model.model_name
+
+    data = frame.drop(columns=["target", "multi"])
+    expected = model._predict(data.copy())
+    actual = compiled._predict(data.copy())
+    np.testing.assert_array_equal(actual[model.prediction_column], expected[model.prediction_column])
+    if model.predict_proba_column in expected:
+        np.testing.assert_allclose(actual[model.predict_proba_column], expected[model.predict_proba_column],
+                                   rtol=1e-6)
+    else:
+        np.testing.assert_allclose(actual[model.prediction_column], expected[model.prediction_column], rtol=1e-6)
+
+    with pytest.raises(ValueError):
+        compiled.train(str(tmp_path / "train.csv"))
+
+
+def test_multiclass_softmax(frame, tmp_path):
+    model = LogisticRegressionModel(params={"columns": {"target": "multi", "categorical": ["color"]}})
+    train = frame.drop(columns=["target"])
+    model._train(train)
+    model.fitted_ = True
+    compiled = load_compiled(export_compiled(model, tmp_path))
+    assert compiled.link == "softmax"
+
+    data = frame.drop(columns=["target", "multi"])
+    X = model._transform_features(data)
+    scores = compiled._decision(data)
+    np.testing.assert_allclose(compiled._probabilities(scores), model.model.predict_proba(X), rtol=1e-6)
+    np.testing.assert_array_equal(compiled._predict(data.copy())[compiled.prediction_column],
+                                  model.model.predict(X))
+
+
+def test_multiclass_liblinear_is_ovr(frame, tmp_path):
+    model = LogisticRegressionModel(params={"columns": {"target": "multi", "categorical": ["color"]}})
+    train = frame.drop(columns=["target"])
+    model._train(train)
+    model.fitted_ = True
+    # A multiclass liblinear fit with the default multi_class predicts with
+    # normalised one-vs-rest sigmoids; newer scikit-learn rejects the fit
+    model.model.solver = "liblinear"
+    compiled = load_compiled(export_compiled(model, tmp_path))
+    assert compiled.link == "ovr"
+
+    data = frame.drop(columns=["target", "multi"])
+    X = model._transform_features(data)
+    np.testing.assert_allclose(compiled._probabilities(compiled._decision(data)),
+                               model.model._predict_proba_lr(X), rtol=1e-6)
+
+
+def test_unsupported_model_is_not_compiled(frame, tmp_path):
+    from sklearn.tree import DecisionTreeRegressor
+
+    model = RidgeModel(params={"columns": {"target": "target", "categorical": ["color"]}})
+    model.model = DecisionTreeRegressor()
+    metadata = _train(model, frame.drop(columns=["multi"]), tmp_path)
+    assert "compiled" not in metadata
+    assert isinstance(load_model(metadata["model_path"]), RidgeModel)
+
+
+def test_joblib_fallback(frame, tmp_path, monkeypatch):
+    model = RidgeModel(params={"columns": {"target": "target", "categorical": ["color"]}})
+    metadata = _train(model, frame.drop(columns=["multi"]), tmp_path)
+    monkeypatch.setenv("MLSERVICE_COMPILED_MODELS", "0")
+    assert isinstance(load_model(metadata["model_path"]), RidgeModel)
+    monkeypatch.delenv("MLSERVICE_COMPILED_MODELS")
+
+    (Path(metadata["model_path"]) / COMPILED_FILE).write_bytes(b"not a zip file")
+    assert isinstance(load_model(metadata["model_path"]), RidgeModel)
+
+
+def test_stale_compiled_artifact_is_ignored(frame, tmp_path):
+    from mlservice.core.model_cache import _artifact_version
+
+    model = RidgeModel(params={"columns": {"target": "target", "categorical": ["color"]}})
+    metadata = _train(model, frame.drop(columns=["multi"]), tmp_path)
+    model_dir = Path(metadata["model_path"])
+    compiled_file = model_dir / COMPILED_FILE
+    assert isinstance(load_model(str(model_dir)), CompiledLinearRegression)
+
+    # Touching compiled.npz alone is a new artifact version
+    version = _artifact_version(str(model_dir))
+    stat = compiled_file.stat()
+    os.utime(compiled_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert _artifact_version(str(model_dir)) != version
+
+    # model.joblib replaced in place after compiling: compiled.npz is stale
+    model_file = model_dir / "model.joblib"
+    os.utime(model_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2_000_000))
+    assert isinstance(load_model(str(model_dir)), RidgeModel)
+
+
+def test_serving_does_not_import_sklearn(frame, tmp_path):
+    model = LogisticRegressionModel(params={"columns": {"target": "target", "categorical": ["color"]}})
+    metadata = _train(model, frame.drop(columns=["multi"]), tmp_path)
+    predict_path = tmp_path / "predict.csv"
+    frame.drop(columns=["target", "multi"]).to_csv(predict_path, index=False)
+
+    script = (
+        "import sys, json, pandas as pd\n"
+        "from mlservice.core.utils import load_model\n"
+        f"model = load_model({metadata['model_path']!r})\n"
+        f"path = model.predict({str(predict_path)!r})\n"
+        "print(json.dumps({'sklearn': any(m.split('.')[0] == 'sklearn' for m in sys.modules),\n"
+        "                  'class': type(model).__name__, 'rows': len(pd.read_pickle(path))}))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True,
+                            env={**os.environ, "ML_HOME": str(tmp_path)})
+    output = json.loads(result.stdout.strip().splitlines()[-1])
+    assert output == {"sklearn": False, "class": "CompiledLinearClassification", "rows": len(frame)}
+
+
+def test_load_compiled_rejects_unknown_version(frame, tmp_path):
+    model = RidgeModel(params={"columns": {"target": "target", "categorical": ["color"]}})
+    metadata = _train(model, frame.drop(columns=["multi"]), tmp_path)
+    path = Path(metadata["model_path"]) / COMPILED_FILE
+    with np.load(path) as arrays:
+        meta = json.loads(str(arrays["meta"]))
+        coef, intercept = arrays["coef"], arrays["intercept"]
+    meta["format_version"] = 99
+    np.savez(path, coef=coef, intercept=intercept, meta=np.array(json.dumps(meta)))
+    with pytest.raises(ValueError):
+        load_compiled(path)
+
+
+
+class ScaledRidge(RidgeModel):
+    def _predict(self, data):
+        predictions = super()._predict(data)
+        predictions[self.prediction_column] *= 100
+        return predictions
+
+
+class TunedRidge(RidgeModel):
+    def __init__(self, params=None):
+        super().__init__(params)
+        self.model.set_params(alpha=0.5)
+
+
+def test_subclass_overriding_prediction_is_not_compiled(frame, tmp_path):
+    columns = {"target": "target", "categorical": ["color"]}
+    metadata = _train(ScaledRidge(params={"columns": columns}), frame.drop(columns=["multi"]), tmp_path)
+    assert "compiled" not in metadata
+    assert isinstance(load_model(metadata["model_path"]), ScaledRidge)
+
+    metadata = _train(TunedRidge(params={"columns": columns}), frame.drop(columns=["multi"]), tmp_path)
+    assert metadata["compiled"] == COMPILED_FILE
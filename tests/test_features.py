@@ -0,0 +1,113 @@
+"""
+Tests for feature preparation.
+"""
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.sparse as sp
+
+from mlservice.core.features import CategoricalEncoder, FeatureSchema, combine_features
+
+@pytest.fixture
+def categorical_data():
+    return pd.DataFrame({
+        "color": ["red", "blue", "red", None],
+        "size": ["S", "M", "L", "M"],
+        "value": [1.0, 2.0, 3.0, 4.0],
+    })
+
+def test_ordinal_encoding(categorical_data):
+    encoder = CategoricalEncoder(["color", "size"], method="ordinal").fit(categorical_data)
+    encoded = encoder.transform(categorical_data)
+    assert encoded.shape == (4, 2)
+    # Categories are sorted: blue=0, red=1; missing values map to -1
+    assert encoded[:, 0].tolist() == [1.0, 0.0, 1.0, -1.0]
+
+def test_onehot_encoding_is_sparse(categorical_data):
+    encoder = CategoricalEncoder(["color", "size"], method="onehot").fit(categorical_data)
+    encoded = encoder.transform(categorical_data)
+    assert sp.issparse(encoded)
+    assert encoded.shape == (4, encoder.n_features) == (4, 5)
+    assert encoder.feature_names[:2] == ["color=blue", "color=red"]
+    assert encoded.sum(axis=1).A1.tolist() == [2.0, 2.0, 2.0, 1.0]
+
+def test_unseen_categories(categorical_data):
+    encoder = CategoricalEncoder(["color"]).fit(categorical_data)
+    new_data = pd.DataFrame({"color": ["green", "red"]})
+    encoded = encoder.transform(new_data).toarray()
+    assert encoded.tolist() == [[0.0, 0.0], [0.0, 1.0]]
+
+def test_categorical_dtype_input(categorical_data):
+    encoder = CategoricalEncoder(["size"], method="ordinal").fit(categorical_data)
+    as_category = categorical_data.astype({"size": "category"})
+    np.testing.assert_array_equal(encoder.transform(as_category), encoder.transform(categorical_data))
+
+def test_encoder_round_trip(categorical_data):
+    encoder = CategoricalEncoder(["color", "size"]).fit(categorical_data)
+    restored = CategoricalEncoder.from_dict(encoder.to_dict())
+    assert (restored.transform(categorical_data) != encoder.transform(categorical_data)).nnz == 0
+
+def test_invalid_method():
+    with pytest.raises(ValueError):
+        CategoricalEncoder(["color"], method="hashing")
+
+def test_combine_features():
+    numeric = np.ones((2, 2))
+    dense = combine_features(numeric, np.zeros((2, 1)))
+    assert isinstance(dense, np.ndarray) and dense.shape == (2, 3)
+    sparse = combine_features(numeric, sp.csr_matrix(np.eye(2)))
+    assert sp.issparse(sparse) and sparse.shape == (2, 4)
+    assert combine_features(numeric, None) is numeric
+
+@pytest.fixture
+def numeric_data():
+    return pd.DataFrame({
+        "a": np.arange(4, dtype=np.float32),
+        "b": np.arange(4, dtype=np.int32),
+        "target": np.zeros(4),
+    })
+
+def test_feature_schema_matrix(numeric_data):
+    schema = FeatureSchema.from_frame(numeric_data, ["b", "a"])
+    assert schema.dtype == np.float64
+    X = schema.matrix(numeric_data)
+    assert X.dtype == np.float64
+    np.testing.assert_array_equal(X, numeric_data[["b", "a"]].to_numpy(dtype=np.float64))
+
+def test_feature_schema_zero_copy():
+    data = pd.DataFrame(np.random.rand(5, 3), columns=["x", "y", "z"])
+    schema = FeatureSchema.from_frame(data, ["x", "y", "z"])
+    X = schema.matrix(data)
+    assert np.shares_memory(X, data.to_numpy())
+
+def test_feature_schema_reuses_buffer(numeric_data):
+    schema = FeatureSchema.from_frame(numeric_data, ["a", "b"])
+    first = schema.matrix(numeric_data, reuse=True)
+    second = schema.matrix(numeric_data.iloc[:2], reuse=True)
+    assert np.shares_memory(first, second)
+    assert second.shape == (2, 2)
+    assert second.flags.f_contiguous
+    np.testing.assert_array_equal(second, numeric_data[["a", "b"]].iloc[:2].to_numpy(dtype=np.float64))
+    assert not np.shares_memory(schema.matrix(numeric_data), first)
+
+def test_feature_schema_validation(numeric_data):
+    schema = FeatureSchema.from_frame(numeric_data, ["a", "b"])
+    with pytest.raises(ValueError, match="missing feature columns"):
+        schema.matrix(numeric_data.drop(columns=["b"]))
+    with pytest.raises(ValueError, match="non-numeric"):
+        FeatureSchema.from_frame(pd.DataFrame({"s": ["x"]}), ["s"])
+    with pytest.raises(ValueError, match="Feature column 'b' has dtype object"):
+        schema.matrix(numeric_data.assign(b=["1", "2", "3", "4"]))
+    # Other numeric dtypes are cast
+    X = schema.matrix(numeric_data.assign(b=np.arange(4, dtype=np.float32)))
+    np.testing.assert_array_equal(X[:, 1], np.arange(4))
+
+def test_feature_schema_serialisation(numeric_data):
+    schema = FeatureSchema.from_frame(numeric_data, ["a", "b"])
+    schema.matrix(numeric_data, reuse=True)
+    restored = pickle.loads(pickle.dumps(schema))
+    assert restored.columns == ["a", "b"]
+    assert FeatureSchema.from_dict(schema.to_dict()).dtypes == schema.dtypes
+    np.testing.assert_array_equal(restored.matrix(numeric_data), schema.matrix(numeric_data))
@@ -0,0 +1,61 @@
+"""
+Import-time budget for the service entry point.
+
+Heavy dependencies (pandas, joblib, scikit-learn, ...) must only load when
+model code first needs them, so starting the CLI or forking a worker stays
+cheap. The budget can be adjusted with MLSERVICE_IMPORT_BUDGET_MS.
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+IMPORT_BUDGET_MS = float(os.getenv("MLSERVICE_IMPORT_BUDGET_MS", "1500"))
+HEAVY_MODULES = ("pandas", "joblib", "sklearn", "scipy", "numpy")
+RUNS = 3
+
+
+def import_time_ms(module: str) -> float:
+    """Return the cumulative import time of module in a fresh interpreter."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True,
+    )
+    for line in result.stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            return int(fields[1]) / 1000
+    raise AssertionError(f"No import time reported for {module}:\n{result.stderr[-2000:]}")
+
+
+def imported_modules(module: str) -> set:
+    """Return the top-level modules loaded by importing module."""
+    code = f"import sys, {module}; print(' '.join(sorted({{m.split('.')[0] for m in sys.modules}})))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return set(result.stdout.split())
+
+
+@pytest.mark.parametrize("module", ["mlservice.main", "mlservice.core"])
+def test_no_heavy_imports(module):
+    """Test that importing the entry point does not load heavy dependencies."""
+    assert not imported_modules(module) & set(HEAVY_MODULES)
+
+
+def test_core_exports_resolve_lazily():
+    """Test that the lazy mlservice.core exports still resolve."""
+    import mlservice.core as core
+    from mlservice.core.tabml import TabRegression
+
+    assert core.TabRegression is TabRegression
+    assert "load_data" in dir(core)
+    with pytest.raises(AttributeError):
+        core.missing_name
+
+
+def test_import_time_budget():
+    """Test that importing mlservice.main stays within the startup budget."""
+    best = min(import_time_ms("mlservice.main") for _ in range(RUNS))
+    assert best <= IMPORT_BUDGET_MS, (
+        f"Importing mlservice.main took {best:.0f}ms, budget is {IMPORT_BUDGET_MS:.0f}ms"
+    )
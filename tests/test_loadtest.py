@@ -0,0 +1,19 @@
+"""
+Tests for the HTTP load-test harness.
+"""
+from fastapi.testclient import TestClient
+
+from benchmarks.loadtest import DEFAULT_SCENARIO, prepare
+from mlservice.main import app, setup_routes
+
+
+def test_prepare_default_scenario(tmp_path, monkeypatch):
+    monkeypatch.setenv("ML_HOME", str(tmp_path))
+    setup_routes(['external_routes'])
+    scenario = dict(DEFAULT_SCENARIO, train_rows=200, rows=20)
+    with TestClient(app) as client:
+        setup = prepare(client, scenario)
+        response = client.post(f"/model/{scenario['model']}/predict", json={
+            "data_path": setup["data_path"], "model_path": setup["model_path"],
+        })
+    assert response.status_code == 200
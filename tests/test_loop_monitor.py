@@ -0,0 +1,57 @@
+"""
+Tests for the event-loop lag monitor and blocking-call detector.
+"""
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+
+from mlservice.core.loop_monitor import LoopMonitor
+from mlservice.core.metrics import metrics_registry
+from mlservice.main import app
+
+
+def _blocking_handler():
+    time.sleep(0.3)
+
+
+def test_blocking_stack_is_reported():
+    monitor = LoopMonitor(interval=0.01)
+
+    async def run():
+        monitor.start(block_threshold=0.1)
+        await asyncio.sleep(0.05)
+        _blocking_handler()
+        await asyncio.sleep(0.05)
+        monitor.stop()
+
+    asyncio.run(run())
+    assert len(monitor.reports) == 1
+    report = monitor.reports[0]
+    assert report["blocked_seconds"] > 0.1
+    assert "_blocking_handler" in report["stack"]
+    assert "time.sleep(0.3)" in report["stack"]
+
+
+def test_lag_without_threshold():
+    monitor = LoopMonitor(interval=0.01)
+
+    async def run():
+        monitor.start()
+        await asyncio.sleep(0.05)
+        time.sleep(0.05)
+        await asyncio.sleep(0.05)
+        monitor.stop()
+
+    asyncio.run(run())
+    assert not monitor.reports
+    assert monitor._watchdog is None
+    assert "mlservice_event_loop_lag_seconds_count" in metrics_registry.render()
+
+
+def test_lifespan_starts_monitor():
+    from mlservice.core.loop_monitor import loop_monitor
+
+    with TestClient(app):
+        assert loop_monitor._task is not None
+    assert loop_monitor._task is None
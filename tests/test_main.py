@@ -53,6 +53,15 @@ def test_main_default_args(mock_run, mock_parse_args):
     args.host = "0.0.0.0"
     args.port = 8000
     args.external_routines = None
+    args.watch_interval = 2.0
+    args.preload = []
+    args.preload_config = None
+    args.lazy_routes = False
+    args.routing = "per-model"
+    args.plugins = False
+    args.production = False
+    args.workers = 1
+    args.loop_block_threshold = None
     mock_parse_args.return_value = args
     
     main()
@@ -67,8 +76,19 @@ def test_main_custom_args(mock_run, mock_parse_args):
     args.host = "localhost"
     args.port = 9000
     args.external_routines = ["external_routes"]
+    args.watch_interval = 0
+    args.preload = ["sklearn/ridge@production"]
+    args.preload_config = None
+    args.lazy_routes = False
+    args.routing = "per-model"
+    args.plugins = False
+    args.production = False
+    args.workers = 1
+    args.loop_block_threshold = None
     mock_parse_args.return_value = args
     
     main()
     
     mock_run.assert_called_once_with(app, host="localhost", port=9000)
+    assert app.state.preload_models == ["sklearn/ridge@production"]
+    assert app.state.model_watch_interval == 0
@@ -0,0 +1,95 @@
+"""
+Tests for per-operation memory accounting.
+"""
+import json
+import threading
+import tracemalloc
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from mlservice.core.memory import (
+    TRACK_PEAK_RSS_ENV, add_data_memory, memory_phase, record_data_memory, record_memory, rss_bytes,
+)
+from mlservice.main import app, setup_routes
+
+
+@pytest.fixture
+def tracing():
+    tracemalloc.start()
+    yield
+    tracemalloc.stop()
+
+
+def test_record_memory_phases(tracing, monkeypatch):
+    monkeypatch.setenv(TRACK_PEAK_RSS_ENV, "1")
+    with record_memory("test", "train") as memory:
+        with memory_phase("test", "train", "allocate"):
+            blob = [bytearray(1024) for _ in range(4096)]
+        with memory_phase("test", "train", "temporary"):
+            bytes(8 * 1024 * 1024)
+
+    assert memory["rss_before"] > 0 and memory["rss_after"] > 0
+    if "peak_rss" in memory:
+        assert memory["peak_rss"] >= memory["rss_after"]
+
+    allocate = memory["phases"]["allocate"]
+    assert allocate["traced_delta"] >= 4 * 1024 * 1024
+    assert allocate["top_allocations"][0]["site"].startswith(f"{__file__}:")
+    assert allocate["top_allocations"][0]["size"] >= 4 * 1024 * 1024
+
+    # Freed before the phase ends: counted in the peak only
+    temporary = memory["phases"]["temporary"]
+    assert temporary["peak_traced"] >= 8 * 1024 * 1024
+    assert temporary["traced_delta"] < 1024 * 1024
+    del blob
+
+
+def test_phases_without_tracemalloc():
+    assert not tracemalloc.is_tracing()
+    with record_memory("test", "predict") as memory:
+        with memory_phase("test", "predict", "predict"):
+            pass
+    assert set(memory) == {"rss_before", "rss_after", "phases"}
+    assert set(memory["phases"]["predict"]) == {"rss_delta"}
+    assert rss_bytes() > 1024 * 1024
+
+
+def test_memory_in_metadata(tmp_path, monkeypatch):
+    monkeypatch.setenv("ML_HOME", str(tmp_path))
+    monkeypatch.setenv(TRACK_PEAK_RSS_ENV, "1")
+    setup_routes(['external_routes'])
+    client = TestClient(app)
+    data_path = tmp_path / "data.csv"
+    data_path.write_text("col1\n1\n2\n")
+
+    response = client.post("/model/dummy/train", json={"train_path": str(data_path)})
+    assert response.status_code == 200
+    memory = response.json()["memory"]
+    assert list(memory["phases"]) == ["load_data", "fit", "evaluate", "write_artifact"]
+
+    response = client.post("/model/dummy/predict",
+                           json={"data_path": str(data_path), "model_path": response.json()["model_path"]})
+    assert response.status_code == 200
+    metadata = json.loads(Path(response.json()).with_suffix(".json").read_text())
+    assert list(metadata["memory"]["phases"]) == ["load_data", "predict", "write_prediction"]
+
+    text = client.get("/metrics").text
+    assert 'mlservice_operation_peak_rss_bytes_count{model="dummy",operation="predict"}' in text
+
+
+def test_data_memory_is_per_call():
+    def other_call():
+        with record_data_memory() as usage:
+            add_data_memory("predict", 4, 3)
+        assert usage == {"predict": {"before": 4, "after": 3}}
+
+    with record_data_memory() as usage:
+        add_data_memory("train", 2, 1)
+        thread = threading.Thread(target=other_call)
+        thread.start()
+        thread.join()
+    assert usage == {"train": {"before": 2, "after": 1}}
+    # Outside a call nothing is recorded
+    add_data_memory("evaluate", 1, 1)
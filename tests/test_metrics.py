@@ -0,0 +1,171 @@
+"""
+Tests for the metrics subsystem and /metrics endpoint.
+"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+
+from mlservice.core.metrics import MetricsRegistry, METRICS_DIR_ENV
+from mlservice.main import app, setup_routes
+
+
+def test_render_text_format():
+    registry = MetricsRegistry()
+    requests = registry.counter("test_requests_total", "Requests", ("route",))
+    in_flight = registry.gauge("test_in_flight", "In flight")
+    latency = registry.histogram("test_latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+
+    requests.inc(route="/a")
+    requests.inc(2, route="/a")
+    in_flight.inc()
+    latency.observe(0.05, route="/a")
+    latency.observe(0.5, route="/a")
+    latency.observe(5, route="/a")
+
+    text = registry.render()
+    assert "# TYPE test_requests_total counter" in text
+    assert 'test_requests_total{route="/a"} 3' in text
+    assert "test_in_flight 1" in text
+    assert 'test_latency_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'test_latency_seconds_bucket{route="/a",le="1"} 2' in text
+    assert 'test_latency_seconds_bucket{route="/a",le="+Inf"} 3' in text
+    assert 'test_latency_seconds_count{route="/a"} 3' in text
+    assert 'test_latency_seconds_sum{route="/a"} 5.55' in text
+
+    with pytest.raises(ValueError):
+        requests.inc(model="x")
+
+
+def test_merge_across_processes(tmp_path, monkeypatch):
+    monkeypatch.setenv(METRICS_DIR_ENV, str(tmp_path))
+    registry = MetricsRegistry()
+    requests = registry.counter("test_requests_total", "Requests")
+    in_flight = registry.gauge("test_in_flight", "In flight")
+    requests.inc()
+    in_flight.inc()
+
+    # An exited worker: its counters still count, its gauges do not
+    exited = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"],
+                            capture_output=True, text=True, check=True)
+    snapshot = {"test_requests_total": [[[], 4.0]], "test_in_flight": [[[], 2.0]]}
+    (tmp_path / f"{exited.stdout.strip()}.json").write_text(json.dumps(snapshot))
+    # A live worker
+    (tmp_path / f"{os.getppid()}.json").write_text(json.dumps(snapshot))
+
+    text = registry.render()
+    assert "test_requests_total 9" in text
+    assert "test_in_flight 3" in text
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_forked_worker_starts_from_zero(tmp_path, monkeypatch):
+    from mlservice.core.metrics import metrics_registry, PHASE_SECONDS
+
+    monkeypatch.setenv(METRICS_DIR_ENV, str(tmp_path))
+    PHASE_SECONDS.observe(1.0, model="fork-test", operation="train", phase="fit")
+    pid = os.fork()
+    if pid == 0:
+        PHASE_SECONDS.observe(2.0, model="fork-test", operation="train", phase="fit")
+        metrics_registry.flush()
+        os._exit(0)
+    os.waitpid(pid, 0)
+
+    text = metrics_registry.render()
+    labels = 'model="fork-test",operation="train",phase="fit"'
+    assert f"mlservice_phase_duration_seconds_count{{{labels}}} 2" in text
+    assert f"mlservice_phase_duration_seconds_sum{{{labels}}} 3" in text
+
+
+def test_metrics_endpoint(tmp_path, monkeypatch):
+    monkeypatch.setenv("ML_HOME", str(tmp_path))
+    setup_routes(['external_routes'])
+    client = TestClient(app)
+    train_path = tmp_path / "train.csv"
+    train_path.write_text("col1\n1\n2\n")
+    assert client.post("/model/dummy/train", json={"train_path": str(train_path)}).status_code == 200
+    client.get("/no/such/path")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert ('mlservice_http_request_duration_seconds_count{method="POST",'
+            'route="/model/dummy/train",model="dummy",status="200"}') in text
+    assert 'route="unmatched",model="",status="404"' in text
+    for phase in ("load_data", "fit", "evaluate", "write_artifact"):
+        assert f'mlservice_phase_duration_seconds_count{{model="dummy",operation="train",phase="{phase}"}}' in text
+    assert 'mlservice_data_load_duration_seconds_count{format="csv"}' in text
+    assert 'mlservice_model_requests_in_progress{model="dummy",operation="train"} 0' in text
+    assert 'mlservice_http_requests_in_progress{method="GET"} 1' in text
+
+
+def test_server_timing_header(tmp_path, monkeypatch):
+    monkeypatch.setenv("ML_HOME", str(tmp_path))
+    setup_routes(['external_routes'])
+    client = TestClient(app)
+    data_path = tmp_path / "data.csv"
+    data_path.write_text("col1\n1\n2\n")
+
+    response = client.post("/model/dummy/train", json={"train_path": str(data_path)})
+    assert response.status_code == 200
+    timings = response.json()["timings"]
+    assert list(timings) == ["load_data", "fit", "evaluate", "write_artifact"]
+    assert all(seconds >= 0 for seconds in timings.values())
+    assert "fit;dur=" in response.headers["server-timing"]
+
+    model_path = response.json()["model_path"]
+    response = client.post("/model/dummy/predict", json={"data_path": str(data_path), "model_path": model_path})
+    assert response.status_code == 200
+    names = [entry.split(";")[0] for entry in response.headers["server-timing"].split(", ")]
+    assert names == ["load_model", "load_data", "predict", "write_prediction", "total"]
+
+    assert "server-timing" not in client.get("/").headers
+
+
+def test_write_artifact_covers_metadata_write(tmp_path, monkeypatch):
+    import time
+    from mlservice.core.metrics import PHASE_SECONDS
+    from mlservice.core.ml import MLModel
+
+    monkeypatch.setenv("ML_HOME", str(tmp_path))
+    setup_routes(['external_routes'])
+    client = TestClient(app)
+    data_path = tmp_path / "data.csv"
+    data_path.write_text("col1\n1\n2\n")
+    write_metadata = MLModel._write_metadata
+
+    def slow_write_metadata(self, model_dir, metadata):
+        time.sleep(0.05)
+        write_metadata(self, model_dir, metadata)
+    monkeypatch.setattr(MLModel, "_write_metadata", slow_write_metadata)
+
+    def write_artifact_count():
+        for key, (counts, _) in PHASE_SECONDS.snapshot():
+            if key == ["dummy", "train", "write_artifact"]:
+                return sum(counts)
+        return 0
+
+    before = write_artifact_count()
+    response = client.post("/model/dummy/train", json={"train_path": str(data_path)})
+    assert response.status_code == 200
+    assert write_artifact_count() == before + 1
+    entries = dict(entry.split(";dur=") for entry in response.headers["server-timing"].split(", "))
+    assert float(entries["write_artifact"]) >= 50
+
+
+def test_record_timings_nesting():
+    from mlservice.core.metrics import phase, record_timings, server_timing
+
+    with record_timings() as outer:
+        with phase("m", "train", "fit"):
+            pass
+        with record_timings() as inner:
+            with phase("m", "train", "evaluate"):
+                pass
+    assert [name for name, _ in inner] == ["evaluate"]
+    assert [name for name, _ in outer] == ["fit", "evaluate"]
+    assert server_timing([("fit", 0.5), ("fit", 0.25)]) == "fit;dur=750.000"
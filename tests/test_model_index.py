@@ -0,0 +1,132 @@
+"""
+Tests for the model artifact index.
+"""
+import json
+import os
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from external_routes.mldemo.dummy import DummyModel
+from mlservice.core.ml import _model_router
+from mlservice.core.model_index import INDEX_FILENAME, ModelIndex
+from mlservice.main import app
+
+def make_metadata(ml_home, name, day, auc, version="v1"):
+    return {
+        "timestamp": f"2025-01-{day:02d}T00:00:00",
+        "model_path": str(ml_home / "models" / name / version / "2025" / "01" / f"{day:02d}" / f"id-{day}"),
+        "model_name": name,
+        "model_version": version,
+        "model_class": "RidgeModel",
+        "metrics": {"test": {"auc_score": auc, "f1": None}},
+    }
+
+@pytest.fixture
+def index(tmp_path):
+    index = ModelIndex.for_ml_home(str(tmp_path))
+    for day, auc in [(1, 0.7), (2, 0.9), (3, 0.8)]:
+        index.add(make_metadata(tmp_path, "sklearn/ridge", day, auc))
+    index.add(make_metadata(tmp_path, "sklearn/logistic", 4, 0.95))
+    return index
+
+def test_search_latest(index):
+    result = index.search(name="sklearn/ridge", limit=1)
+    assert result["total"] == 3
+    assert result["items"][0]["timestamp"] == "2025-01-03T00:00:00"
+
+def test_search_best_metric(index):
+    result = index.search(since="2025-01-02", metric="test.auc_score", sort="metric")
+    assert [item["metrics"]["test"]["auc_score"] for item in result["items"]] == [0.95, 0.9, 0.8]
+
+    result = index.search(metric="test.auc_score", min_value=0.75, max_value=0.92, sort="metric", order="asc")
+    assert [item["metrics"]["test"]["auc_score"] for item in result["items"]] == [0.8, 0.9]
+
+def test_search_pagination(index):
+    first = index.search(order="asc", limit=2)
+    second = index.search(order="asc", limit=2, offset=2)
+    assert first["total"] == second["total"] == 4
+    paths = [item["model_path"] for item in first["items"] + second["items"]]
+    assert len(set(paths)) == 4
+
+def test_search_invalid_arguments(index):
+    with pytest.raises(ValueError):
+        index.search(sort="metric")
+    with pytest.raises(ValueError):
+        index.search(metric="auc_score")
+    with pytest.raises(ValueError):
+        index.search(order="sideways")
+
+def test_add_replaces_entry(index, tmp_path):
+    metadata = make_metadata(tmp_path, "sklearn/ridge", 1, 0.99)
+    index.add(metadata)
+    assert index.get(metadata["model_path"])["metrics"]["test"]["auc_score"] == 0.99
+    assert index.search(metric="test.auc_score", min_value=0.98)["total"] == 1
+
+def test_train_updates_index(tmp_path):
+    os.environ['ML_HOME'] = str(tmp_path)
+    train_path = tmp_path / "train.csv"
+    train_path.write_text("col1\n1\n")
+
+    metadata = DummyModel(params={"version": "v2"}).train(str(train_path))
+    assert metadata["model_name"] == "dummy"
+    assert "/models/dummy/v2/" in metadata["model_path"]
+
+    indexed = ModelIndex.for_ml_home().search(name="dummy", version="v2")
+    assert indexed["total"] == 1
+    assert indexed["items"][0]["model_path"] == metadata["model_path"]
+
+def test_train_endpoint_names_instance(tmp_path):
+    os.environ['ML_HOME'] = str(tmp_path)
+    train_path = tmp_path / "train.csv"
+    train_path.write_text("col1\n1\n")
+
+    # The same class served under a second name
+    test_app = FastAPI()
+    test_app.include_router(_model_router(lambda: DummyModel, "dummy/alt"))
+    response = TestClient(test_app).post("/model/dummy/alt/train", json={"train_path": str(train_path)})
+    assert response.status_code == 200
+    assert response.json()["model_name"] == "dummy/alt"
+    assert "/models/dummy/alt/" in response.json()["model_path"]
+    assert DummyModel.model_name == "dummy"
+    assert ModelIndex.for_ml_home().search(name="dummy/alt")["total"] == 1
+
+def test_for_ml_home_is_cached(tmp_path):
+    index = ModelIndex.for_ml_home(str(tmp_path))
+    assert ModelIndex.for_ml_home(str(tmp_path)) is index
+    # A removed database is created again
+    os.remove(tmp_path / "models" / INDEX_FILENAME)
+    recreated = ModelIndex.for_ml_home(str(tmp_path))
+    assert recreated is not index
+    assert recreated.search()["total"] == 0
+
+def test_rebuild(tmp_path):
+    # Legacy artifact without name/version in its metadata
+    model_dir = tmp_path / "models" / "sklearn" / "ridge" / "v1" / "2025" / "01" / "02" / "abc"
+    model_dir.mkdir(parents=True)
+    with open(model_dir / "metadata.json", "w") as f:
+        json.dump({"timestamp": "2025-01-02T00:00:00", "metrics": {"train": {"r2": 0.5}}}, f)
+    (tmp_path / "models" / "broken").mkdir()
+    (tmp_path / "models" / "broken" / "metadata.json").write_text("{not json")
+
+    index = ModelIndex.for_ml_home(str(tmp_path))
+    assert index.rebuild(str(tmp_path)) == 1
+    item = index.search(name="sklearn/ridge", version="v1")["items"][0]
+    assert item["model_path"] == str(model_dir)
+
+def test_models_endpoint(index, tmp_path):
+    os.environ['ML_HOME'] = str(tmp_path)
+    client = TestClient(app)
+
+    response = client.get("/models", params={"name": "sklearn/ridge", "limit": 2})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 3
+    assert len(data["items"]) == 2
+
+    response = client.get("/models/latest", params={"name": "sklearn/logistic"})
+    assert response.status_code == 200
+    assert response.json()["metrics"]["test"]["auc_score"] == 0.95
+
+    assert client.get("/models", params={"sort": "metric"}).status_code == 400
+    assert client.get("/models/latest", params={"name": "missing"}).status_code == 404
@@ -0,0 +1,65 @@
+"""
+Tests for the cached OpenAPI schema.
+"""
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from mlservice.core.openapi_cache import install_openapi_cache
+
+
+def make_app(cache_dir):
+    app = FastAPI(title="Test")
+    install_openapi_cache(app, str(cache_dir))
+
+    @app.get("/items")
+    async def items():
+        return []
+
+    return app
+
+
+def test_openapi_served_from_cache(tmp_path):
+    app = make_app(tmp_path)
+    response = TestClient(app).get("/openapi.json")
+    assert response.status_code == 200
+    assert "/items" in response.json()["paths"]
+    cache_files = list(tmp_path.glob("openapi-*.json"))
+    assert len(cache_files) == 1
+    assert cache_files[0].read_bytes() == response.content
+
+
+def test_openapi_loaded_from_disk(tmp_path, monkeypatch):
+    make_app(tmp_path).openapi()
+
+    # A new process with the same routes does not generate the schema again
+    def fail(self):
+        raise AssertionError("schema was generated again")
+    monkeypatch.setattr(FastAPI, "openapi", fail)
+    app = make_app(tmp_path)
+    assert "/items" in app.openapi()["paths"]
+    assert "/items" in TestClient(app).get("/openapi.json").json()["paths"]
+
+
+def test_openapi_invalidated_when_routes_change(tmp_path):
+    app = make_app(tmp_path)
+    client = TestClient(app)
+    assert "/orders" not in client.get("/openapi.json").json()["paths"]
+
+    @app.get("/orders")
+    async def orders():
+        return []
+
+    assert "/orders" in client.get("/openapi.json").json()["paths"]
+    assert len(list(tmp_path.glob("openapi-*.json"))) == 2
+
+
+def test_setup_routes_invalidates_schema(monkeypatch, tmp_path):
+    monkeypatch.setenv("MLSERVICE_CACHE_DIR", str(tmp_path))
+    from mlservice.main import app, setup_routes
+
+    client = TestClient(app)
+    client.get("/openapi.json")
+    setup_routes(['external_routes'])
+    paths = client.get("/openapi.json").json()["paths"]
+    assert "/model/dummy/train" in paths
+    assert "/openapi.json" not in paths
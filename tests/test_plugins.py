@@ -0,0 +1,101 @@
+"""
+Tests for entry point plugin discovery.
+"""
+import sys
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from mlservice.core.plugins import MODEL_GROUP, ROUTE_GROUP, discover_plugins, load_plugins
+from mlservice.core.registry import RouteRegistry
+
+PLUGIN_MODEL_SOURCE = '''
+from mlservice.core.ml import MLModel
+
+class PluginModel(MLModel):
+    def _train(self, train_data, eval_data=None):
+        pass
+
+    def _predict(self, data):
+        return data
+
+    def _evaluate(self, data):
+        return {}
+'''
+
+PLUGIN_ROUTES_SOURCE = '''
+from mlservice.core.registry import registry
+
+@registry.get("/plugin/hello")
+async def hello():
+    return {"message": "Hello from plugin"}
+'''
+
+
+@pytest.fixture
+def plugin_dist(tmp_path, monkeypatch):
+    """Install a fake distribution declaring one model and one route plugin."""
+    site = tmp_path / "site"
+    package = site / "fake_plugin_pkg"
+    package.mkdir(parents=True)
+    (package / "__init__.py").write_text("")
+    (package / "models.py").write_text(PLUGIN_MODEL_SOURCE)
+    (package / "routes.py").write_text(PLUGIN_ROUTES_SOURCE)
+    dist_info = site / "fake_plugin_pkg-0.1.dist-info"
+    dist_info.mkdir()
+    (dist_info / "METADATA").write_text("Metadata-Version: 2.1\nName: fake-plugin-pkg\nVersion: 0.1\n")
+    (dist_info / "entry_points.txt").write_text(
+        f"[{MODEL_GROUP}]\nplugin/model = fake_plugin_pkg.models:PluginModel\n\n"
+        f"[{ROUTE_GROUP}]\nfake = fake_plugin_pkg.routes\n"
+    )
+    monkeypatch.syspath_prepend(str(site))
+    return site
+
+
+def test_discover_plugins(plugin_dist, tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    plugins = discover_plugins(str(cache_dir))
+    assert ["plugin/model", "fake_plugin_pkg.models:PluginModel"] in plugins[MODEL_GROUP]
+    assert ["fake", "fake_plugin_pkg.routes"] in plugins[ROUTE_GROUP]
+    assert len(list(cache_dir.glob("plugins-*.json"))) == 1
+
+    # The cached index is used while sys.path is unchanged
+    def fail(group):
+        raise AssertionError("entry points were scanned again")
+    monkeypatch.setattr("mlservice.core.plugins.entry_points", fail)
+    assert discover_plugins(str(cache_dir)) == plugins
+
+
+def test_load_plugins_lazily(plugin_dist, tmp_path, monkeypatch):
+    monkeypatch.setenv("ML_HOME", str(tmp_path))
+    test_registry = RouteRegistry.get_instance()
+    loaded = load_plugins(lazy=True, cache_dir=str(tmp_path / "cache"))
+    assert set(loaded) >= {"plugin/model", "fake"}
+    assert "fake_plugin_pkg.routes" in sys.modules
+    assert "fake_plugin_pkg.models" not in sys.modules
+    assert test_registry.is_lazy_model("plugin/model")
+
+    test_app = FastAPI()
+    test_registry.apply_routes(test_app)
+    client = TestClient(test_app)
+    assert client.get("/plugin/hello").json() == {"message": "Hello from plugin"}
+
+    train_path = tmp_path / "train.csv"
+    train_path.write_text("col1\n1\n")
+    response = client.post("/model/plugin/model/train", json={"train_path": str(train_path)})
+    assert response.status_code == 200
+    assert response.json()["model_class"] == "PluginModel"
+    assert test_registry.get_model_class("plugin/model").model_name == "plugin/model"
+
+
+def test_directory_scan_skips_tests(tmp_path, monkeypatch):
+    package = tmp_path / "scan_skip_pkg"
+    (package / "tests").mkdir(parents=True)
+    (package / "__init__.py").write_text("")
+    (package / "routes.py").write_text("")
+    (package / "test_helpers.py").write_text("raise RuntimeError('test helper imported')\n")
+    (package / "tests" / "helpers.py").write_text("raise RuntimeError('test helper imported')\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    RouteRegistry.get_instance().import_routes_from_module("scan_skip_pkg")
+    assert "scan_skip_pkg.routes" in sys.modules
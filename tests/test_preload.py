@@ -0,0 +1,98 @@
+"""
+Tests for startup model preloading and readiness.
+"""
+import json
+import os
+import time
+import pytest
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+
+from external_routes.sklearn.tab_model import RidgeModel, LogisticRegressionModel
+from mlservice.core.aliases import alias_table
+from mlservice.core.model_cache import model_cache
+from mlservice.core.preload import preload_models, read_preload_config, readiness
+from mlservice.main import app
+
+@pytest.fixture
+def trained_model_path(tmp_path):
+    os.environ['ML_HOME'] = str(tmp_path)
+    np.random.seed(0)
+    data = pd.DataFrame(np.random.randn(20, 2), columns=['feature1', 'feature2'])
+    data['segment'] = ['a', 'b'] * 10
+    data['target'] = data['feature1'] + data['feature2']
+    train_path = tmp_path / "train.csv"
+    data.to_csv(train_path, index=False)
+    model = RidgeModel(params={"columns": {"target": "target", "categorical": ["segment"]}})
+    return model.train(str(train_path))['model_path']
+
+def test_tab_model_warmup(trained_model_path):
+    with model_cache.acquire(trained_model_path) as model:
+        synthetic = model._synthetic_data()
+        assert set(synthetic.columns) == {'feature1', 'feature2', 'segment'}
+        model.warmup()
+
+def test_warmup_before_training():
+    # An unfitted model has nothing to warm up
+    LogisticRegressionModel().warmup()
+
+def test_preload_models(trained_model_path):
+    alias_table.promote("sklearn/ridge@production", trained_model_path)
+    model_cache.clear()
+
+    assert preload_models(["sklearn/ridge@production"])
+    state = readiness.snapshot()
+    assert state["status"] == "ready"
+    assert state["models"]["sklearn/ridge@production"]["model_path"] == trained_model_path
+    assert trained_model_path in model_cache
+
+    assert not preload_models([trained_model_path, "missing@production"])
+    state = readiness.snapshot()
+    assert state["status"] == "failed"
+    assert state["models"]["missing@production"]["status"] == "failed"
+
+def test_read_preload_config(tmp_path):
+    config_path = tmp_path / "preload.json"
+    config_path.write_text(json.dumps({"models": ["a@prod", "/models/b"]}))
+    assert read_preload_config(str(config_path)) == ["a@prod", "/models/b"]
+    config_path.write_text(json.dumps(["a@prod"]))
+    assert read_preload_config(str(config_path)) == ["a@prod"]
+    config_path.write_text(json.dumps({"models": "a@prod"}))
+    with pytest.raises(ValueError):
+        read_preload_config(str(config_path))
+
+def test_ready_endpoint(trained_model_path):
+    app.state.preload_models = [trained_model_path]
+    app.state.model_watch_interval = 0
+    try:
+        with TestClient(app) as client:
+            deadline = time.monotonic() + 10
+            response = client.get("/ready")
+            while response.status_code != 200:
+                assert response.json()["status"] == "warming_up"
+                assert time.monotonic() < deadline
+                time.sleep(0.05)
+                response = client.get("/ready")
+            assert response.json()["models"][trained_model_path]["status"] == "ready"
+    finally:
+        del app.state.preload_models
+        del app.state.model_watch_interval
+
+def test_preloaded_app_skips_lifespan_preload(trained_model_path, monkeypatch):
+    from mlservice.core import server
+
+    server.preload_app(app, [trained_model_path])
+    assert readiness.ready
+    calls = []
+    monkeypatch.setattr("mlservice.main.start_preload", calls.append)
+    app.state.preload_models = [trained_model_path]
+    app.state.model_watch_interval = 0
+    try:
+        with TestClient(app) as client:
+            assert client.get("/ready").status_code == 200
+        assert calls == []
+    finally:
+        del app.state.preloaded
+        del app.state.preload_models
+        del app.state.model_watch_interval
@@ -0,0 +1,94 @@
+"""
+Tests for on-demand request profiling and the /profiles endpoints.
+"""
+import pstats
+
+import pytest
+from fastapi.testclient import TestClient
+
+from mlservice.core.profiling import (
+    KEEP_ENV, PROFILE_TOKEN_ENV, SAMPLE_RATE_ENV, list_profiles, profile_file,
+)
+from mlservice.main import app, setup_routes
+
+TOKEN = "secret-token"
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setenv("ML_HOME", str(tmp_path))
+    monkeypatch.setenv(PROFILE_TOKEN_ENV, TOKEN)
+    monkeypatch.delenv(SAMPLE_RATE_ENV, raising=False)
+    setup_routes(['external_routes'])
+    data_path = tmp_path / "data.csv"
+    data_path.write_text("col1\n1\n2\n")
+    return TestClient(app)
+
+
+def _train(client, tmp_path, **kwargs):
+    return client.post("/model/dummy/train", json={"train_path": str(tmp_path / "data.csv")}, **kwargs)
+
+
+def test_profile_on_request(client, tmp_path):
+    assert "x-profile-id" not in _train(client, tmp_path).headers
+    assert "x-profile-id" not in _train(client, tmp_path, headers={"X-MLService-Profile": "wrong"}).headers
+
+    response = _train(client, tmp_path, headers={"X-MLService-Profile": TOKEN})
+    assert response.status_code == 200
+    profile_id = response.headers["x-profile-id"]
+
+    stats = pstats.Stats(str(profile_file(profile_id, "prof")))
+    assert any(name == "train" for _, _, name in stats.stats)
+    for line in profile_file(profile_id, "collapsed").read_text().splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert int(count) > 0 and stack
+
+    response = client.get(f"/?profile={TOKEN}")
+    assert "x-profile-id" in response.headers
+
+    profiles = list_profiles()
+    assert [p["path"] for p in profiles] == ["/", "/model/dummy/train"]
+    assert profiles[1]["id"] == profile_id and profiles[1]["status"] == 200
+    assert profiles[1]["concurrent_requests"] == 0
+
+
+def test_sampling_and_retention(client, tmp_path, monkeypatch):
+    monkeypatch.setenv(SAMPLE_RATE_ENV, "2")
+    monkeypatch.setenv(KEEP_ENV, "2")
+    sampled = ["x-profile-id" in _train(client, tmp_path).headers for _ in range(6)]
+    assert sampled.count(True) == 3
+    # Only model requests are sampled
+    assert "x-profile-id" not in client.get("/").headers
+    assert len(list_profiles()) == 2
+
+
+def test_profile_endpoints(client, tmp_path):
+    profile_id = _train(client, tmp_path, headers={"X-MLService-Profile": TOKEN}).headers["x-profile-id"]
+    admin = {"X-MLService-Profile": TOKEN}
+
+    assert client.get("/profiles").status_code == 403
+    response = client.get("/profiles", headers=admin)
+    assert response.status_code == 200
+    assert response.json()[0]["id"] == profile_id
+
+    response = client.get(f"/profiles/{profile_id}?format=collapsed", headers=admin)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    response = client.get(f"/profiles/{profile_id}", headers=admin)
+    assert response.status_code == 200
+    assert response.content == profile_file(profile_id, "prof").read_bytes()
+
+    assert client.get("/profiles/20240101T000000-deadbeef", headers=admin).status_code == 404
+    assert client.get("/profiles/..%2Fmodels", headers=admin).status_code == 404
+
+
+def test_profiling_disabled_without_token(client, tmp_path, monkeypatch):
+    monkeypatch.delenv(PROFILE_TOKEN_ENV)
+    assert "x-profile-id" not in _train(client, tmp_path, headers={"X-MLService-Profile": ""}).headers
+    assert "x-profile-id" not in client.get("/?profile=").headers
+
+    monkeypatch.setenv(SAMPLE_RATE_ENV, "1")
+    profile_id = _train(client, tmp_path).headers["x-profile-id"]
+    assert client.get("/profiles").status_code == 403
+    assert client.get(f"/profiles/{profile_id}").status_code == 403
+    assert client.get("/profiles", headers={"X-MLService-Profile": ""}).status_code == 403
@@ -1,11 +1,13 @@
 """
 Tests for the route registry system.
 """
+import sys
+
 import pytest
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
-from mlservice.core.registry import RouteRegistry
+from mlservice.core.registry import RouteRegistry, scan_route_source
 from mlservice.main import setup_routes, app
 from external_routes.demo.models import Item
 
@@ -129,3 +131,117 @@ def test_external_routes(client):
     assert response.status_code == 200
     assert response.json()["source"] == "external module"
     assert "data" in response.json()
+
+LAZY_MODEL_SOURCE = '''
+from mlservice.core.ml import MLModel, model_endpoints
+
+@model_endpoints("lazytest/model")
+class LazyModel(MLModel):
+    def _train(self, train_data, eval_data=None):
+        pass
+
+    def _predict(self, data):
+        return data
+
+    def _evaluate(self, data):
+        return {}
+'''
+
+@pytest.fixture
+def lazy_package(tmp_path, monkeypatch):
+    """Create an importable package with one model module."""
+    package = tmp_path / "lazy_routes_pkg"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    (package / "lazy_model.py").write_text(LAZY_MODEL_SOURCE)
+    (package / "helpers.py").write_text("VALUE = 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    return package
+
+def test_scan_route_source():
+    """Test that model declarations are found without importing."""
+    assert scan_route_source(LAZY_MODEL_SOURCE) == {"models": ["lazytest/model"], "eager": False}
+    assert scan_route_source("create_model_endpoints(Ridge, 'sklearn/x')")["models"] == ["sklearn/x"]
+    assert scan_route_source("model_endpoints(NAME)")["eager"] is True
+    assert scan_route_source("from mlservice.core.registry import registry")["eager"] is True
+    assert scan_route_source("VALUE = 1") == {"models": [], "eager": False}
+
+def test_lazy_route_registration(lazy_package, tmp_path):
+    """Test that lazy mode defers importing model modules until first use."""
+    test_registry = RouteRegistry.get_instance()
+    cache_dir = tmp_path / "cache"
+    test_registry.import_routes_from_module("lazy_routes_pkg", lazy=True, cache_dir=str(cache_dir))
+
+    assert "lazy_routes_pkg.lazy_model" not in sys.modules
+    assert "lazy_routes_pkg.helpers" not in sys.modules
+    assert test_registry.is_lazy_model("lazytest/model")
+    paths = [route["path"] for route in test_registry._routes]
+    assert "/model/lazytest/model/train" in paths
+    assert len(list(cache_dir.glob("routes-*.json"))) == 1
+
+    test_app = FastAPI()
+    test_registry.apply_routes(test_app)
+    client = TestClient(test_app)
+    response = client.post("/model/lazytest/model/train", json={"train_path": "missing.csv"})
+    assert response.status_code == 500
+    assert "lazy_routes_pkg.lazy_model" in sys.modules
+    assert "lazy_routes_pkg.lazy_model" in test_registry.import_timings
+    assert test_registry.get_model_class("lazytest/model").__name__ == "LazyModel"
+
+def test_route_manifest_cache(lazy_package, tmp_path, monkeypatch):
+    """Test that unchanged files are not parsed again."""
+    test_registry = RouteRegistry.get_instance()
+    cache_dir = tmp_path / "cache"
+    first = test_registry.build_manifest("lazy_routes_pkg", lazy_package, str(cache_dir))
+
+    def fail(source):
+        raise AssertionError("unchanged module was parsed again")
+    monkeypatch.setattr("mlservice.core.registry.scan_route_source", fail)
+    assert test_registry.build_manifest("lazy_routes_pkg", lazy_package, str(cache_dir)) == first
+    assert first["lazy_routes_pkg.lazy_model"]["models"] == ["lazytest/model"]
+
+def test_catalog_routing(tmp_path, monkeypatch):
+    """Test that catalog mode serves every model through one set of routes."""
+    monkeypatch.setenv("ML_HOME", str(tmp_path))
+    test_registry = RouteRegistry.get_instance()
+    test_registry.import_routes_from_module("external_routes")
+    test_app = FastAPI()
+    test_registry.apply_routes(test_app, routing="catalog")
+
+    model_paths = [route.path for route in test_app.routes if route.path.startswith("/model/")]
+    assert sorted(model_paths) == [
+        "/model/{model_name:path}/eval",
+        "/model/{model_name:path}/predict",
+        "/model/{model_name:path}/train",
+    ]
+    assert "/demo" in [route.path for route in test_app.routes]
+
+    train_path = tmp_path / "train.csv"
+    train_path.write_text("col1\n1\n2\n")
+    client = TestClient(test_app)
+    response = client.post("/model/dummy/train", json={"train_path": str(train_path)})
+    assert response.status_code == 200
+    assert response.json()["model_name"] == "dummy"
+
+    response = client.post("/model/sklearn/missing/train", json={"train_path": str(train_path)})
+    assert response.status_code == 404
+
+def test_catalog_mode_skips_per_model_routes(monkeypatch):
+    """Test that models registered in catalog mode get no per-model routers."""
+    from external_routes.mldemo.dummy import DummyModel
+    from mlservice.core.ml import create_model_endpoints
+
+    test_registry = RouteRegistry.get_instance()
+    monkeypatch.setattr(test_registry, "routing", "catalog")
+    routes_before = len(test_registry._routes)
+    model_class = type("CatalogModel", (DummyModel,), {})
+    assert create_model_endpoints(model_class, "catalogtest/model") is None
+    test_registry.register_lazy_model("catalogtest/lazy", "lazy_routes_pkg.lazy_model")
+    assert len(test_registry._routes) == routes_before
+    assert test_registry.get_model_class("catalogtest/model") is model_class
+    assert test_registry.has_model("catalogtest/lazy")
+
+def test_unknown_routing_mode():
+    """Test that an unknown routing mode is rejected."""
+    with pytest.raises(ValueError):
+        RouteRegistry.get_instance().apply_routes(FastAPI(), routing="fastest")
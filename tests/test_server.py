@@ -0,0 +1,110 @@
+"""
+Tests for the production pre-forking server.
+"""
+import asyncio
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from unittest.mock import MagicMock, patch
+
+import pytest
+import uvicorn
+
+from mlservice.core.server import PreforkServer, WorkerServer, rss_bytes
+from mlservice.main import app, main
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def get(url, timeout=10.0):
+    """GET url, retrying until the server accepts connections."""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with urllib.request.urlopen(url, timeout=2) as response:
+                return response.status
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.1)
+
+
+def test_rss_bytes():
+    assert rss_bytes() > 1024 * 1024
+
+
+def test_worker_recycles_past_rss_limit():
+    server = WorkerServer(uvicorn.Config(app), max_rss_mb=1)
+    assert asyncio.run(server.on_tick(0))
+    server = WorkerServer(uvicorn.Config(app), max_rss_mb=1024 * 1024)
+    assert not asyncio.run(server.on_tick(0))
+
+
+def test_prefork_server_rejects_zero_workers():
+    with pytest.raises(ValueError):
+        PreforkServer(app, workers=0)
+
+
+@patch('argparse.ArgumentParser.parse_args')
+@patch('mlservice.main.PreforkServer')
+def test_main_production_mode(mock_server, mock_parse_args):
+    args = MagicMock()
+    args.host = "127.0.0.1"
+    args.port = 9000
+    args.external_routines = None
+    args.watch_interval = 0
+    args.preload = ["sklearn/ridge@production"]
+    args.preload_config = None
+    args.lazy_routes = False
+    args.routing = "per-model"
+    args.plugins = False
+    args.production = False
+    args.workers = 4
+    args.backlog = 128
+    args.limit_concurrency = 100
+    args.max_requests = 1000
+    args.max_requests_jitter = 50
+    args.max_worker_rss = 512.0
+    args.timeout_graceful_shutdown = 5
+    mock_parse_args.return_value = args
+
+    main()
+
+    _, kwargs = mock_server.call_args
+    assert kwargs["workers"] == 4
+    assert kwargs["limit_concurrency"] == 100
+    assert kwargs["max_requests"] == 1000
+    assert kwargs["max_rss_mb"] == 512.0
+    assert kwargs["preload"] == ["sklearn/ridge@production"]
+    mock_server.return_value.run.assert_called_once()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_prefork_server_recycles_and_stops(tmp_path):
+    """Workers are replaced after --max-requests and stop on SIGTERM."""
+    port = free_port()
+    env = dict(os.environ, ML_HOME=str(tmp_path), MLSERVICE_CACHE_DIR=str(tmp_path / "cache"))
+    process = subprocess.Popen(
+        [sys.executable, "-m", "mlservice.main", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", "2", "--max-requests", "2", "--watch-interval", "0", "--no-plugins",
+         "--timeout-graceful-shutdown", "1"],
+        env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+    )
+    try:
+        for _ in range(8):
+            assert get(f"http://127.0.0.1:{port}/") == 200
+            # Workers check the request limit every 0.1s
+            time.sleep(0.2)
+    finally:
+        process.send_signal(signal.SIGTERM)
+        output, _ = process.communicate(timeout=30)
+    assert process.returncode == 0, output
+    assert "starting a replacement" in output
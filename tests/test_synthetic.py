@@ -0,0 +1,79 @@
+import random
+import time
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from external_routes.mldemo.synthetic import SyntheticModel, burn_cpu, sample_latency_ms
+from mlservice.main import setup_routes, app
+
+
+@pytest.fixture
+def data_path(tmp_path, monkeypatch):
+    monkeypatch.setenv("ML_HOME", str(tmp_path))
+    path = tmp_path / "data.csv"
+    pd.DataFrame({"x": range(100)}).to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.mark.parametrize("spec, low, high", [
+    (None, 0, 0),
+    ({"distribution": "constant", "ms": 5}, 5, 5),
+    ({"distribution": "uniform", "low_ms": 1, "high_ms": 2}, 1, 2),
+    ({"distribution": "normal", "mean_ms": 1, "std_ms": 10}, 0, float("inf")),
+    ({"distribution": "lognormal", "median_ms": 10, "sigma": 0.5}, 0, float("inf")),
+    ({"distribution": "exponential", "mean_ms": 10}, 0, float("inf")),
+])
+def test_sample_latency(spec, low, high):
+    rng = random.Random(0)
+    for _ in range(100):
+        assert low <= sample_latency_ms(spec, rng) <= high
+    with pytest.raises(ValueError):
+        sample_latency_ms({"distribution": "pareto"}, rng)
+
+
+@pytest.mark.parametrize("release_gil", [False, True])
+def test_burn_cpu(release_gil):
+    start = time.thread_time()
+    burn_cpu(0.05, release_gil)
+    assert time.thread_time() - start >= 0.05
+
+
+def test_costs_scale_with_rows(data_path):
+    model = SyntheticModel({
+        "cpu_ms_per_row": 0.5,
+        "memory_bytes_per_row": 1024,
+        "io_bytes": 100000,
+        "latency": {"distribution": "constant", "ms": 20},
+    })
+    model.train(data_path)
+    metrics = model.evaluate(data_path)
+    assert metrics["rows"] == 100
+    assert metrics["cpu_seconds"] >= 0.05
+    assert metrics["memory_bytes"] == 100 * 1024
+    assert metrics["io_bytes"] == 100000
+    assert metrics["seconds"] >= 0.07
+
+
+def test_rows_of_non_tabular_data(tmp_path):
+    model = SyntheticModel()
+    assert model._n_rows(str(tmp_path / "data.bin")) == 1
+    assert model._n_rows({"a": 1, "b": 2}) == 1
+    assert SyntheticModel({"rows": 50})._n_rows({"a": 1}) == 50
+
+
+def test_endpoints(data_path):
+    setup_routes(['external_routes'])
+    client = TestClient(app)
+    response = client.post("/model/synthetic/train", json={
+        "train_path": data_path,
+        "params": '{"cpu_ms_per_row": 0.01, "latency": {"distribution": "uniform", "low_ms": 1, "high_ms": 5}}',
+    })
+    assert response.status_code == 200
+    assert response.json()["metrics"]["train"]["rows"] == 100
+
+    model_path = response.json()["model_path"]
+    response = client.post("/model/synthetic/predict", json={"data_path": data_path, "model_path": model_path})
+    assert response.status_code == 200
+    assert len(pd.read_pickle(response.json())) == 100
@@ -8,11 +8,13 @@ import pandas as pd
 import numpy as np
 import joblib
 import pickle
+import scipy.sparse as sp
 from datetime import datetime
 from fastapi.testclient import TestClient
+from sklearn.datasets import dump_svmlight_file
 from sklearn.linear_model import LogisticRegression
 from external_routes.sklearn.tab_model import RidgeModel, LogisticRegressionModel
-from mlservice.core.tabml import TabModel, TabClassification
+from mlservice.core.tabml import ClassPredictions, TabModel, TabClassification
 from mlservice.main import setup_routes, app
 
 def read_prediction_file(file_path):
@@ -489,3 +491,196 @@ def test_logistic_model_endpoints(client, sample_classification_data, tmp_path):
     assert len(prediction) > 0
     assert 'prediction' in prediction.columns
     assert 'predict_proba' in prediction.columns
+
+def test_train_with_memory_optimisation(sample_data, tmp_path):
+    os.environ['ML_HOME'] = str(tmp_path)
+
+    data = sample_data.copy()
+    data['group'] = ['a', 'b'] * 50
+    data['count'] = np.arange(100)
+    train_path = tmp_path / "train.csv"
+    data.to_csv(train_path, index=False)
+
+    model = RidgeModel(params={"columns": {
+        "target": "target",
+        "features": ["feature1", "feature2", "count"],
+        "categorical": ["group"],
+        "optimize_memory": True,
+        "float_tolerance": 1e-6,
+    }})
+    train_data = model._load_data(str(train_path), 'train')
+    assert train_data['feature1'].dtype == np.float32
+    assert train_data['count'].dtype == np.int32
+    assert isinstance(train_data['group'].dtype, pd.CategoricalDtype)
+    assert train_data['target'].dtype == np.float64
+
+    metadata = model.train(str(train_path))
+    memory = metadata['data_memory']['train']
+    assert memory['after'] < memory['before']
+
+    predict_path = tmp_path / "predict.csv"
+    data.drop('target', axis=1).to_csv(predict_path, index=False)
+    prediction_file_path = model.predict(str(predict_path))
+    with open(prediction_file_path.replace('.pkl', '.json')) as f:
+        predict_metadata = json.load(f)
+    assert predict_metadata['data_path'] == str(predict_path)
+    assert predict_metadata['data_memory']['predict']['after'] < predict_metadata['data_memory']['predict']['before']
+
+@pytest.mark.parametrize("encoding", ["onehot", "ordinal"])
+def test_categorical_features(sample_classification_data, tmp_path, encoding):
+    os.environ['ML_HOME'] = str(tmp_path)
+
+    data = sample_classification_data.copy()
+    data['segment'] = np.where(data['target'] == 1, 'high', 'low')
+    train_path = tmp_path / "train.csv"
+    data.to_csv(train_path, index=False)
+
+    model = LogisticRegressionModel(params={"columns": {
+        "target": "target",
+        "categorical": ["segment"],
+        "categorical_encoding": encoding,
+    }})
+    metadata = model.train(str(train_path))
+    assert model.categorical_encoder_.columns == ['segment']
+    assert metadata['metrics']['train']['accuracy'] > 0.9
+
+    # Unseen categories are encoded without failing
+    predict_data = data.drop('target', axis=1)
+    predict_data.loc[0, 'segment'] = 'unseen'
+    predictions = model._predict(predict_data)
+    assert len(predictions) == len(predict_data)
+
+def test_sparse_training_from_svmlight(tmp_path):
+    os.environ['ML_HOME'] = str(tmp_path)
+
+    rng = np.random.RandomState(0)
+    X = sp.random(200, 1000, density=0.01, format="csr", random_state=rng)
+    y = (X[:, :500].sum(axis=1).A1 > X[:, 500:].sum(axis=1).A1).astype(int)
+    train_path = tmp_path / "train.svm"
+    dump_svmlight_file(X, y, str(train_path))
+
+    model = LogisticRegressionModel(params={"hyperparameters": {"C": 10.0}})
+    metadata = model.train(str(train_path))
+    assert model.n_features_ == 1000
+    assert metadata['metrics']['train']['accuracy'] > 0.7
+
+    # Predict on a file whose largest feature index is smaller than at train time
+    predict_path = tmp_path / "predict.svm"
+    dump_svmlight_file(X[:5, :10], y[:5], str(predict_path))
+    prediction = read_prediction_file(model.predict(str(predict_path)))
+    assert list(prediction.columns) == [model.prediction_column, model.predict_proba_column]
+    assert len(prediction) == 5
+
+def test_pandas_sparse_columns_stay_sparse(ridge_model):
+    X = sp.random(50, 20, density=0.1, format="csr", random_state=0)
+    data = pd.DataFrame.sparse.from_spmatrix(X, columns=[f"f{i}" for i in range(20)])
+    data['target'] = np.arange(50, dtype=float)
+
+    features = ridge_model._fit_features(data)
+    assert sp.issparse(features)
+    ridge_model.model.fit(features, data['target'].values)
+    predictions = ridge_model._predict(data)
+    assert ridge_model.prediction_column in predictions.columns
+
+def test_feature_schema_is_stored_with_model(ridge_model, sample_data, tmp_path):
+    os.environ['ML_HOME'] = str(tmp_path)
+
+    train_path = tmp_path / "train.csv"
+    sample_data.to_csv(train_path, index=False)
+    metadata = ridge_model.train(str(train_path))
+
+    loaded_model = joblib.load(os.path.join(metadata['model_path'], "model.joblib"))
+    assert loaded_model.feature_schema_.columns == ['feature1', 'feature2']
+
+    # Column order of incoming frames does not matter, missing columns do
+    shuffled = sample_data[['target', 'feature2', 'feature1']].copy()
+    expected = ridge_model.model.predict(sample_data[['feature1', 'feature2']].values)
+    predictions = loaded_model._predict(shuffled)
+    np.testing.assert_allclose(predictions[loaded_model.prediction_column], expected)
+    with pytest.raises(ValueError, match="missing feature columns"):
+        loaded_model._predict(sample_data[['feature1']].copy())
+
+@pytest.fixture
+def multiclass_data():
+    np.random.seed(0)
+    X = np.random.randn(150, 2)
+    y = np.where(X[:, 0] > 0.5, 'c', np.where(X[:, 1] > 0, 'b', 'a'))
+    df = pd.DataFrame(X, columns=['feature1', 'feature2'])
+    df['target'] = y
+    return df
+
+def test_class_predictions_derived_from_probabilities():
+    proba = np.array([[0.2, 0.5, 0.3], [0.6, 0.1, 0.3]])
+    predictions = ClassPredictions(proba, ['a', 'b', 'c'])
+    assert list(predictions.labels) == ['b', 'a']
+    np.testing.assert_allclose(predictions.score, [0.5, 0.6])
+    labels, top_proba = predictions.top_k(2)
+    assert labels.tolist() == [['b', 'c'], ['a', 'c']]
+    np.testing.assert_allclose(top_proba, [[0.5, 0.3], [0.6, 0.3]])
+    assert predictions.top_k(5)[0].shape == (2, 3)
+    with pytest.raises(ValueError, match="Expected probabilities"):
+        ClassPredictions(proba, ['a', 'b'])
+
+def test_logistic_model_scores_once(logistic_model, sample_classification_data, monkeypatch):
+    logistic_model._train(sample_classification_data)
+    calls = []
+    predict_proba = logistic_model.model.predict_proba
+    monkeypatch.setattr(logistic_model.model, 'predict_proba',
+                        lambda X: calls.append(1) or predict_proba(X))
+
+    predictions = logistic_model._predict(sample_classification_data.drop('target', axis=1))
+    metrics = logistic_model._evaluate(sample_classification_data)
+    assert len(calls) == 2
+
+    X = sample_classification_data[['feature1', 'feature2']].values
+    np.testing.assert_array_equal(predictions[logistic_model.prediction_column], logistic_model.model.predict(X))
+    np.testing.assert_allclose(predictions[logistic_model.predict_proba_column], predict_proba(X)[:, 1])
+    assert metrics['accuracy'] > 0.9
+    assert metrics['auc_score'] > 0.9
+
+def test_multiclass_train_and_top_k(multiclass_data, tmp_path):
+    os.environ['ML_HOME'] = str(tmp_path)
+    train_path = tmp_path / "train.csv"
+    multiclass_data.to_csv(train_path, index=False)
+
+    model = LogisticRegressionModel(params={"columns": {"target": "target", "top_k": 2}})
+    metadata = model.train(str(train_path))
+    metrics = metadata['metrics']['train']
+    assert metrics['accuracy'] > 0.8
+    assert 0 < metrics['f1'] <= 1
+    assert metrics['auc_score'] > 0.9
+
+    predictions = model._predict(multiclass_data.drop('target', axis=1))
+    X = multiclass_data[['feature1', 'feature2']].values
+    proba = model.model.predict_proba(X)
+    np.testing.assert_array_equal(predictions['prediction'], model.model.predict(X))
+    np.testing.assert_allclose(predictions['predict_proba'], proba.max(axis=1))
+    assert (predictions['prediction_top1'] == predictions['prediction']).all()
+    assert (predictions['predict_proba_top1'] >= predictions['predict_proba_top2']).all()
+    assert 'prediction_top3' not in predictions.columns
+
+def test_classification_requires_predict_or_predict_proba():
+    class Untrained(TabClassification):
+        def _train(self, train_data, eval_data=None):
+            pass
+
+    with pytest.raises(TypeError, match="_predict"):
+        Untrained()
+
+    class Scored(Untrained):
+        def _predict_proba(self, data):
+            return np.full((len(data), 2), 0.5)
+
+    model = Scored()
+    model.classes_ = np.array([0, 1])
+    predictions = model._predict(pd.DataFrame({'feature1': [1.0, 2.0]}))
+    assert predictions['predict_proba'].tolist() == [0.5, 0.5]
+
+def test_transform_features_reuses_buffer_only_on_request(ridge_model, sample_data):
+    ridge_model._train(sample_data)
+    data = sample_data[['feature2', 'feature1']]
+    first = ridge_model._transform_features(data)
+    second = ridge_model._transform_features(data)
+    assert not np.shares_memory(first, second)
+    assert np.shares_memory(ridge_model._transform_features(data, reuse=True),
+                            ridge_model._transform_features(data, reuse=True))
@@ -4,10 +4,14 @@ Tests for utility functions.
 import os
 import json
 import pytest
+import numpy as np
 import pandas as pd
+import scipy.sparse as sp
 from pathlib import Path
 from unittest.mock import patch, mock_open
-from mlservice.core.utils import load_data, load_model
+from mlservice.core.utils import (
+    load_data, load_model, iter_json_lines, optimize_dtypes, SparseData, save_sparse_data
+)
 
 def test_load_data_none():
     """Test load_data with None path."""
@@ -33,6 +37,79 @@ def test_load_data_json(tmp_path):
     result = load_data(str(json_path))
     assert result == test_data
 
+def test_load_data_json_lines(tmp_path):
+    """Test load_data with a JSON Lines file, including missing keys."""
+    jsonl_path = tmp_path / "test.jsonl"
+    with open(jsonl_path, "w") as f:
+        f.write('{"col1": 1, "col2": "a"}\n')
+        f.write('\n')
+        f.write('{"col1": 2}\n')
+        f.write('{"col1": 3, "col2": "c", "col3": 1.5}\n')
+
+    result = load_data(str(jsonl_path))
+    assert list(result.columns) == ["col1", "col2", "col3"]
+    assert result["col1"].tolist() == [1, 2, 3]
+    assert result["col2"].tolist() == ["a", None, "c"]
+    assert result["col3"].isna().tolist() == [True, True, False]
+
+def test_load_data_json_non_finite(tmp_path):
+    """Test that NaN, Infinity and big integers written by the stdlib still load."""
+    json_path = tmp_path / "nan.json"
+    with open(json_path, "w") as f:
+        json.dump({"a": [1.0, float("nan"), float("inf")], "b": 2 ** 70}, f)
+    result = load_data(str(json_path))
+    assert result["a"][0] == 1.0
+    assert np.isnan(result["a"][1]) and np.isinf(result["a"][2])
+    assert result["b"] == 2 ** 70
+
+    jsonl_path = tmp_path / "nan.jsonl"
+    with open(jsonl_path, "w") as f:
+        f.write(json.dumps({"x": 1.0}) + "\n")
+        f.write(json.dumps({"x": float("nan")}) + "\n")
+    result = load_data(str(jsonl_path))
+    assert result["x"][0] == 1.0
+    assert np.isnan(result["x"][1])
+
+def test_iter_json_lines_chunks(tmp_path):
+    """Test that JSON Lines files are streamed in bounded chunks."""
+    ndjson_path = tmp_path / "test.ndjson"
+    with open(ndjson_path, "w") as f:
+        for i in range(5):
+            f.write(json.dumps({"x": i}) + "\n")
+
+    chunks = list(iter_json_lines(str(ndjson_path), chunk_size=2))
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert pd.concat(chunks, ignore_index=True)["x"].tolist() == list(range(5))
+    pd.testing.assert_frame_equal(
+        load_data(str(ndjson_path)), pd.DataFrame({"x": list(range(5))})
+    )
+
+def test_load_data_columnar_json(tmp_path):
+    """Test load_data with the columnar JSON layout."""
+    columnar = {
+        "columns": {"a": [1.0, 2.0], "b": [3, 4]},
+        "dtypes": {"a": "float32"},
+    }
+    json_path = tmp_path / "data.columns.json"
+    with open(json_path, "w") as f:
+        json.dump(columnar, f)
+
+    result = load_data(str(json_path))
+    assert isinstance(result, pd.DataFrame)
+    assert result["a"].dtype == "float32"
+    assert result["b"].tolist() == [3, 4]
+
+    # Plain .json files are returned as parsed, whatever their shape
+    plain_path = tmp_path / "config.json"
+    with open(plain_path, "w") as f:
+        json.dump(columnar, f)
+    assert load_data(str(plain_path)) == columnar
+
+    with open(json_path, "w") as f:
+        json.dump({"rows": [1, 2]}, f)
+    with pytest.raises(ValueError):
+        load_data(str(json_path))
+
 def test_load_data_other_format(tmp_path):
     """Test load_data with unsupported format."""
     test_path = tmp_path / "test.txt"
@@ -76,3 +153,64 @@ def test_load_model_corrupt(mock_joblib_load, tmp_path):
     with pytest.raises(ValueError) as exc_info:
         load_model(str(model_dir))
     assert "Error loading model file" in str(exc_info.value)
+
+def test_optimize_dtypes():
+    """Test dtype narrowing keeps values and leaves the input untouched."""
+    df = pd.DataFrame({
+        "f": [1.5, 2.5, float("nan")],
+        "big": [1e300, 0.0, 1.0],
+        "precise": [0.1, 1234567.891, 20240101.0],
+        "i": [1, 2, 3],
+        "wide": [0, 2**40, 1],
+        "cat": ["x", "y", "x"],
+        "target": [0.1, 0.2, 0.3],
+    })
+    result = optimize_dtypes(df, categorical_columns=["cat"], keep_columns=["target"])
+    assert result["f"].dtype == "float32"
+    assert result["big"].dtype == "float64"
+    # Not exact in float32, so only narrowed within a tolerance
+    assert result["precise"].dtype == "float64"
+    tolerant = optimize_dtypes(df, float_tolerance=1e-6)
+    assert tolerant["precise"].dtype == "float32"
+    assert tolerant["big"].dtype == "float64"
+    np.testing.assert_allclose(tolerant["precise"], df["precise"], rtol=1e-6)
+    assert result["i"].dtype == "int32"
+    assert result["wide"].dtype == "int64"
+    assert isinstance(result["cat"].dtype, pd.CategoricalDtype)
+    assert result["target"].dtype == "float64"
+    assert df["f"].dtype == "float64"
+
+def test_load_data_svmlight(tmp_path):
+    """Test load_data with an svmlight/libsvm file."""
+    svm_path = tmp_path / "test.svm"
+    svm_path.write_text("1 1:0.5 3:2.0\n0 2:1.0\n")
+
+    result = load_data(str(svm_path))
+    assert isinstance(result, SparseData)
+    assert result.shape == (2, 3)
+    assert result.X.nnz == 3
+    assert result.target.tolist() == [1.0, 0.0]
+
+def test_load_data_sparse_npz(tmp_path):
+    """Test load_data with CSR .npz files with and without a target."""
+    X = sp.random(10, 50, density=0.1, format="csr", random_state=0)
+    npz_path = tmp_path / "features.npz"
+    sp.save_npz(npz_path, X)
+
+    result = load_data(str(npz_path))
+    assert isinstance(result, SparseData)
+    assert result.target is None
+    assert (result.X != X).nnz == 0
+
+    target_path = tmp_path / "with_target.npz"
+    save_sparse_data(str(target_path), SparseData(X, target=list(range(10))))
+    result = load_data(str(target_path))
+    assert (result.X != X).nnz == 0
+    assert result.target.tolist() == list(range(10))
+
+def test_load_data_dense_npz(tmp_path):
+    """Test load_data returns the arrays of a non-sparse .npz archive."""
+    npz_path = tmp_path / "arrays.npz"
+    np.savez(npz_path, a=np.arange(3))
+    result = load_data(str(npz_path))
+    assert result["a"].tolist() == [0, 1, 2]